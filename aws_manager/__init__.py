@@ -1,5 +1,8 @@
 from .code_build_client import CodeBuildClient
 from .code_star_client import CodeStarClient
-from .constants import ELBOptionSettings, Route53HostedZoneId
+from .constants import ElasticBeanstalkEvents, ELBOptionSettings, Route53HostedZoneId
 from .elastic_beanstalk_client import ElasticBeanstalkClient
+from .environment_waiter import EnvironmentWaiter
+from .event_stream import EventStream
 from .route53_client import Route53Client
+from .s3_client import S3Client
@@ -0,0 +1,17 @@
+from .session import get_client
+
+
+class BaseClient:
+    SERVICE_NAME = None
+
+    _client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_client(self.SERVICE_NAME)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
@@ -1,33 +1,72 @@
-import boto3
+import itertools
 
+from .base_client import BaseClient
+
+
+class CodeBuildClient(BaseClient):
+    SERVICE_NAME = 'codebuild'
+    BATCH_GET_BUILDS_LIMIT = 100
+    # A commit that has not been built yet is looked for in the latest builds
+    # only, not in the whole history of the project
+    MAX_SCANNED_BUILDS = 500
 
-class CodeBuildClient:
     def __init__(self, service):
-        self.client = boto3.client('codebuild')
         self.service = service
+        self._buildsDetails = None
+        self._buildsBySourceVersion = {}
+
+    def _iter_build_ids(self):
+        paginator = self.client.get_paginator('list_builds_for_project')
+        for page in paginator.paginate(
+            projectName=f'{self.service}-build', sortOrder='DESCENDING'
+        ):
+            yield from page['ids']
+
+    def _iter_builds_details(self):
+        ids = []
+        for buildId in itertools.islice(
+            self._iter_build_ids(), self.MAX_SCANNED_BUILDS
+        ):
+            ids.append(buildId)
+            if len(ids) == self.BATCH_GET_BUILDS_LIMIT:
+                yield from self.client.batch_get_builds(ids=ids)['builds']
+                ids = []
+        if ids:
+            yield from self.client.batch_get_builds(ids=ids)['builds']
+
+    def _index_builds(self, sourceVersion=None):
+        if self._buildsDetails is None:
+            self._buildsDetails = self._iter_builds_details()
+        try:
+            for buildDetail in self._buildsDetails:
+                buildSourceVersion = buildDetail.get('sourceVersion')
+                if buildSourceVersion is None:
+                    continue
+                # Builds are listed newest first, keep the latest build of a commit
+                self._buildsBySourceVersion.setdefault(buildSourceVersion, buildDetail)
+                if buildSourceVersion == sourceVersion:
+                    return
+        except BaseException:
+            # A generator that raised is finished, the next lookup pages again
+            self._buildsDetails = None
+            raise
+        # Scanned to the end, builds started since then are found by a new scan
+        self._buildsDetails = None
 
-    def _get_builds_details(self):
-        projectName = f'{self.service}-build'
-        ids = self.client.list_builds_for_project(projectName=projectName)['ids']
-        buildsDetails = self.client.batch_get_builds(ids=ids)['builds']
-        return buildsDetails
+    def get_build_for_source_version(self, sourceVersion):
+        if sourceVersion not in self._buildsBySourceVersion:
+            self._index_builds(sourceVersion=sourceVersion)
+        return self._buildsBySourceVersion.get(sourceVersion)
 
     def get_source_versions(self):
-        buildsDetails = self._get_builds_details()
-        sourceVersions = [
-            build['sourceVersion']
-            for build in buildsDetails
-            if build.get('sourceVersion') is not None
-        ]
-        return sourceVersions
+        self._index_builds()
+        return list(self._buildsBySourceVersion)
 
     def get_status_for_source_version(self, sourceVersion):
-        buildsDetails = self._get_builds_details()
-        for buildDetail in buildsDetails:
-            if buildDetail['sourceVersion'] == sourceVersion:
-                return buildDetail['buildStatus']
-            else:
-                return f'Source Version {sourceVersion} does not exist'
+        buildDetail = self.get_build_for_source_version(sourceVersion=sourceVersion)
+        if buildDetail is None:
+            return f'Source Version {sourceVersion} does not exist'
+        return buildDetail['buildStatus']
 
     def create_build(
         self,
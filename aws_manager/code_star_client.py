@@ -1,9 +1,8 @@
-import boto3
+from .base_client import BaseClient
 
 
-class CodeStarClient:
-    def __init__(self):
-        self.client = boto3.client('codestar-notifications')
+class CodeStarClient(BaseClient):
+    SERVICE_NAME = 'codestar-notifications'
 
     def create_notification_rule(
         self, name, eventTypeIds, resource, targets, detailType, status
@@ -6,3 +6,13 @@ class ELBOptionSettings:
 
 class Route53HostedZoneId:
     EU_WEST_2 = 'Z1GKAAAUGATPF1'
+
+
+class ElasticBeanstalkEvents:
+    UPDATE_SUCCEEDED = ('Environment update completed successfully',)
+    UPDATE_FAILED = (
+        'Failed to deploy application',
+        'Environment update failed',
+        'Environment update completed, but with errors',
+    )
+    SEVERITIES_FAILED = ('ERROR', 'FATAL')
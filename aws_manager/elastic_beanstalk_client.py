@@ -1,9 +1,21 @@
-import boto3
+import concurrent.futures
+import threading
+import time
 
+from .base_client import BaseClient
 
-class ElasticBeanstalkClient:
-    def __init__(self):
-        self.client = boto3.client('elasticbeanstalk')
+
+class ElasticBeanstalkClient(BaseClient):
+    SERVICE_NAME = 'elasticbeanstalk'
+
+    def __init__(self, cacheTtl=3, watchWindow=30):
+        self.cacheTtl = cacheTtl
+        self.watchWindow = watchWindow
+        self._environments = {}
+        self._requestedAt = {}
+        self._inFlight = {}
+        self._storageLocation = None
+        self._lock = threading.Lock()
 
     def create_application(self, applicationName, description, tags):
         return self.client.create_application(
@@ -19,7 +31,7 @@ class ElasticBeanstalkClient:
         solutionStackName,
         optionSettings,
     ):
-        return self.client.create_environment(
+        response = self.client.create_environment(
             ApplicationName=applicationName,
             EnvironmentName=environmentName,
             Description=description,
@@ -27,14 +39,139 @@ class ElasticBeanstalkClient:
             SolutionStackName=solutionStackName,
             OptionSettings=optionSettings,
         )
+        self.invalidate(environmentNames=[environmentName])
+        return response
+
+    def get_storage_location(self):
+        if self._storageLocation is None:
+            self._storageLocation = self.client.create_storage_location()['S3Bucket']
+        return self._storageLocation
+
+    def get_application_version(self, applicationName, versionLabel):
+        response = self.client.describe_application_versions(
+            ApplicationName=applicationName, VersionLabels=[versionLabel]
+        )
+        versions = response['ApplicationVersions']
+        return versions[0] if versions else None
+
+    def create_application_version(
+        self, applicationName, versionLabel, description, s3Bucket, s3Key
+    ):
+        return self.client.create_application_version(
+            ApplicationName=applicationName,
+            VersionLabel=versionLabel,
+            Description=description,
+            SourceBundle={'S3Bucket': s3Bucket, 'S3Key': s3Key},
+        )
+
+    def update_environment(self, environmentName, versionLabel):
+        response = self.client.update_environment(
+            EnvironmentName=environmentName, VersionLabel=versionLabel
+        )
+        self.invalidate(environmentNames=[environmentName])
+        return response
 
-    def _get_environment_details(self, environmentName):
-        return self.client.describe_environments(EnvironmentNames=[environmentName])
+    def describe_events(self, environmentName, startTime=None, maxRecords=None):
+        arguments = {'EnvironmentName': environmentName}
+        if startTime is not None:
+            arguments['StartTime'] = startTime
+        if maxRecords is not None:
+            arguments['MaxRecords'] = maxRecords
+        events = []
+        while True:
+            response = self.client.describe_events(**arguments)
+            events.extend(response['Events'])
+            if maxRecords is not None or not response.get('NextToken'):
+                break
+            arguments['NextToken'] = response['NextToken']
+        # The API lists the newest event first
+        return sorted(events, key=lambda event: event['EventDate'])
+
+    def invalidate(self, environmentNames=None):
+        with self._lock:
+            for name in (
+                list(self._environments)
+                if environmentNames is None
+                else environmentNames
+            ):
+                self._environments.pop(name, None)
+
+    def _fetch(self, environmentNames):
+        response = self.client.describe_environments(
+            EnvironmentNames=environmentNames, IncludeDeleted=False
+        )
+        environments = {
+            environment['EnvironmentName']: environment
+            for environment in response['Environments']
+        }
+        return {name: environments.get(name) for name in environmentNames}
+
+    def describe_environments(self, environmentNames):
+        names = list(dict.fromkeys(environmentNames))
+        with self._lock:
+            now = time.monotonic()
+            for name in names:
+                self._requestedAt[name] = now
+            results = {
+                name: self._environments[name][1]
+                for name in names
+                if name in self._environments
+                and now - self._environments[name][0] < self.cacheTtl
+            }
+            waiting = {
+                name: self._inFlight[name]
+                for name in names
+                if name not in results and name in self._inFlight
+            }
+            toFetch = [
+                name for name in names if name not in results and name not in waiting
+            ]
+            if toFetch:
+                # Refresh every stale environment someone polled recently in the
+                # same call, so their next read is served from the cache
+                toFetch += [
+                    name
+                    for name, requestedAt in self._requestedAt.items()
+                    if name not in toFetch
+                    and name not in self._inFlight
+                    and now - requestedAt < self.watchWindow
+                    and now - self._environments.get(name, (float('-inf'),))[0]
+                    >= self.cacheTtl
+                ]
+                future = concurrent.futures.Future()
+                for name in toFetch:
+                    self._inFlight[name] = future
+        if toFetch:
+            try:
+                fetched = self._fetch(environmentNames=toFetch)
+            except Exception as exception:
+                with self._lock:
+                    for name in toFetch:
+                        self._inFlight.pop(name, None)
+                future.set_exception(exception)
+                raise
+            with self._lock:
+                fetchedAt = time.monotonic()
+                for name in toFetch:
+                    self._environments[name] = (fetchedAt, fetched[name])
+                    self._inFlight.pop(name, None)
+            future.set_result(fetched)
+            results.update({name: fetched[name] for name in names if name in fetched})
+        for name, inFlight in waiting.items():
+            results[name] = inFlight.result()[name]
+        return {name: results[name] for name in names if results.get(name) is not None}
+
+    def _get_environment(self, environmentName):
+        environments = self.describe_environments(environmentNames=[environmentName])
+        if environmentName not in environments:
+            raise SystemExit(f'Error: Unknown environment {environmentName}')
+        return environments[environmentName]
 
     def get_environment_health(self, environmentName):
-        response = self._get_environment_details(environmentName=environmentName)
-        return response['Environments'][0]['Health']
+        return self._get_environment(environmentName=environmentName)['Health']
+
+    def get_environment_status(self, environmentName):
+        return self._get_environment(environmentName=environmentName)['Status']
 
     def get_environment_dns(self, environmentName):
-        response = self._get_environment_details(environmentName=environmentName)
-        return response['Environments'][0]['CNAME']
+        return self._get_environment(environmentName=environmentName)['CNAME']
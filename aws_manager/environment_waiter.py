@@ -0,0 +1,72 @@
+import concurrent.futures
+import time
+
+from utils.progress import submit_in_context
+from utils.tracing import tracer
+
+
+class EnvironmentWaiter:
+    def __init__(
+        self,
+        orchestratorClient,
+        timeout=600,
+        initialPeriod=5,
+        maxPeriod=60,
+        backoff=1.5,
+        expectedHealth='Green',
+    ):
+        self.orchestratorClient = orchestratorClient
+        self.timeout = timeout
+        self.initialPeriod = initialPeriod
+        self.maxPeriod = maxPeriod
+        self.backoff = backoff
+        self.expectedHealth = expectedHealth
+
+    def _poll(self, environmentNames, onReady, executor):
+        pending = list(environmentNames)
+        lastHealth = {}
+        callbacks = []
+        period = self.initialPeriod
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            environments = self.orchestratorClient.describe_environments(
+                environmentNames=pending
+            )
+            health = {
+                name: environments.get(name, {}).get('Health') for name in pending
+            }
+            readyEnvironments = {
+                name: environments[name]
+                for name in pending
+                if health[name] == self.expectedHealth
+            }
+            if readyEnvironments:
+                pending = [name for name in pending if name not in readyEnvironments]
+                if onReady:
+                    callbacks.append(
+                        submit_in_context(executor, onReady, readyEnvironments)
+                    )
+            # Poll quickly again while environments are changing state, back off otherwise
+            if health != lastHealth:
+                period = self.initialPeriod
+            else:
+                period = min(period * self.backoff, self.maxPeriod)
+            lastHealth = health
+            remaining = deadline - time.monotonic()
+            if not pending or remaining <= 0:
+                break
+            with tracer.span('EnvironmentWaiter.sleep', category='wait'):
+                time.sleep(min(period, remaining))
+        return pending, callbacks
+
+    def wait(self, environmentNames, onReady=None):
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(environmentNames) or 1
+        ) as executor:
+            notReady, callbacks = self._poll(
+                environmentNames=environmentNames, onReady=onReady, executor=executor
+            )
+            for callback in callbacks:
+                callback.result()
+        ready = [name for name in environmentNames if name not in notReady]
+        return ready, notReady
@@ -0,0 +1,81 @@
+import time
+
+from utils.tracing import tracer
+
+from .constants import ElasticBeanstalkEvents
+
+
+class EventStream:
+    def __init__(self, orchestratorClient, environmentName, period=5):
+        self.orchestratorClient = orchestratorClient
+        self.environmentName = environmentName
+        self.period = period
+        self.cursor = None
+        self._seenAtCursor = set()
+
+    @staticmethod
+    def _key(event):
+        return (event['EventDate'], event.get('Severity'), event['Message'])
+
+    def _advance(self, events):
+        for event in events:
+            if event['EventDate'] != self.cursor:
+                self.cursor = event['EventDate']
+                self._seenAtCursor = set()
+            self._seenAtCursor.add(self._key(event))
+
+    def start(self):
+        # Only events after the latest existing one belong to this stream
+        self._advance(
+            self.orchestratorClient.describe_events(
+                environmentName=self.environmentName, maxRecords=1
+            )
+        )
+
+    def poll(self):
+        # StartTime is inclusive, events sharing the cursor date were already seen
+        events = [
+            event
+            for event in self.orchestratorClient.describe_events(
+                environmentName=self.environmentName, startTime=self.cursor
+            )
+            if self.cursor is None
+            or event['EventDate'] > self.cursor
+            or self._key(event) not in self._seenAtCursor
+        ]
+        self._advance(events)
+        return events
+
+    @staticmethod
+    def outcome(event):
+        # Instances report ERROR events before the update ends, only the
+        # completion events of the environment end it
+        message = event['Message']
+        if message.startswith(ElasticBeanstalkEvents.UPDATE_SUCCEEDED):
+            return True
+        if message.startswith(ElasticBeanstalkEvents.UPDATE_FAILED):
+            return False
+        return None
+
+    def is_ready(self):
+        environment = self.orchestratorClient.describe_environments(
+            environmentNames=[self.environmentName]
+        ).get(self.environmentName)
+        return environment is not None and environment['Status'] == 'Ready'
+
+    def follow(self, onEvent, timeout):
+        deadline = time.monotonic() + timeout
+        outcome = None
+        while True:
+            for event in self.poll():
+                onEvent(event)
+                if outcome is None:
+                    outcome = self.outcome(event)
+            # The environment only takes another update once it is Ready again
+            if outcome is not None and self.is_ready():
+                return outcome
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            with tracer.span('EventStream.sleep', category='wait'):
+                time.sleep(min(self.period, remaining))
@@ -1,16 +1,112 @@
-import boto3
+import concurrent.futures
+import threading
+import time
 
+from utils.tracing import tracer
 
-class Route53Client:
-    def __init__(self):
-        self.client = boto3.client('route53')
+from .base_client import BaseClient
 
-    def create_dns_record(self, hostedZoneId, resourceRecordSet):
-        return self.client.change_resource_record_sets(
+MAX_CHANGES_PER_BATCH = 1000
+
+
+class Route53Client(BaseClient):
+    SERVICE_NAME = 'route53'
+
+    def __init__(self, coalesceWindow=0):
+        self.coalesceWindow = coalesceWindow
+        self._pendingChanges = {}
+        self._syncedChangeIds = set()
+        self._lock = threading.Lock()
+
+    def _change_resource_record_sets(self, hostedZoneId, resourceRecordSets):
+        response = self.client.change_resource_record_sets(
             HostedZoneId=hostedZoneId,
             ChangeBatch={
                 'Changes': [
-                    {'Action': 'CREATE', 'ResourceRecordSet': resourceRecordSet},
+                    {'Action': 'UPSERT', 'ResourceRecordSet': resourceRecordSet}
+                    for resourceRecordSet in resourceRecordSets
                 ]
             },
         )
+        return response['ChangeInfo']['Id']
+
+    def _submit(self, hostedZoneId, resourceRecordSets):
+        # A batch may not change the same record twice, the latest request wins
+        latest = {
+            (recordSet['Name'], recordSet['Type']): recordSet
+            for recordSet in resourceRecordSets
+        }
+        recordSets = list(latest.values())
+        changeIds = []
+        while recordSets:
+            changeIds.append(
+                self._change_resource_record_sets(
+                    hostedZoneId=hostedZoneId,
+                    resourceRecordSets=recordSets[:MAX_CHANGES_PER_BATCH],
+                )
+            )
+            del recordSets[:MAX_CHANGES_PER_BATCH]
+        return changeIds
+
+    def upsert_records(self, hostedZoneId, resourceRecordSets):
+        if not self.coalesceWindow:
+            return self._submit(
+                hostedZoneId=hostedZoneId, resourceRecordSets=resourceRecordSets
+            )
+        # The first caller for a hosted zone waits for the window and submits
+        # the records every other caller queued meanwhile in the same batch
+        future = concurrent.futures.Future()
+        with self._lock:
+            pending = self._pendingChanges.setdefault(hostedZoneId, [])
+            pending.append((resourceRecordSets, future))
+            isSubmitter = len(pending) == 1
+        if isSubmitter:
+            time.sleep(self.coalesceWindow)
+            with self._lock:
+                pending = self._pendingChanges.pop(hostedZoneId)
+            try:
+                changeIds = self._submit(
+                    hostedZoneId=hostedZoneId,
+                    resourceRecordSets=[
+                        recordSet
+                        for recordSets, _ in pending
+                        for recordSet in recordSets
+                    ],
+                )
+            except Exception as exception:
+                for _, pendingFuture in pending:
+                    pendingFuture.set_exception(exception)
+            else:
+                for _, pendingFuture in pending:
+                    pendingFuture.set_result(changeIds)
+        return future.result()
+
+    def create_dns_record(self, hostedZoneId, resourceRecordSet):
+        return self.upsert_records(
+            hostedZoneId=hostedZoneId, resourceRecordSets=[resourceRecordSet]
+        )
+
+    def get_change_status(self, changeId):
+        return self.client.get_change(Id=changeId)['ChangeInfo']['Status']
+
+    def wait_for_changes(
+        self, changeIds, timeout=300, initialPeriod=5, maxPeriod=30, backoff=1.5
+    ):
+        pending = [
+            changeId
+            for changeId in dict.fromkeys(changeIds)
+            if changeId not in self._syncedChangeIds
+        ]
+        period = initialPeriod
+        deadline = time.monotonic() + timeout
+        while pending:
+            if self.get_change_status(changeId=pending[0]) == 'INSYNC':
+                self._syncedChangeIds.add(pending.pop(0))
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            with tracer.span('Route53Client.sleep', category='wait'):
+                time.sleep(min(period, remaining))
+            period = min(period * backoff, maxPeriod)
+        return pending
@@ -0,0 +1,12 @@
+from .base_client import BaseClient
+
+
+class S3Client(BaseClient):
+    SERVICE_NAME = 's3'
+
+    def object_exists(self, bucket, key):
+        response = self.client.list_objects_v2(Bucket=bucket, Prefix=key, MaxKeys=1)
+        return any(item['Key'] == key for item in response.get('Contents', []))
+
+    def upload_file(self, path, bucket, key):
+        return self.client.upload_file(Filename=path, Bucket=bucket, Key=key)
@@ -0,0 +1,24 @@
+import threading
+
+from utils.utils import LazyModule
+
+boto3 = LazyModule('boto3')
+
+_lock = threading.RLock()
+_session = None
+_clients = {}
+
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = boto3.session.Session()
+        return _session
+
+
+def get_client(serviceName):
+    with _lock:
+        if serviceName not in _clients:
+            _clients[serviceName] = get_session().client(serviceName)
+        return _clients[serviceName]
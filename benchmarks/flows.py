@@ -0,0 +1,470 @@
+import argparse
+import contextlib
+import datetime
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+import create_service
+import deploy
+from create_service import ServiceCreator
+from deploy import Deploy
+from models import FastAPI
+from utils.tracing import tracer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORGANISATION = 'benchmark-org'
+SERVICE = 'benchmark'
+REPO_NAME = SERVICE.capitalize()
+
+# Upper bounds checked by --check, lower them when a change removes work
+BUDGETS = {
+    'create_service': {'subprocesses': 22, 'apiCalls': 36},
+    'deploy': {'subprocesses': 9, 'apiCalls': 13},
+}
+
+FAKE_COMMANDS = {
+    'eb': '''#!/bin/sh
+sleep "${BENCHMARK_CLI_LATENCY:-0}"
+case "$1" in
+  --version) echo "EB CLI 3.20.0 (benchmark)";;
+  list) service=$(basename "$PWD" | tr A-Z a-z); echo "* $service-staging"; echo "$service-live";;
+  deploy) echo "Environment update completed successfully.";;
+esac
+''',
+    'aws': '''#!/bin/sh
+sleep "${BENCHMARK_CLI_LATENCY:-0}"
+echo "aws-cli/2.0.0 (benchmark)"
+''',
+    'ssh-keygen': '''#!/bin/sh
+sleep "${BENCHMARK_CLI_LATENCY:-0}"
+while [ $# -gt 0 ]; do
+  if [ "$1" = "-f" ]; then file=$2; fi
+  shift
+done
+echo "benchmark private key" > "$file"
+echo "ssh-ed25519 AAAAbenchmark benchmark" > "$file.pub"
+''',
+}
+
+
+class FakeClient:
+    def __init__(self, apiCalls, latency):
+        self.apiCalls = apiCalls
+        self.latency = latency
+
+    def _call(self, name, result=None):
+        self.apiCalls.append(f'{type(self).__name__}.{name}')
+        time.sleep(self.latency)
+        return result
+
+
+class FakeGithubClient(FakeClient):
+    def __init__(self, apiCalls, latency, originURL):
+        super().__init__(apiCalls=apiCalls, latency=latency)
+        self.originURL = originURL
+
+    def create_repo(self, **kwargs):
+        return self._call('create_repo')
+
+    def get_repo(self, owner, repoName):
+        return self._call('get_repo', types.SimpleNamespace(ssh_url=self.originURL))
+
+    def create_ssh_key_for_repo(self, **kwargs):
+        return self._call('create_ssh_key_for_repo')
+
+    def edit_default_branch_for_repo(self, **kwargs):
+        return self._call('edit_default_branch_for_repo')
+
+    def edit_branch_protection_rules(self, **kwargs):
+        return self._call('edit_branch_protection_rules')
+
+
+class FakeSlackClient(FakeClient):
+    def send_slack(self, channel, message, colour='#666666'):
+        return self._call('send_slack')
+
+
+class FakeCodeBuildClient(FakeClient):
+    def create_build(self, **kwargs):
+        return self._call('create_build')
+
+    def create_webhook(self, **kwargs):
+        return self._call('create_webhook')
+
+    def trigger_last_build(self):
+        return self._call('trigger_last_build')
+
+    def get_build_for_source_version(self, sourceVersion):
+        return self._call(
+            'get_build_for_source_version',
+            {'sourceVersion': sourceVersion, 'buildStatus': 'SUCCEEDED'},
+        )
+
+
+class FakeCodeStarClient(FakeClient):
+    def create_notification_rule(self, **kwargs):
+        return self._call('create_notification_rule')
+
+
+class FakeElasticBeanstalkClient(FakeClient):
+    def __init__(self, apiCalls, latency):
+        super().__init__(apiCalls=apiCalls, latency=latency)
+        self.versionLabels = {}
+        self.events = {}
+
+    def create_application(self, **kwargs):
+        return self._call('create_application')
+
+    def create_environment(self, **kwargs):
+        return self._call('create_environment')
+
+    def get_storage_location(self):
+        return self._call('get_storage_location', 'elasticbeanstalk-benchmark')
+
+    def get_application_version(self, applicationName, versionLabel):
+        return self._call('get_application_version')
+
+    def create_application_version(self, **kwargs):
+        return self._call('create_application_version')
+
+    def update_environment(self, environmentName, versionLabel):
+        self.versionLabels[environmentName] = versionLabel
+        self.events[environmentName] = [
+            {
+                'EventDate': datetime.datetime.now(datetime.timezone.utc),
+                'Severity': 'INFO',
+                'Message': 'Environment update completed successfully.',
+            }
+        ]
+        return self._call('update_environment')
+
+    def describe_events(self, environmentName, startTime=None, maxRecords=None):
+        return self._call('describe_events', self.events.pop(environmentName, []))
+
+    def describe_environments(self, environmentNames):
+        # Environments are healthy straight away so the waiter never sleeps
+        return self._call(
+            'describe_environments',
+            {
+                name: {
+                    'EnvironmentName': name,
+                    'Status': 'Ready',
+                    'Health': 'Green',
+                    'CNAME': f'{name}.eu-west-2.elasticbeanstalk.com',
+                    'VersionLabel': self.versionLabels.get(name),
+                }
+                for name in environmentNames
+            },
+        )
+
+
+class FakeS3Client(FakeClient):
+    def object_exists(self, bucket, key):
+        return self._call('object_exists', False)
+
+    def upload_file(self, path, bucket, key):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return self._call('upload_file')
+
+
+class FakeRoute53Client(FakeClient):
+    def upsert_records(self, **kwargs):
+        return self._call('upsert_records', ['/change/CBENCHMARK'])
+
+    def wait_for_changes(self, changeIds, timeout):
+        return self._call('wait_for_changes', [])
+
+
+class Sandbox:
+    def __init__(self, directory, skeletonFiles):
+        self.directory = directory
+        self.skeletonFiles = skeletonFiles
+        self.home = os.path.join(directory, 'home')
+        # create_service.py reaches ~/.ssh as ../../../.ssh from its checkout
+        self.projects = os.path.join(self.home, 'Projects', ORGANISATION)
+        self.workspace = os.path.join(self.projects, 'Flouflou')
+        self.origin = os.path.join(directory, 'origin', f'{REPO_NAME}.git')
+        self.bin = os.path.join(directory, 'bin')
+        self.journals = os.path.join(directory, 'journals')
+        self.bundles = os.path.join(directory, 'bundles')
+        self.queue = os.path.join(directory, 'deploy_queue')
+        self.history = os.path.join(directory, 'deploy_history.json')
+
+    def write(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(content)
+
+    def build(self):
+        os.makedirs(os.path.join(self.home, '.ssh'))
+        os.makedirs(self.workspace)
+        os.symlink(
+            os.path.join(BASE_DIR, 'templates'),
+            os.path.join(self.workspace, 'templates'),
+        )
+        self.write(
+            os.path.join(self.home, '.gitconfig'),
+            '[user]\n\tname = benchmark\n\temail = benchmark@example.com\n'
+            '[init]\n\tdefaultBranch = master\n',
+        )
+        for command, script in FAKE_COMMANDS.items():
+            path = os.path.join(self.bin, command)
+            self.write(path, script)
+            os.chmod(path, 0o755)
+        self.build_skeleton()
+
+    def build_skeleton(self):
+        template = FastAPI()
+        skeleton = os.path.join(self.projects, template.REPO)
+        files = {
+            '.gitignore': '__pycache__/\n.elasticbeanstalk/\n',
+            'README.md': f'# {template.REPO}\n',
+            f'app/{template.SERVICE}/__init__.py': '',
+            **{templateFile: '' for templateFile in template.TEMPLATE_FILES},
+            **{
+                f'app/{template.SERVICE}/module_{index}.py': ''
+                for index in range(self.skeletonFiles)
+            },
+        }
+        for relativePath in files:
+            self.write(
+                os.path.join(skeleton, relativePath),
+                files[relativePath]
+                or f'# {template.REPO} service {template.SERVICE}\n' * 50,
+            )
+
+    @contextlib.contextmanager
+    def activate(self, cliLatency):
+        environment = dict(os.environ)
+        cwd = os.getcwd()
+        journalsDir = create_service.JOURNALS_DIR
+        bundlesDir = deploy.BUNDLES_DIR
+        queueDir = deploy.QUEUE_DIR
+        historyFile = deploy.HISTORY_FILE
+        os.environ.update(
+            {
+                'HOME': self.home,
+                'XDG_CACHE_HOME': os.path.join(self.home, '.cache'),
+                'PATH': f'{self.bin}{os.pathsep}{os.environ.get("PATH", "")}',
+                'GIT_CONFIG_NOSYSTEM': '1',
+                'BENCHMARK_CLI_LATENCY': str(cliLatency),
+                'ORGANISATION': ORGANISATION,
+                'EMAIL': 'benchmark@example.com',
+                'KEY': 'benchmark_',
+                'AWS_ACCOUNT_ID': '000000000000',
+                'AWS_REGION': 'eu-west-2',
+                'DOMAIN_NAME': 'example.com',
+                'HOSTED_ZONE_ID': 'ZBENCHMARK',
+            }
+        )
+        os.chdir(self.workspace)
+        create_service.JOURNALS_DIR = self.journals
+        deploy.BUNDLES_DIR = self.bundles
+        deploy.QUEUE_DIR = self.queue
+        deploy.HISTORY_FILE = self.history
+        create_service.get_git_user.cache_clear()
+        try:
+            yield
+        finally:
+            create_service.JOURNALS_DIR = journalsDir
+            deploy.BUNDLES_DIR = bundlesDir
+            deploy.QUEUE_DIR = queueDir
+            deploy.HISTORY_FILE = historyFile
+            create_service.get_git_user.cache_clear()
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(environment)
+
+    def git(self, *args, cwd):
+        subprocess.check_output(['git', *args], cwd=cwd, stderr=subprocess.STDOUT)
+
+    def create_origin(self):
+        # What GitHub creates with autoInit: an initial commit on the default branch
+        seed = os.path.join(self.directory, 'seed')
+        self.git('init', '--bare', self.origin, cwd=self.directory)
+        self.git('clone', self.origin, seed, cwd=self.directory)
+        self.write(os.path.join(seed, '.gitignore'), '__pycache__/\n')
+        self.git('add', '.', cwd=seed)
+        self.git('commit', '-m', 'Initial commit', cwd=seed)
+        self.git('push', 'origin', 'master', cwd=seed)
+
+    def create_service_checkout(self):
+        checkout = os.path.join(self.projects, REPO_NAME)
+        self.git('clone', self.origin, checkout, cwd=self.directory)
+        self.git('checkout', '-b', 'develop', cwd=checkout)
+        self.write(
+            os.path.join(checkout, '.gitignore'), '__pycache__/\n.elasticbeanstalk/\n'
+        )
+        self.git('commit', '-am', 'Ignore EB CLI files', cwd=checkout)
+        self.git('push', '--set-upstream', 'origin', 'develop', cwd=checkout)
+
+
+@contextlib.contextmanager
+def silenced():
+    # git, eb and ssh-keygen write straight to the inherited descriptors
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+        os.dup2(devnull.fileno(), 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        os.close(saved[0])
+        os.close(saved[1])
+
+
+def fake_clients(sandbox, apiCalls, latency):
+    return {
+        'repoManagerClient': FakeGithubClient(
+            apiCalls=apiCalls, latency=latency, originURL=sandbox.origin
+        ),
+        'messageClient': FakeSlackClient(apiCalls=apiCalls, latency=latency),
+        'continuousIntegrationClient': FakeCodeBuildClient(
+            apiCalls=apiCalls, latency=latency
+        ),
+        'notificationClient': FakeCodeStarClient(apiCalls=apiCalls, latency=latency),
+        'orchestratorClient': FakeElasticBeanstalkClient(
+            apiCalls=apiCalls, latency=latency
+        ),
+        'dnsClient': FakeRoute53Client(apiCalls=apiCalls, latency=latency),
+        'storageClient': FakeS3Client(apiCalls=apiCalls, latency=latency),
+    }
+
+
+def prepare_create_service(sandbox):
+    sandbox.create_origin()
+
+
+def run_create_service(clients):
+    ServiceCreator(
+        user='benchmark',
+        organisation=ORGANISATION,
+        service=SERVICE,
+        framework='fast_api',
+        **clients,
+    ).run(createRepo=True, template=True, environment=True)
+
+
+def prepare_deploy(sandbox):
+    sandbox.create_origin()
+    sandbox.create_service_checkout()
+
+
+def run_deploy(clients):
+    Deploy(
+        service=REPO_NAME,
+        messageClient=clients['messageClient'],
+        continuousIntegrationClient=clients['continuousIntegrationClient'],
+        orchestratorClient=clients['orchestratorClient'],
+        storageClient=clients['storageClient'],
+    ).run(env=f'{SERVICE}-staging', isAutoDeployment=True)
+
+
+FLOWS = {
+    'create_service': (prepare_create_service, run_create_service),
+    'deploy': (prepare_deploy, run_deploy),
+}
+
+
+def measure(flow, repeat=1, apiLatency=0, cliLatency=0, skeletonFiles=50):
+    prepare, run = FLOWS[flow]
+    result = {'flow': flow, 'timings': []}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            sandbox = Sandbox(directory=directory, skeletonFiles=skeletonFiles)
+            sandbox.build()
+            with sandbox.activate(cliLatency=cliLatency):
+                prepare(sandbox)
+                apiCalls = []
+                clients = fake_clients(
+                    sandbox=sandbox, apiCalls=apiCalls, latency=apiLatency
+                )
+                with tracer.collecting(), silenced():
+                    start = time.perf_counter()
+                    run(clients)
+                    result['timings'].append(time.perf_counter() - start)
+        result['subprocesses'] = tracer.count(category='subprocess')
+        result['apiCalls'] = len(apiCalls)
+    return result
+
+
+def over_budget(result):
+    budget = BUDGETS[result['flow']]
+    return [
+        f'{result["flow"]}: {result[name]} {name} exceeds the budget of {budget[name]}'
+        for name in budget
+        if result[name] > budget[name]
+    ]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='End-to-end benchmark of the create service and deploy flows against in-memory clients'
+    )
+    parser.add_argument(
+        '--flow',
+        choices=list(FLOWS),
+        action='append',
+        help='flows to run, all by default',
+    )
+    parser.add_argument('--repeat', type=int, default=5, help='runs per flow')
+    parser.add_argument(
+        '--api-latency',
+        type=float,
+        default=0.05,
+        dest='apiLatency',
+        help='seconds every fake API call takes',
+    )
+    parser.add_argument(
+        '--cli-latency',
+        type=float,
+        default=0,
+        dest='cliLatency',
+        help='seconds every fake eb, aws and ssh-keygen command takes',
+    )
+    parser.add_argument(
+        '--skeleton-files',
+        type=int,
+        default=50,
+        dest='skeletonFiles',
+        help='extra files in the service skeleton',
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='exit with an error when a flow runs more subprocesses or API calls than its budget',
+    )
+    args = parser.parse_args()
+
+    failures = []
+    print(
+        f'{"flow":<16} {"min (ms)":>10} {"median (ms)":>12} {"subprocesses":>13} {"API calls":>10}'
+    )
+    for flow in args.flow or FLOWS:
+        result = measure(
+            flow=flow,
+            repeat=args.repeat,
+            apiLatency=args.apiLatency,
+            cliLatency=args.cliLatency,
+            skeletonFiles=args.skeletonFiles,
+        )
+        print(
+            f'{flow:<16} {min(result["timings"]) * 1000:>10.1f} '
+            f'{statistics.median(result["timings"]) * 1000:>12.1f} '
+            f'{result["subprocesses"]:>13} {result["apiCalls"]:>10}'
+        )
+        failures.extend(over_budget(result=result))
+    if args.check and failures:
+        raise SystemExit('Error: ' + '\n'.join(failures))
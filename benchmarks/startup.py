@@ -0,0 +1,74 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TYPICAL_INVOCATION = '''
+from create_service import ServiceCreator
+from deploy import Deploy
+from aws_manager import (
+    CodeBuildClient,
+    CodeStarClient,
+    ElasticBeanstalkClient,
+    Route53Client,
+)
+from messaging_manager import SlackClient
+from repo_manager import GithubClient
+
+messageClient = SlackClient()
+Deploy(
+    service='Benchmark',
+    messageClient=messageClient,
+    continuousIntegrationClient=CodeBuildClient(service='benchmark'),
+)
+ServiceCreator(
+    user='benchmark',
+    organisation='benchmark',
+    service='benchmark',
+    framework='fast_api',
+    repoManagerClient=GithubClient(token='benchmark'),
+    messageClient=messageClient,
+    continuousIntegrationClient=CodeBuildClient(service='benchmark'),
+    notificationClient=CodeStarClient(),
+    orchestratorClient=ElasticBeanstalkClient(),
+    dnsClient=Route53Client(),
+)
+'''
+
+SCENARIOS = {
+    'deploy.py --help': [sys.executable, 'deploy.py', '--help'],
+    'create_service.py --help': [sys.executable, 'create_service.py', '--help'],
+    'typical invocation': [sys.executable, '-c', TYPICAL_INVOCATION],
+    'baseline (heavy imports)': [
+        sys.executable,
+        '-c',
+        'import boto3, github, requests; boto3.session.Session()',
+    ],
+}
+
+
+def measure(command, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CLI startup benchmark')
+    parser.add_argument('--repeat', type=int, default=10, help='runs per scenario')
+    args = parser.parse_args()
+
+    print(f'{"scenario":<28} {"min (ms)":>10} {"median (ms)":>12}')
+    for name, command in SCENARIOS.items():
+        timings = measure(command=command, repeat=args.repeat)
+        print(
+            f'{name:<28} {min(timings) * 1000:>10.1f} '
+            f'{statistics.median(timings) * 1000:>12.1f}'
+        )
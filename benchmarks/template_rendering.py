@@ -0,0 +1,86 @@
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from utils import utils
+
+VALUES = {'Fincher': 'Benchmark', 'fincher': 'benchmark'}
+
+
+def build_skeleton(directory, files, lines):
+    templateFiles = []
+    for index in range(files):
+        templateFile = f'app/module_{index % 10}/fincher_{index}.py'
+        os.makedirs(
+            os.path.join(directory, os.path.dirname(templateFile)), exist_ok=True
+        )
+        with open(os.path.join(directory, templateFile), 'w') as file:
+            for line in range(lines):
+                file.write(
+                    f'from fincher.module_{line} import Fincher{line}  # fincher line {line}\n'
+                )
+        templateFiles.append(templateFile)
+    return templateFiles
+
+
+def sed_templates_to_files(templateFiles, values, cwd):
+    # Previous implementation: one sed process per key and per file plus an rm
+    for templateFile in templateFiles:
+        for originalValue, newValue in values.items():
+            subprocess.check_output(
+                ['sed', '-i_origin', f's#{originalValue}#{newValue}#g', templateFile],
+                cwd=cwd,
+            )
+        subprocess.check_output(['rm', '-f', f'{templateFile}_origin'], cwd=cwd)
+
+
+def timed(func, **kwargs):
+    start = time.perf_counter()
+    func(**kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Template rendering benchmark')
+    parser.add_argument('--files', type=int, default=200, help='template files')
+    parser.add_argument('--lines', type=int, default=2000, help='lines per file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sedDirectory = os.path.join(directory, 'sed')
+        rendererDirectory = os.path.join(directory, 'renderer')
+        templateFiles = build_skeleton(
+            directory=sedDirectory, files=args.files, lines=args.lines
+        )
+        shutil.copytree(sedDirectory, rendererDirectory)
+
+        sedTime = timed(
+            sed_templates_to_files,
+            templateFiles=templateFiles,
+            values=VALUES,
+            cwd=sedDirectory,
+        )
+        rendererTime = timed(
+            utils.templates_to_files,
+            templateFiles=templateFiles,
+            values=VALUES,
+            cwd=rendererDirectory,
+            deleteBackup=True,
+        )
+
+        for templateFile in templateFiles:
+            with open(os.path.join(sedDirectory, templateFile)) as sedFile, open(
+                os.path.join(rendererDirectory, templateFile)
+            ) as rendererFile:
+                if sedFile.read() != rendererFile.read():
+                    raise SystemExit(
+                        f'Error: rendered output differs for {templateFile}'
+                    )
+
+    print(f'{args.files} files x {args.lines} lines')
+    print(f'sed subprocesses : {sedTime * 1000:>9.1f} ms')
+    print(f'renderer         : {rendererTime * 1000:>9.1f} ms')
+    print(f'speedup          : {sedTime / rendererTime:>9.1f}x')
@@ -1,21 +1,51 @@
 import argparse
+import concurrent.futures
+import functools
+import json
 import os
 import subprocess
+import time
 
 from aws_manager import (
     CodeBuildClient,
     CodeStarClient,
     ElasticBeanstalkClient,
     ELBOptionSettings,
+    EnvironmentWaiter,
     Route53Client,
     Route53HostedZoneId,
+    S3Client,
 )
+from deploy import Deploy
 from messaging_manager import ChannelURL, Colors, SlackClient
-from models import FastAPI, JSFrameworks, PythonFrameworks, React
+from models import ApiRateLimits, FastAPI, JSFrameworks, PythonFrameworks, React
 from repo_manager import GithubClient, GitIgnoreTemplate
 from utils import utils
+from utils.daemon_client import submit
+from utils.journal import StepJournal
+from utils.materialiser import SkeletonMaterialiser
+from utils.progress import submit_in_context
+from utils.rate_limiter import RateLimitedClient, RateLimiter
+from utils.ssh_keys import SshKeyPool, add_host_alias, read_public_key, ssh_dir
+from utils.task_graph import TaskGraph
+from utils.tracing import tracer
+from utils.utils import LazyModule
+
+yaml = LazyModule('yaml')
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENVIRONMENT_READY_TIMEOUT = 600
+DNS_SYNC_TIMEOUT = 300
+DNS_COALESCE_WINDOW = 2
+STEP_WORKERS = 4
+SSH_KEY_TYPES = ['ed25519', 'rsa']
+JOURNALS_DIR = os.path.join(BASE_DIR, '.journals')
+STEP_OUTPUTS = {
+    'configure_ssh_access': ['repoURL'],
+    'create_build': ['awsAccountId', 'awsRegion'],
+    'host_service': ['environmentNames'],
+    'wait_for_environments': ['liveURL'],
+}
 
 
 class ServiceCreator:
@@ -31,6 +61,8 @@ class ServiceCreator:
         notificationClient,
         orchestratorClient,
         dnsClient,
+        storageClient=None,
+        sshKeyPool=None,
     ):
         self.user = user
         self.organisation = organisation
@@ -42,25 +74,16 @@ class ServiceCreator:
         self.notificationClient = notificationClient
         self.orchestratorClient = orchestratorClient
         self.dnsClient = dnsClient
+        self.storageClient = storageClient
+        self.sshKeyPool = sshKeyPool or SshKeyPool(comment=os.environ.get('EMAIL', ''))
 
-    def create_repo(
-        self,
-        autoInit=True,
-        description='',
-        private=True,
-        deleteBranchOnMerge=True,
-    ):
-        self.messageClient.send_slack(
-            channel=ChannelURL.DEVS,
-            message=f'{self.user} has begun the creation of service {self.service}',
-            colour=Colors.WARNING,
-        )
+    def load_framework(self):
         if self.framework in PythonFrameworks.ALL:
-            gitignoreTemplate = GitIgnoreTemplate.PYTHON
+            self.gitignoreTemplate = GitIgnoreTemplate.PYTHON
             if self.framework == 'fast_api':
                 self.template = FastAPI()
         elif self.framework in JSFrameworks.ALL:
-            gitignoreTemplate = GitIgnoreTemplate.NODE
+            self.gitignoreTemplate = GitIgnoreTemplate.NODE
             if self.framework == 'react':
                 self.template = React()
         else:
@@ -72,10 +95,23 @@ class ServiceCreator:
             raise SystemExit(
                 'Please select a valid framework (ex: react, fast_api, ...)'
             )
+
+    def create_repo(
+        self,
+        autoInit=True,
+        description='',
+        private=True,
+        deleteBranchOnMerge=True,
+    ):
+        self.messageClient.send_slack(
+            channel=ChannelURL.DEVS,
+            message=f'{self.user} has begun the creation of service {self.service}',
+            colour=Colors.WARNING,
+        )
         self.repoManagerClient.create_repo(
             repoName=self.repoName,
             organisationName=self.organisation,
-            gitignoreTemplate=gitignoreTemplate,
+            gitignoreTemplate=self.gitignoreTemplate,
             autoInit=autoInit,
             description=description,
             private=private,
@@ -87,27 +123,21 @@ class ServiceCreator:
             colour=Colors.GOOD,
         )
 
-    @staticmethod
-    def generate_ssh_key():
-        email = os.environ.get('EMAIL')
-        try:
-            return subprocess.call(['sh', './scripts/generate_ssh_key.sh', email])
-        except subprocess.CalledProcessError:
-            raise SystemExit('Error: Could not generate ssh key file.')
+    def get_ssh_key_file(self):
+        return os.path.join(ssh_dir(), f'{os.environ.get("KEY")}{self.service}')
 
-    @staticmethod
-    def get_ssh_key():
-        try:
-            key = subprocess.check_output(['cat', 'id_rsa.pub'], cwd='../../../.ssh')
-        except subprocess.CalledProcessError:
-            raise SystemExit('Error: Could not get public key generated')
-        return key.strip().decode("utf-8")
+    def generate_ssh_key(self):
+        return self.sshKeyPool.claim(path=self.get_ssh_key_file())
+
+    def get_ssh_key(self):
+        return read_public_key(path=self.get_ssh_key_file())
 
     def add_ssh_key_to_repo(self):
         key = self.get_ssh_key()
         self.repo = self.repoManagerClient.get_repo(
             owner=self.organisation, repoName=self.repoName
         )
+        self.repoURL = self.repo.ssh_url
         return self.repoManagerClient.create_ssh_key_for_repo(
             repo=self.repo, title=f'{self.user}-{self.service}-ssh-key', key=key
         )
@@ -120,7 +150,12 @@ class ServiceCreator:
         )
         try:
             return subprocess.check_output(
-                ['git', 'clone', f'{self.repo.ssh_url}'], cwd='..'
+                ['git', 'clone', f'{self.repo.ssh_url}'],
+                cwd='..',
+                env=dict(
+                    os.environ,
+                    GIT_SSH_COMMAND=f'ssh -i {self.get_ssh_key_file()} -o IdentitiesOnly=yes',
+                ),
             )
         except subprocess.CalledProcessError:
             self.messageClient.send_slack(
@@ -132,22 +167,19 @@ class ServiceCreator:
                 f'Error: Could not pull repo {self.repoName}, are you sure that the repo exists or the ssh connexion has been setup properly?'
             )
 
-    def clean_ssh_repo(self):
-        keyFile = f'{os.environ.get("KEY")}{self.service}'
-        try:
-            return subprocess.call(
-                ['sh', './scripts/clean_ssh_repo.sh', keyFile, self.repoName]
-            )
-        except subprocess.CalledProcessError:
-            self.messageClient.send_slack(
-                channel=ChannelURL.DEVS,
-                message=f'Git and CI/CD configurations for service {self.service} failed',
-                colour=Colors.DANGER,
-            )
-            raise SystemExit('Error: Could not run clean ssh repo bash script properly')
+    def add_ssh_host_alias(self):
+        add_host_alias(host=self.repoName, identityFile=self.get_ssh_key_file())
+
+    def configure_ssh_access(self, createRepo):
+        # Each service has its own key file, services provisioned concurrently
+        # never share one
+        self.generate_ssh_key()
+        self.add_ssh_key_to_repo()
+        self.add_ssh_host_alias()
+        if createRepo:
+            self.pull_repo()
 
     def update_git_config(self):
-        self.cwd = f'../{self.repoName}'
         gitCwd = f'{self.cwd}/.git'
         try:
             return subprocess.call(
@@ -186,8 +218,6 @@ class ServiceCreator:
         )
 
     def create_build(self):
-        self.awsAccountId = os.environ.get('AWS_ACCOUNT_ID')
-        self.awsRegion = os.environ.get("AWS_REGION")
         return self.continuousIntegrationClient.create_build(
             name=f'{self.service}-build',
             description='Build and test docker images',
@@ -267,19 +297,25 @@ class ServiceCreator:
     def add_template(self, template):
         if template:
             try:
-                subprocess.check_output(['rm', '-f', '.gitignore'], cwd=self.cwd)
-                subprocess.check_output(
-                    [
-                        'rsync',
-                        '-av',
-                        f'../{self.template.REPO}/.',
-                        self.cwd,
-                        '--exclude=README.md',
-                        '--exclude=.git',
-                        '--exclude=.DS_Store',
-                    ]
-                )
-            except subprocess.CalledProcessError:
+                gitignoreFile = os.path.join(self.cwd, '.gitignore')
+                if os.path.exists(gitignoreFile):
+                    os.remove(gitignoreFile)
+                SkeletonMaterialiser(
+                    source=f'../{self.template.REPO}',
+                    destination=self.cwd,
+                    renames={
+                        originalName: originalName.replace(
+                            self.template.SERVICE, self.service
+                        )
+                        for originalName in self.template.FILES_AND_REPOS
+                    },
+                    templateFiles=self.template.TEMPLATE_FILES,
+                    values={
+                        self.template.REPO: self.repoName,
+                        self.template.SERVICE: self.service,
+                    },
+                ).materialise()
+            except (OSError, ValueError):
                 self.messageClient.send_slack(
                     channel=ChannelURL.DEVS,
                     message=f'Git and CI/CD configurations for service {self.service} failed',
@@ -288,24 +324,6 @@ class ServiceCreator:
                 raise SystemExit(
                     f'Error: Could not copy and paste skeleton {self.template.REPO} in {self.cwd}'
                 )
-            utils.templates_to_files(
-                templateFiles=self.template.TEMPLATE_FILES,
-                values={
-                    self.template.REPO: self.repoName,
-                    self.template.SERVICE: self.service,
-                },
-                cwd=self.cwd,
-                deleteBackup=True,
-            )
-
-            [
-                utils.rename_file_or_folder(
-                    originalName=originalName,
-                    newName=originalName.replace(self.template.SERVICE, self.service),
-                    cwd=self.cwd,
-                )
-                for originalName in self.template.FILES_AND_REPOS
-            ]
         else:
             utils.template_to_file(
                 templateFile='buildspec.yaml',
@@ -378,14 +396,6 @@ class ServiceCreator:
                 )
                 for environmentName in self.environmentNames
             ]
-            subprocess.check_output(['mkdir', '.elasticbeanstalk'], cwd=self.cwd)
-            utils.template_to_file(
-                templateFile='eb_config.yml',
-                values={'serviceName': self.service},
-                cwd='templates',
-                destination=f'{self.cwd}/.elasticbeanstalk',
-                newTemplateFileName='config.yml',
-            )
         except Exception:
             self.messageClient.send_slack(
                 channel=ChannelURL.DEVS,
@@ -399,91 +409,389 @@ class ServiceCreator:
             colour=Colors.GOOD,
         )
 
-    def env_ready(self, environmentName, timeout, period):
-        return utils.wait_until(
-            condition=self.orchestratorClient.get_environment_health,
-            expected='Green',
-            timeout=timeout,
-            period=period,
-            environmentName=environmentName,
-        )
+    def configure_eb_cli(self):
+        try:
+            os.makedirs(f'{self.cwd}/.elasticbeanstalk', exist_ok=True)
+            return utils.template_to_file(
+                templateFile='eb_config.yml',
+                values={'serviceName': self.service},
+                cwd='templates',
+                destination=f'{self.cwd}/.elasticbeanstalk',
+                newTemplateFileName='config.yml',
+            )
+        except OSError:
+            self.messageClient.send_slack(
+                channel=ChannelURL.DEVS,
+                message=f'Failed to configure the EB CLI for service {self.service}',
+                colour=Colors.DANGER,
+            )
+            raise SystemExit(
+                f'Error: Could not write the EB CLI configuration in {self.cwd}/.elasticbeanstalk'
+            )
 
-    def create_alias_record(self):
-        for environmentName in self.environmentNames:
-            environmentType = environmentName.split(sep='-')[1]
-            self.liveURL = f'{self.service}.{os.environ.get("DOMAIN_NAME")}'
-            if self.env_ready(environmentName=environmentName, timeout=600, period=60):
-                self.dnsClient.create_dns_record(
-                    hostedZoneId=os.environ.get('HOSTED_ZONE_ID'),
-                    resourceRecordSet={
-                        'Name': self.liveURL
-                        if environmentType == 'live'
-                        else f'{environmentType}.{self.liveURL}',
-                        'Type': 'A',
-                        'AliasTarget': {
-                            'HostedZoneId': Route53HostedZoneId.EU_WEST_2,
-                            'DNSName': self.orchestratorClient.get_environment_dns(
-                                environmentName=environmentName
-                            ),
-                            'EvaluateTargetHealth': True,
-                        },
-                    },
+    def alias_record_set(self, environmentName, dnsName):
+        environmentType = environmentName.split(sep='-')[1]
+        return {
+            'Name': self.liveURL
+            if environmentType == 'live'
+            else f'{environmentType}.{self.liveURL}',
+            'Type': 'A',
+            'AliasTarget': {
+                'HostedZoneId': Route53HostedZoneId.EU_WEST_2,
+                'DNSName': dnsName,
+                'EvaluateTargetHealth': True,
+            },
+        }
+
+    def create_alias_records(self, environments):
+        return self.dnsClient.upsert_records(
+            hostedZoneId=os.environ.get('HOSTED_ZONE_ID'),
+            resourceRecordSets=[
+                self.alias_record_set(
+                    environmentName=environmentName, dnsName=environment['CNAME']
                 )
+                for environmentName, environment in environments.items()
+            ],
+        )
 
-    def deploy(self):
-        timeout = 600
-        if self.env_ready(
-            environmentName=self.environmentNames[0], timeout=timeout, period=60
-        ):
-            subprocess.check_call(
-                [
-                    'python',
-                    'deploy.py',
-                    '--service',
-                    self.repoName,
-                    '--env',
-                    self.environmentNames[0],
-                    '--auto',
-                ]
-            )
-        else:
+    def wait_for_alias_records(self, changeIds):
+        notSynced = self.dnsClient.wait_for_changes(
+            changeIds=changeIds, timeout=DNS_SYNC_TIMEOUT
+        )
+        if notSynced:
             raise SystemExit(
-                f'Environment {self.environmentNames[0]} is not ready after waiting {timeout} seconds.'
-                'Check directly environment health and try later.'
+                f'Alias records of service {self.service} are not in sync after waiting {DNS_SYNC_TIMEOUT} seconds. '
+                'Check directly the Route53 change status and try later.'
             )
+
+    def deploy(self, changeIds):
+        Deploy(
+            service=self.repoName,
+            messageClient=self.messageClient,
+            continuousIntegrationClient=self.continuousIntegrationClient,
+            orchestratorClient=self.orchestratorClient,
+            storageClient=self.storageClient,
+        ).run(env=self.environmentNames[0], isAutoDeployment=True)
+        self.wait_for_alias_records(changeIds=changeIds)
         return self.messageClient.send_slack(
             channel=ChannelURL.DEVS,
             message=f'Service {self.service} is now accessible at staging.{self.liveURL}.',
             colour=Colors.GOOD,
         )
 
-    def run(self, createRepo, template, environment):
-        self.repoName = self.service.capitalize()
-        self.user = (
-            subprocess.check_output(['git', 'config', '--get', 'user.name'])
-            .decode()
-            .strip()
+    def on_environments_ready(self, environments):
+        changeIds = self.create_alias_records(environments=environments)
+        if self.environmentNames[0] in environments:
+            self.deploy(changeIds=changeIds)
+        else:
+            self.wait_for_alias_records(changeIds=changeIds)
+
+    def wait_for_environments(self):
+        self.liveURL = f'{self.service}.{os.environ.get("DOMAIN_NAME")}'
+        waiter = EnvironmentWaiter(
+            orchestratorClient=self.orchestratorClient,
+            timeout=ENVIRONMENT_READY_TIMEOUT,
         )
+        _, notReady = waiter.wait(
+            environmentNames=self.environmentNames,
+            onReady=self.on_environments_ready,
+        )
+        if notReady:
+            raise SystemExit(
+                f'Environment {", ".join(notReady)} is not ready after waiting {ENVIRONMENT_READY_TIMEOUT} seconds. '
+                'Check directly environment health and try later.'
+            )
+
+    def build_step_graph(self, createRepo, template, environment):
+        steps = TaskGraph(maxWorkers=STEP_WORKERS)
+
+        def add_step(name, func, dependsOn=()):
+            steps.add(
+                name,
+                func,
+                dependsOn=[step for step in dependsOn if step in steps.tasks],
+            )
+
         if createRepo:
-            self.create_repo()
-        self.generate_ssh_key()
-        self.add_ssh_key_to_repo()
-        if createRepo:
-            self.pull_repo()
-        self.clean_ssh_repo()
-        self.update_git_config()
+            add_step('create_repo', self.create_repo)
+        add_step(
+            'configure_ssh_access',
+            functools.partial(self.configure_ssh_access, createRepo=createRepo),
+            dependsOn=['create_repo'],
+        )
+        add_step(
+            'update_git_config',
+            self.update_git_config,
+            dependsOn=['configure_ssh_access'],
+        )
         if createRepo:
-            self.set_default_branch()
-            self.create_build()
-            self.create_webhook()
-            self.create_build_notification()
-            self.add_template(template=template)
-            self.trigger_build()
-            self.add_branch_protection_rules()
+            add_step(
+                'set_default_branch',
+                self.set_default_branch,
+                dependsOn=['update_git_config'],
+            )
+            add_step('create_build', self.create_build, dependsOn=['create_repo'])
+            add_step('create_webhook', self.create_webhook, dependsOn=['create_build'])
+            add_step(
+                'create_build_notification',
+                self.create_build_notification,
+                dependsOn=['create_build'],
+            )
+            add_step(
+                'add_template',
+                functools.partial(self.add_template, template=template),
+                dependsOn=['set_default_branch'],
+            )
+            add_step(
+                'trigger_build',
+                self.trigger_build,
+                dependsOn=['add_template', 'create_webhook'],
+            )
+            # Protected branches would reject the skeleton push
+            add_step(
+                'add_branch_protection_rules',
+                self.add_branch_protection_rules,
+                dependsOn=['add_template', 'create_build'],
+            )
         if environment:
-            self.host_service()
-            self.create_alias_record()
-            self.deploy()
+            add_step('host_service', self.host_service, dependsOn=['create_repo'])
+            # Written after the skeleton push so it is never committed
+            add_step(
+                'configure_eb_cli',
+                self.configure_eb_cli,
+                dependsOn=['update_git_config', 'add_template'],
+            )
+            add_step(
+                'wait_for_environments',
+                self.wait_for_environments,
+                dependsOn=[
+                    'host_service',
+                    'configure_eb_cli',
+                    'trigger_build',
+                    'add_branch_protection_rules',
+                    'create_build_notification',
+                ],
+            )
+        return steps
+
+    def restore_from_journal(self):
+        for name, value in self.journal.outputs().items():
+            setattr(self, name, value)
+        if 'repoURL' in self.journal.outputs():
+            self.repo = self.repoManagerClient.get_repo(
+                owner=self.organisation, repoName=self.repoName
+            )
+
+    def record_step(self, step, result):
+        self.journal.record(
+            step=step,
+            outputs={name: getattr(self, name) for name in STEP_OUTPUTS.get(step, [])},
+        )
+
+    def run(self, createRepo, template, environment, fromStep=None):
+        self.repoName = self.service.capitalize()
+        self.cwd = f'../{self.repoName}'
+        self.awsAccountId = os.environ.get('AWS_ACCOUNT_ID')
+        self.awsRegion = os.environ.get("AWS_REGION")
+        self.user = get_git_user()
+        if createRepo:
+            self.load_framework()
+        self.steps = self.build_step_graph(
+            createRepo=createRepo, template=template, environment=environment
+        )
+        # Each mode runs different steps, a --no-repo run must not find its
+        # steps completed by the creation of the service
+        mode = '-'.join(
+            name
+            for name, enabled in [
+                ('repo', createRepo),
+                ('template', template),
+                ('environment', environment),
+            ]
+            if enabled
+        )
+        self.journal = StepJournal(
+            path=f'{JOURNALS_DIR}/{self.service}.{mode or "ssh"}.json'
+        )
+        if fromStep:
+            if fromStep not in self.steps.tasks:
+                raise SystemExit(
+                    f'Error: Unknown step {fromStep}, choose from {", ".join(self.steps.tasks)}'
+                )
+            self.journal.reset(steps=[fromStep, *self.steps.descendants(name=fromStep)])
+        completedSteps = [
+            step for step in self.journal.completed_steps() if step in self.steps.tasks
+        ]
+        if completedSteps:
+            print(
+                f'Resuming service {self.service}, skipping completed steps: {", ".join(completedSteps)}'
+            )
+            self.restore_from_journal()
+        self.steps.run(completed=completedSteps, onTaskDone=self.record_step)
+        if not self.steps.failures:
+            # Only an interrupted run is resumed, the next one starts afresh
+            self.journal.discard()
+        self.steps.raise_for_failures()
+
+
+@functools.lru_cache(maxsize=None)
+def get_git_user():
+    return (
+        subprocess.check_output(['git', 'config', '--get', 'user.name'])
+        .decode()
+        .strip()
+    )
+
+
+def load_manifest(manifestFile):
+    try:
+        with open(manifestFile) as file:
+            if manifestFile.endswith(('.yaml', '.yml')):
+                manifest = yaml.safe_load(file)
+            else:
+                manifest = json.load(file)
+    except (OSError, ValueError) as exception:
+        raise SystemExit(f'Error: Could not read manifest {manifestFile} ({exception})')
+    services = manifest.get('services') if isinstance(manifest, dict) else None
+    if not services:
+        raise SystemExit(f'Error: manifest {manifestFile} does not list any services')
+    if not isinstance(services, list):
+        raise SystemExit(
+            f'Error: services of manifest {manifestFile} must be a list of entries'
+        )
+    entries = []
+    for entry in services:
+        if not (
+            isinstance(entry, dict)
+            and isinstance(entry.get('service'), str)
+            and isinstance(entry.get('framework'), str)
+            and entry['service']
+            and entry['framework']
+        ):
+            raise SystemExit(
+                f'Error: every manifest entry needs a service and a framework, got {entry}'
+            )
+        entries.append(
+            {
+                'service': entry['service'].lower(),
+                'framework': entry['framework'].lower(),
+                'createRepo': entry.get('createRepo', True),
+                'template': entry.get('template', True),
+                'environment': entry.get('environment', False),
+                'fromStep': entry.get('fromStep'),
+            }
+        )
+    return entries
+
+
+def build_shared_clients(token, sshKeyType='ed25519'):
+    return {
+        'messageClient': tracer.trace_client(
+            client=SlackClient(asynchronous=True), category='slack'
+        ),
+        'repoManagerClient': RateLimitedClient(
+            client=tracer.trace_client(
+                client=GithubClient(token=token), category='github'
+            ),
+            rateLimiter=RateLimiter(*ApiRateLimits.GITHUB),
+        ),
+        'notificationClient': RateLimitedClient(
+            client=tracer.trace_client(client=CodeStarClient(), category='aws'),
+            rateLimiter=RateLimiter(*ApiRateLimits.CODESTAR_NOTIFICATIONS),
+        ),
+        'orchestratorClient': RateLimitedClient(
+            client=tracer.trace_client(client=ElasticBeanstalkClient(), category='aws'),
+            rateLimiter=RateLimiter(*ApiRateLimits.ELASTIC_BEANSTALK),
+        ),
+        'dnsClient': RateLimitedClient(
+            client=tracer.trace_client(
+                client=Route53Client(coalesceWindow=DNS_COALESCE_WINDOW),
+                category='aws',
+            ),
+            rateLimiter=RateLimiter(*ApiRateLimits.ROUTE53),
+        ),
+        'storageClient': tracer.trace_client(client=S3Client(), category='aws'),
+        'sshKeyPool': SshKeyPool(
+            keyType=sshKeyType, comment=os.environ.get('EMAIL', '')
+        ),
+    }
+
+
+def create_services(
+    entries,
+    organisation,
+    user,
+    concurrency,
+    token=None,
+    sharedClients=None,
+    sshKeyType='ed25519',
+):
+    sharedClients = sharedClients or build_shared_clients(
+        token=token, sshKeyType=sshKeyType
+    )
+    # Keys are generated while the repositories are created
+    sharedClients['sshKeyPool'].start_filling()
+    codeBuildRateLimiter = RateLimiter(*ApiRateLimits.CODEBUILD)
+
+    def create_service(entry):
+        start = time.monotonic()
+        serviceCreator = None
+        try:
+            serviceCreator = ServiceCreator(
+                user=user,
+                organisation=organisation,
+                service=entry['service'],
+                framework=entry['framework'],
+                continuousIntegrationClient=RateLimitedClient(
+                    client=tracer.trace_client(
+                        client=CodeBuildClient(service=entry['service']),
+                        category='aws',
+                    ),
+                    rateLimiter=codeBuildRateLimiter,
+                ),
+                **sharedClients,
+            )
+            serviceCreator.run(
+                createRepo=entry['createRepo'],
+                template=entry['template'],
+                environment=entry['environment'],
+                fromStep=entry['fromStep'],
+            )
+            status = 'created'
+        except SystemExit as exception:
+            print(f'{entry["service"]}: {exception}')
+            status = 'failed'
+        except Exception as exception:
+            # One service failing unexpectedly must not lose the others' results
+            print(f'{entry["service"]}: Error: {exception!r}')
+            status = 'failed'
+        steps = getattr(serviceCreator, 'steps', None)
+        return {
+            'service': entry['service'],
+            'framework': entry['framework'],
+            'status': status,
+            'seconds': time.monotonic() - start,
+            'failedSteps': ', '.join(steps.failures) if steps else '',
+        }
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            submit_in_context(executor, create_service, entry) for entry in entries
+        ]
+        results = [future.result() for future in futures]
+    print_summary(results=results)
+    if any(result['status'] != 'created' for result in results):
+        raise SystemExit('Error: some services could not be created')
+    return results
+
+
+def print_summary(results):
+    print(f'{"SERVICE":<24} {"FRAMEWORK":<12} {"STATUS":<8} {"TIME":>8}  FAILED STEPS')
+    for result in results:
+        print(
+            f'{result["service"]:<24} {result["framework"]:<12} {result["status"]:<8} '
+            f'{result["seconds"]:>7.0f}s  {result["failedSteps"]}'
+        )
 
 
 if __name__ == '__main__':
@@ -516,32 +824,124 @@ if __name__ == '__main__':
         help="Add this flag if we want to create an application with environments staging and live",
     )
     parser.set_defaults(environment=False)
+    parser.add_argument(
+        '--from-step',
+        type=str,
+        dest='fromStep',
+        help='rerun this step and every step depending on it even if the journal has them as completed',
+    )
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        help='JSON or YAML file listing the services to create (service, framework, createRepo, template, environment, fromStep)',
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='number of services created at the same time with --manifest',
+    )
+    parser.add_argument(
+        '--ssh-key-type',
+        type=str,
+        choices=SSH_KEY_TYPES,
+        default='ed25519',
+        help="type of the deploy keys generated for the repositories, with --daemon the daemon's own option applies",
+    )
+    parser.add_argument(
+        '--trace',
+        type=str,
+        metavar='FILE',
+        help='record timed spans of every step, command and API call as a Chrome trace in FILE',
+    )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='run the creation in the resident daemon (python daemon.py) and stream its progress',
+    )
+    parser.add_argument(
+        '--socket', type=str, help='Unix socket of the daemon used with --daemon'
+    )
     args = parser.parse_args()
+    if not args.manifest and not (args.service and args.framework):
+        parser.error('--service and --framework are required without --manifest')
 
-    service = args.service[0].lower()
-    framework = args.framework[0].lower()
     organisation = os.environ.get('ORGANISATION')
     token = os.environ.get('GITHUB_TOKEN')
     user = os.environ.get('USER')
-    repoManagerClient = GithubClient(token=token)
-    messageClient = SlackClient()
-    continuousIntegrationClient = CodeBuildClient(service=service)
-    notificationClient = CodeStarClient()
-    orchestratorClient = ElasticBeanstalkClient()
-    dnsClient = Route53Client()
-    serviceCreator = ServiceCreator(
-        user=user,
-        organisation=organisation,
-        service=service,
-        framework=framework,
-        repoManagerClient=repoManagerClient,
-        messageClient=messageClient,
-        continuousIntegrationClient=continuousIntegrationClient,
-        notificationClient=notificationClient,
-        orchestratorClient=orchestratorClient,
-        dnsClient=dnsClient,
-    )
+    if args.daemon:
+        if args.manifest:
+            entries = load_manifest(manifestFile=args.manifest)
+        else:
+            entries = [
+                {
+                    'service': args.service[0].lower(),
+                    'framework': args.framework[0].lower(),
+                    'createRepo': args.createRepo,
+                    'template': args.template,
+                    'environment': args.environment,
+                    'fromStep': args.fromStep,
+                }
+            ]
+        submit(
+            request={
+                'action': 'create',
+                'entries': entries,
+                'concurrency': args.concurrency,
+            },
+            socketPath=args.socket,
+        )
+    else:
+        with tracer.recording(traceFile=args.trace):
+            if args.manifest:
+                create_services(
+                    entries=load_manifest(manifestFile=args.manifest),
+                    organisation=organisation,
+                    token=token,
+                    user=user,
+                    concurrency=args.concurrency,
+                    sshKeyType=args.ssh_key_type,
+                )
+            else:
+                service = args.service[0].lower()
+                framework = args.framework[0].lower()
+                repoManagerClient = tracer.trace_client(
+                    client=GithubClient(token=token), category='github'
+                )
+                messageClient = tracer.trace_client(
+                    client=SlackClient(asynchronous=True), category='slack'
+                )
+                continuousIntegrationClient = tracer.trace_client(
+                    client=CodeBuildClient(service=service), category='aws'
+                )
+                notificationClient = tracer.trace_client(
+                    client=CodeStarClient(), category='aws'
+                )
+                orchestratorClient = tracer.trace_client(
+                    client=ElasticBeanstalkClient(), category='aws'
+                )
+                dnsClient = tracer.trace_client(client=Route53Client(), category='aws')
+                sshKeyPool = SshKeyPool(
+                    keyType=args.ssh_key_type, comment=os.environ.get('EMAIL', '')
+                )
+                sshKeyPool.start_filling()
+                serviceCreator = ServiceCreator(
+                    user=user,
+                    organisation=organisation,
+                    service=service,
+                    framework=framework,
+                    repoManagerClient=repoManagerClient,
+                    messageClient=messageClient,
+                    continuousIntegrationClient=continuousIntegrationClient,
+                    notificationClient=notificationClient,
+                    orchestratorClient=orchestratorClient,
+                    dnsClient=dnsClient,
+                    sshKeyPool=sshKeyPool,
+                )
 
-    serviceCreator.run(
-        createRepo=args.createRepo, template=args.template, environment=args.environment
-    )
+                serviceCreator.run(
+                    createRepo=args.createRepo,
+                    template=args.template,
+                    environment=args.environment,
+                    fromStep=args.fromStep,
+                )
@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import traceback
+
+import deploy
+from aws_manager import CodeBuildClient
+from create_service import SSH_KEY_TYPES, build_shared_clients, create_services
+from deploy import Deploy, DeployFanOut
+from utils import progress
+from utils.daemon_client import default_socket_path
+from utils.deploy_queue import DeployQueue
+
+
+class ProgressStream:
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self._buffer = ''
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        try:
+            self.wfile.write(json.dumps(message).encode() + b'\n')
+            self.wfile.flush()
+        except OSError:
+            # The client went away, the request still runs to completion
+            pass
+
+    def write(self, text):
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split('\n')
+            for line in lines:
+                self.send({'type': 'log', 'message': line})
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                self.send({'type': 'log', 'message': self._buffer})
+                self._buffer = ''
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socketPath, organisation, token, user, sshKeyType='ed25519'):
+        self.organisation = organisation
+        self.user = user
+        # Shared by every request so connections, credentials, caches and the
+        # ssh key pool stay warm
+        self.sharedClients = build_shared_clients(token=token, sshKeyType=sshKeyType)
+        super().__init__(socketPath, RequestHandler)
+
+    def deploy(self, request):
+        options = {
+            'orchestratorClient': self.sharedClients['orchestratorClient'],
+            'storageClient': self.sharedClients['storageClient'],
+            'fullRemoteUpdate': request.get('fullRemoteUpdate', False),
+            'useEbCli': request.get('useEbCli', False),
+            'recheckTools': request.get('recheckTools', False),
+            'resumable': True,
+        }
+        targets = [tuple(target) for target in request['targets']]
+        if len(targets) > 1:
+            return DeployFanOut(
+                targets=targets,
+                messageClient=self.sharedClients['messageClient'],
+                concurrency=request.get('concurrency', 4),
+                **options,
+            ).run(isAutoDeployment=True)
+        [(service, env)] = targets
+        deploy = Deploy(
+            service=service,
+            messageClient=self.sharedClients['messageClient'],
+            continuousIntegrationClient=CodeBuildClient(service=service.lower()),
+            **options,
+        )
+        if request.get('rollback') is not None:
+            return deploy.rollback(
+                env=env, label=request['rollback'], isAutoDeployment=True
+            )
+        return deploy.run(env=env, isAutoDeployment=True)
+
+    def resume_deploys(self):
+        # Deploys a previous daemon had queued or running when it stopped
+        for job in DeployQueue(directory=deploy.QUEUE_DIR).orphaned_jobs():
+            print(f'Resuming the deploy of {job["service"]} to {job["environment"]}')
+            threading.Thread(
+                target=self.run_resumed_deploy, args=(job['request'],), daemon=True
+            ).start()
+
+    def run_resumed_deploy(self, request):
+        try:
+            self.deploy(request=request)
+        except SystemExit as exception:
+            print(exception)
+
+    def create(self, request):
+        return create_services(
+            entries=request['entries'],
+            organisation=self.organisation,
+            user=self.user,
+            concurrency=request.get('concurrency', 4),
+            sharedClients=self.sharedClients,
+        )
+
+
+ACTIONS = {'deploy': Daemon.deploy, 'create': Daemon.create}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        stream = ProgressStream(wfile=self.wfile)
+        try:
+            request = json.loads(self.rfile.readline())
+            action = ACTIONS[request['action']]
+        except (ValueError, KeyError) as exception:
+            return stream.send(
+                {
+                    'type': 'result',
+                    'status': 'error',
+                    'message': f'Error: invalid request ({exception})',
+                }
+            )
+        status, message = 'ok', ''
+        with progress.routed_to(stream):
+            try:
+                action(self.server, request)
+            except SystemExit as exception:
+                status, message = 'error', str(exception)
+            except Exception:
+                status, message = 'error', traceback.format_exc()
+            stream.flush()
+        stream.send({'type': 'result', 'status': status, 'message': message})
+
+
+def serve(socketPath, sshKeyType='ed25519'):
+    os.makedirs(os.path.dirname(socketPath), exist_ok=True)
+    if os.path.exists(socketPath):
+        os.remove(socketPath)
+    progress.install()
+    # Only the user running the daemon may connect to the socket
+    umask = os.umask(0o077)
+    try:
+        server = Daemon(
+            socketPath=socketPath,
+            organisation=os.environ.get('ORGANISATION'),
+            token=os.environ.get('GITHUB_TOKEN'),
+            user=os.environ.get('USER'),
+            sshKeyType=sshKeyType,
+        )
+    finally:
+        os.umask(umask)
+    print(f'Listening on {socketPath}')
+    server.resume_deploys()
+    server.sharedClients['sshKeyPool'].start_filling()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(socketPath)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Resident deploy and service creation daemon'
+    )
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=default_socket_path(),
+        help='Unix socket the daemon listens on',
+    )
+    parser.add_argument(
+        '--ssh-key-type',
+        type=str,
+        choices=SSH_KEY_TYPES,
+        default='ed25519',
+        help='type of the deploy keys the daemon pre-generates for new repositories',
+    )
+    args = parser.parse_args()
+    try:
+        serve(socketPath=args.socket, sshKeyType=args.ssh_key_type)
+    except KeyboardInterrupt:
+        pass
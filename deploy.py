@@ -1,19 +1,97 @@
 import argparse
+import collections
+import concurrent.futures
+import contextlib
+import copy
+import functools
 import os
+import re
 import subprocess
-
-import requests
-
-from aws_manager import CodeBuildClient
+import threading
+import time
+
+from aws_manager import (
+    CodeBuildClient,
+    ElasticBeanstalkClient,
+    ElasticBeanstalkEvents,
+    EventStream,
+    S3Client,
+)
 from messaging_manager import ChannelURL, Colors, SlackClient
 from models import BColors
+from utils.daemon_client import submit
+from utils.deploy_history import DeployHistory, previous_label
+from utils.deploy_queue import DeployQueue
+from utils.git_snapshot import load_git_snapshot
+from utils.progress import submit_in_context
+from utils.task_graph import TaskGraph
+from utils.tool_probe import ToolProbeCache
+from utils.tracing import tracer
+from utils.utils import LazyModule
+
+boto3 = LazyModule('boto3')
+botocore = LazyModule('botocore')
+requests = LazyModule('requests')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLES_DIR = os.path.join(BASE_DIR, '.bundles')
+BUNDLES_KEPT = 5
+QUEUE_DIR = os.path.join(BASE_DIR, '.deploy_queue')
+HISTORY_FILE = os.path.join(BASE_DIR, '.deploy_history.json')
+# Labels are <branch>-<short hash>-<commit time>
+MASTER_LABEL = re.compile(r'master-[0-9a-f]+-\d+')
+DEPLOY_TIMEOUT = 1200
+DEPLOY_POLL_PERIOD = 5
+EVENT_COLOURS = {'WARN': Colors.WARNING, 'ERROR': Colors.DANGER, 'FATAL': Colors.DANGER}
+PREFLIGHT_WORKERS = 8
+DEPENDENCIES = [('eb', 'EB'), ('git', 'Git'), ('aws', 'aws')]
+
+
+@contextlib.contextmanager
+def aws_errors(action):
+    # boto3 raises its own exceptions where the EB CLI exited with an error code
+    try:
+        yield
+    except (
+        botocore.exceptions.ClientError,
+        botocore.exceptions.BotoCoreError,
+        boto3.exceptions.Boto3Error,
+    ) as exception:
+        raise SystemExit(
+            f'Error: AWS request failed while trying to {action} ({exception})'
+        )
 
 
 class Deploy:
-    def __init__(self, service, messageClient, continuousIntegrationClient):
+    def __init__(
+        self,
+        service,
+        messageClient,
+        continuousIntegrationClient,
+        orchestratorClient=None,
+        storageClient=None,
+        logPrefix='',
+        fullRemoteUpdate=False,
+        useEbCli=False,
+        recheckTools=False,
+        resumable=False,
+    ):
         self.service = service
         self.messageClient = messageClient
         self.continuousIntegrationClient = continuousIntegrationClient
+        self.orchestratorClient = orchestratorClient or ElasticBeanstalkClient()
+        self.storageClient = storageClient or S3Client()
+        self.logPrefix = logPrefix
+        self.fullRemoteUpdate = fullRemoteUpdate
+        self.useEbCli = useEbCli
+        self.recheckTools = recheckTools
+        self.resumable = resumable
+        self.toolProbes = ToolProbeCache()
+        self.deployQueue = DeployQueue(directory=QUEUE_DIR)
+        self.deployHistory = DeployHistory(path=HISTORY_FILE)
+
+    def log(self, message):
+        print(f'{self.logPrefix}{message}')
 
     def use_shell(self):
         return os.name == 'nt'
@@ -38,20 +116,42 @@ class Deploy:
             )
         except subprocess.CalledProcessError:
             raise SystemExit(
-                f'Error: Could not go to service {service} and execute the command, are you sure the service exists or is in WhatsTheFilms folder?'
+                f'Error: Could not go to service {self.service} and execute the command, are you sure the service exists or is in WhatsTheFilms folder?'
             )
 
     def get_environments(self):
         try:
             envs = self.run_command('eb', 'list')
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, OSError):
             raise SystemExit(
                 'Error: Could not read environments from EB, have you run the "aws configure" and "eb init" commands?'
             )
         return [x.lstrip('* ') for x in envs.split(self.get_new_line())]
 
+    def run_streamed_command(self, *args):
+        with tracer.span(f'subprocess: {" ".join(args)}', category='subprocess'):
+            return self._run_streamed_command(*args)
+
+    def _run_streamed_command(self, *args):
+        process = subprocess.Popen(
+            args=args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=self.use_shell(),
+            cwd=f'../{self.service}',
+        )
+        with process.stdout:
+            for line in process.stdout:
+                self.log(line.decode().rstrip())
+        returnCode = process.wait()
+        if returnCode:
+            raise subprocess.CalledProcessError(returnCode, args)
+
+    def load_git_snapshot(self):
+        self.gitSnapshot = load_git_snapshot(runCommand=self.run_command)
+
     def get_current_branch(self):
-        return self.run_command('git', 'rev-parse', '--abbrev-ref', 'HEAD')
+        return self.gitSnapshot.branch
 
     def get_current_user(self):
         try:
@@ -61,32 +161,33 @@ class Deploy:
                 'Error: Could not read user name from git, have you set config for user name?'
             )
 
-    def load_context(self):
+    def load_branch(self):
         self.branch = self.get_current_branch()
         self.branchNoSlashes = self.branch.replace('/', '-')
-        print(f'Current branch: {BColors.WARNING}{self.branch}{BColors.ENDC}')
+        self.log(f'Current branch: {BColors.WARNING}{self.branch}{BColors.ENDC}')
+
+    def load_user(self):
         self.user = self.get_current_user()
-        print('Current user', self.user)
+        self.log(f'Current user {self.user}')
 
-    def check_for_dependencies(self):
-        try:
-            version = self.run_command('eb', '--version')
-        except subprocess.CalledProcessError:
-            raise SystemExit('Error: Could not find the EB command')
-        print(f'Found EB tools: {version}')
-        try:
-            version = self.run_command('git', '--version')
-        except subprocess.CalledProcessError:
-            raise SystemExit('Error: Could not find the Git command')
-        print(f'Found Git tools: {version}')
+    def check_for_dependency(self, command, toolName):
         try:
-            version = self.run_command('aws', '--version')
-        except subprocess.CalledProcessError:
-            raise SystemExit('Error: Could not find the aws command')
-        print(f'Found aws tools: {version}')
+            version = self.toolProbes.probe(
+                command=command,
+                probe=functools.partial(self.run_command, command, '--version'),
+                recheck=self.recheckTools,
+            )
+        except (subprocess.CalledProcessError, OSError):
+            raise SystemExit(f'Error: Could not find the {toolName} command')
+        self.log(f'Found {toolName} tools: {version}')
+
+    def load_environments(self):
+        self.availableEnvironments = self.get_environments()
 
     def check_environment(self, env):
-        envs = self.get_environments()
+        if not hasattr(self, 'availableEnvironments'):
+            self.load_environments()
+        envs = self.availableEnvironments
         self.environment = env
         if self.environment not in envs:
             raise SystemExit(
@@ -103,19 +204,48 @@ class Deploy:
             )
 
     def check_clean_repo(self):
-        output = self.run_command('git', 'status', '--porcelain')
-        if output:
+        if self.gitSnapshot.isDirty:
             raise SystemExit(
                 'Error: Git repo is not clean, new or modified files exist'
             )
 
-    def check_up_to_date(self):
+    def update_remote(self):
         self.run_command('git', 'remote', 'update')
-        self.localHash = self.run_command('git', 'rev-parse', self.branch)
 
+    def load_local_hash(self):
+        self.localHash = self.gitSnapshot.headHash
+
+    def get_remote_hash_with_ls_remote(self):
+        # Asks origin for this one branch without fetching any objects, None
+        # when the remote could not be queried
         try:
-            remoteHash = self.run_command('git', 'rev-parse', f'origin/{self.branch}')
-        except subprocess.CalledProcessError:
+            output = self.run_command(
+                'git', 'ls-remote', '--heads', 'origin', f'refs/heads/{self.branch}'
+            )
+        except (SystemExit, OSError):
+            return None
+        return output.split()[0] if output else ''
+
+    def get_remote_hash_with_update(self):
+        self.update_remote()
+        try:
+            return self.run_command('git', 'rev-parse', f'origin/{self.branch}')
+        except SystemExit:
+            return ''
+
+    def get_remote_hash(self):
+        if not self.fullRemoteUpdate:
+            remoteHash = self.get_remote_hash_with_ls_remote()
+            if remoteHash is not None:
+                return remoteHash
+            self.log(
+                'Could not query origin directly, falling back to a full remote update'
+            )
+        return self.get_remote_hash_with_update()
+
+    def check_up_to_date(self):
+        remoteHash = self.get_remote_hash()
+        if not remoteHash:
             raise SystemExit(
                 'Error: Could not find the hash for the remote branch, have you pushed your changes?'
             )
@@ -125,8 +255,11 @@ class Deploy:
                 f'Error: Local and remote versions of the {self.branch} branch do not match, have you pushed your changes?'
             )
 
+    def check_build_status(self):
         try:
-            commitShas = self.continuousIntegrationClient.get_source_versions()
+            build = self.continuousIntegrationClient.get_build_for_source_version(
+                sourceVersion=self.localHash
+            )
         except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise SystemExit(
                 'Error: failed to get builds information from AWS CodeBuild, connection issue or timeout'
@@ -136,15 +269,13 @@ class Deploy:
                 f'Error: failed to get builds information from AWS CodeBuild, error response to HTTP request ({e})'
             )
 
-        if self.localHash not in commitShas:
+        if build is None:
             raise SystemExit(
                 'Error: commit hash for CodeBuild build does not match in the hashes list, '
                 f'expected to find: {self.localHash}'
             )
 
-        state = self.continuousIntegrationClient.get_status_for_source_version(
-            sourceVersion=self.localHash
-        )
+        state = build['buildStatus']
         if state != 'SUCCEEDED':
             raise SystemExit(
                 'Error: state for CodeBuild build does not match, '
@@ -152,36 +283,137 @@ class Deploy:
             )
 
     def generate_label(self):
-        shortHashAndTime = self.run_command(
-            'git', 'log', '-1', '--format=%h-%cd', '--date=format:%Y%m%d%H%M%S'
-        )
-        self.label = f'{self.branchNoSlashes}-{shortHashAndTime}'
+        self.label = f'{self.branchNoSlashes}-{self.gitSnapshot.shortHashAndTime}'
 
     def check_user_confirmation(self):
         print(
             f'You are going to deploy {BColors.WARNING}{self.branch}{BColors.ENDC} to the {BColors.OKGREEN}{self.environment}{BColors.ENDC} '
             f'environment with label {self.label}'
         )
-        while True:
-            print('Are you sure you want to continue (y/n) => ', end='')
-            response = input().lower()
-            if response == 'n':
-                raise SystemExit('Deploy process exited on user request')
-            if response == 'y':
-                break
-            print('Unrecognised answer, please enter "y" or "n"')
+        ask_user_confirmation()
+
+    def get_application_name(self):
+        return self.service.lower()
+
+    def get_bundle(self):
+        # git archive of the commit, the same bundle serves every environment
+        directory = os.path.join(BUNDLES_DIR, self.get_application_name())
+        bundle = os.path.join(directory, f'{self.localHash}.zip')
+        if os.path.exists(bundle):
+            return bundle
+        os.makedirs(directory, exist_ok=True)
+        temporaryBundle = f'{bundle}.{os.getpid()}.tmp'
+        self.run_command(
+            'git',
+            'archive',
+            '--format=zip',
+            f'--output={temporaryBundle}',
+            self.localHash,
+        )
+        os.replace(temporaryBundle, bundle)
+        bundles = sorted(
+            (
+                os.path.join(directory, name)
+                for name in os.listdir(directory)
+                if name.endswith('.zip')
+            ),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for oldBundle in bundles[BUNDLES_KEPT:]:
+            os.remove(oldBundle)
+        return bundle
+
+    def create_application_version(self):
+        applicationName = self.get_application_name()
+        if self.orchestratorClient.get_application_version(
+            applicationName=applicationName, versionLabel=self.label
+        ):
+            self.log(f'Application version {self.label} already exists, reusing it')
+            return
+        bucket = self.orchestratorClient.get_storage_location()
+        key = f'{applicationName}/{self.localHash}.zip'
+        if self.storageClient.object_exists(bucket=bucket, key=key):
+            self.log(f'Bundle for {self.localHash} already uploaded, reusing it')
+        else:
+            self.log(f'Uploading bundle for {self.localHash}')
+            self.storageClient.upload_file(
+                path=self.get_bundle(), bucket=bucket, key=key
+            )
+        self.orchestratorClient.create_application_version(
+            applicationName=applicationName,
+            versionLabel=self.label,
+            description=f'{self.branch} at {self.localHash}',
+            s3Bucket=bucket,
+            s3Key=key,
+        )
 
-    def do_deployment(self):
-        print('Starting deployment process')
+    def report_event(self, event):
+        severity = event.get('Severity', 'INFO')
+        self.log(f'{event["EventDate"]:%H:%M:%S} {severity:<5} {event["Message"]}')
+        self.messageClient.send_slack(
+            channel=ChannelURL.DEVS,
+            message=f'{self.environment}: {event["Message"]}',
+            colour=EVENT_COLOURS.get(severity, Colors.DEFAULT),
+        )
+        if severity in ElasticBeanstalkEvents.SEVERITIES_FAILED:
+            self.errorEvents.append(event)
+        self.lastEvent = event
+
+    def deploy_application_version(self):
+        self.create_application_version()
+        self.switch_application_version()
+
+    def switch_application_version(self):
+        self.log(f'Deploying application version {self.label}')
+        events = EventStream(
+            orchestratorClient=self.orchestratorClient,
+            environmentName=self.environment,
+            period=DEPLOY_POLL_PERIOD,
+        )
+        events.start()
+        self.orchestratorClient.update_environment(
+            environmentName=self.environment, versionLabel=self.label
+        )
+        self.lastEvent = None
+        self.errorEvents = []
+        succeeded = events.follow(onEvent=self.report_event, timeout=DEPLOY_TIMEOUT)
+        if succeeded is None:
+            raise SystemExit(
+                f'Error: environment {self.environment} did not finish updating '
+                f'after waiting {DEPLOY_TIMEOUT} seconds, check the deployment status directly'
+            )
+        if not succeeded:
+            # The completion event only says the update failed, the first error says why
+            cause = (self.errorEvents or [self.lastEvent])[0]
+            raise SystemExit(
+                f'Error: deployment of {self.label} to the {self.environment} environment failed: '
+                f'{cause["Message"]}'
+            )
 
+    def deploy_with_eb_cli(self):
         try:
-            print('Setting the correct EB environment for deploy')
-            self.run_command('eb', 'use', self.environment)
+            self.log('Running the deploy command')
+            self.run_streamed_command(
+                'eb', 'deploy', '-l', self.label, '--timeout', str(DEPLOY_TIMEOUT)
+            )
         except subprocess.CalledProcessError:
             raise SystemExit(
-                'Error: unable to set the correct EB environment, aborting'
+                'Error: deploy command exited with an error code, check the deployment status directly'
             )
 
+    def do_deployment(self):
+        self.log('Starting deployment process')
+
+        if self.useEbCli:
+            try:
+                self.log('Setting the correct EB environment for deploy')
+                self.run_command('eb', 'use', self.environment)
+            except subprocess.CalledProcessError:
+                raise SystemExit(
+                    'Error: unable to set the correct EB environment, aborting'
+                )
+
         self.messageClient.send_slack(
             channel=ChannelURL.DEVS,
             message=f'{self.user} has begun the deployment of {self.branch} to the '
@@ -190,21 +422,21 @@ class Deploy:
         )
 
         try:
-            print('Running the deploy command')
-            subprocess.check_call(
-                ['eb', 'deploy', '-l', self.label, '--timeout', '1200'],
-                cwd=f'../{self.service}',
-            )
-        except subprocess.CalledProcessError:
+            if self.useEbCli:
+                self.deploy_with_eb_cli()
+            else:
+                with aws_errors(
+                    action=f'deploy {self.label} to the {self.environment} environment'
+                ):
+                    self.deploy_application_version()
+        except SystemExit:
             self.messageClient.send_slack(
                 channel=ChannelURL.DEVS,
                 message=f'Deployment of {self.branch} to the {self.environment} environment with label '
                 f'{self.label} ended with error status, check the deployment status directly',
                 colour=Colors.DANGER,
             )
-            raise SystemExit(
-                'Error: deploy command exited with an error code, check the deployment status directly'
-            )
+            raise
 
         self.messageClient.send_slack(
             channel=ChannelURL.DEVS,
@@ -212,20 +444,389 @@ class Deploy:
             f'{self.label} completed successfully',
             colour=Colors.GOOD,
         )
-        print('Deployment completed successfully')
+        self.deployHistory.record(
+            environment=self.environment, label=self.label, user=self.user
+        )
+        self.log('Deployment completed successfully')
+
+    def load_current_label(self):
+        environment = self.orchestratorClient.describe_environments(
+            environmentNames=[self.environment]
+        ).get(self.environment)
+        if environment is None:
+            raise SystemExit(f'Error: Unknown environment {self.environment}')
+        self.currentLabel = environment.get('VersionLabel')
+        self.log(f'Current label: {self.currentLabel}')
+
+    def load_deployments(self):
+        entries = self.deployHistory.entries(environment=self.environment)
+        if entries:
+            return entries
+        # Deployments from another machine, e.g. the CI runner, are only
+        # known to EB, which keeps the events of the last weeks
+        events = self.orchestratorClient.describe_events(
+            environmentName=self.environment
+        )
+        return [
+            {'label': event['VersionLabel'], 'rolledBack': False}
+            for event in reversed(events)
+            if event.get('VersionLabel')
+            and event['Message'].startswith(ElasticBeanstalkEvents.UPDATE_SUCCEEDED)
+        ]
+
+    def load_rollback_label(self, label):
+        deployments = self.load_deployments()
+        if not label:
+            label = previous_label(entries=deployments, currentLabel=self.currentLabel)
+            if label is None:
+                raise SystemExit(
+                    f'Error: no previous deployment of the {self.environment} environment '
+                    'is recorded, pass the label to roll back to'
+                )
+        if label == self.currentLabel:
+            raise SystemExit(
+                f'Error: the {self.environment} environment is already running {label}'
+            )
+        # Rolling back skips the deploy checks, only a version the environment
+        # already ran may go back on it
+        if label not in {deployment['label'] for deployment in deployments}:
+            raise SystemExit(
+                f'Error: {label} was never deployed to the {self.environment} environment'
+            )
+        if (
+            self.environment == f'{self.service.lower()}-live'
+            and not MASTER_LABEL.fullmatch(label)
+        ):
+            raise SystemExit(
+                'Error: Only the master branch may be deployed to the live environment'
+            )
+        if not self.orchestratorClient.get_application_version(
+            applicationName=self.get_application_name(), versionLabel=label
+        ):
+            raise SystemExit(
+                f'Error: application version {label} does not exist, it may have been deleted'
+            )
+        self.label = label
 
-    def run(self, env, isAutoDeployment):
+    def check_rollback_confirmation(self):
+        print(
+            f'You are going to roll back the {BColors.OKGREEN}{self.environment}{BColors.ENDC} '
+            f'environment from {self.currentLabel} to {BColors.WARNING}{self.label}{BColors.ENDC}'
+        )
+        ask_user_confirmation()
+
+    def do_rollback(self):
+        self.messageClient.send_slack(
+            channel=ChannelURL.DEVS,
+            message=f'{self.user} has begun the rollback of the {self.environment} environment '
+            f'from {self.currentLabel} to {self.label}',
+            colour=Colors.WARNING,
+        )
+
+        try:
+            with aws_errors(
+                action=f'roll back the {self.environment} environment to {self.label}'
+            ):
+                self.switch_application_version()
+        except SystemExit:
+            self.messageClient.send_slack(
+                channel=ChannelURL.DEVS,
+                message=f'Rollback of the {self.environment} environment to {self.label} '
+                'ended with error status, check the deployment status directly',
+                colour=Colors.DANGER,
+            )
+            raise
+
+        self.messageClient.send_slack(
+            channel=ChannelURL.DEVS,
+            message=f'Rollback of the {self.environment} environment to {self.label} '
+            'completed successfully',
+            colour=Colors.GOOD,
+        )
+        self.deployHistory.record(
+            environment=self.environment,
+            label=self.label,
+            user=self.user,
+            rollbackFrom=self.currentLabel,
+        )
+        self.log('Rollback completed successfully')
+
+    def add_dependency_checks(self, preflight):
+        for command, toolName in DEPENDENCIES:
+            preflight.add(
+                f'check_{command}',
+                functools.partial(
+                    self.check_for_dependency, command=command, toolName=toolName
+                ),
+            )
+
+    def add_repository_checks(self, preflight, prefix=''):
+        preflight.add(f'{prefix}load_environments', self.load_environments)
+        preflight.add(f'{prefix}load_git_snapshot', self.load_git_snapshot)
+        preflight.add(
+            f'{prefix}load_branch',
+            self.load_branch,
+            dependsOn=[f'{prefix}load_git_snapshot'],
+        )
+        preflight.add(f'{prefix}load_user', self.load_user)
+        preflight.add(
+            f'{prefix}check_clean_repo',
+            self.check_clean_repo,
+            dependsOn=[f'{prefix}load_git_snapshot'],
+        )
+        preflight.add(
+            f'{prefix}load_local_hash',
+            self.load_local_hash,
+            dependsOn=[f'{prefix}load_git_snapshot'],
+        )
+        preflight.add(
+            f'{prefix}check_up_to_date',
+            self.check_up_to_date,
+            dependsOn=[f'{prefix}load_branch', f'{prefix}load_local_hash'],
+        )
+        preflight.add(
+            f'{prefix}check_build_status',
+            self.check_build_status,
+            dependsOn=[f'{prefix}load_local_hash'],
+        )
+        preflight.add(
+            f'{prefix}generate_label',
+            self.generate_label,
+            dependsOn=[f'{prefix}load_branch'],
+        )
+
+    def preflight(self, env):
         self.use_shell()
-        self.check_for_dependencies()
-        self.check_environment(env=env)
-        self.load_context()
-        self.check_live_environment_protection()
-        self.check_clean_repo()
-        self.check_up_to_date()
-        self.generate_label()
+        preflight = TaskGraph(maxWorkers=PREFLIGHT_WORKERS)
+        self.add_dependency_checks(preflight=preflight)
+        self.add_repository_checks(preflight=preflight)
+        preflight.add(
+            'check_environment',
+            functools.partial(self.check_environment, env=env),
+            dependsOn=['load_environments'],
+        )
+        preflight.add(
+            'check_live_environment_protection',
+            self.check_live_environment_protection,
+            dependsOn=['check_environment', 'load_branch'],
+        )
+        preflight.run()
+        preflight.raise_for_failures()
+
+    def queue_request(self):
+        # What a restarted daemon needs to run this deploy again
+        return {
+            'action': 'deploy',
+            'targets': [[self.service, self.environment]],
+            'fullRemoteUpdate': self.fullRemoteUpdate,
+            'useEbCli': self.useEbCli,
+            'recheckTools': self.recheckTools,
+        }
+
+    def do_queued(self, deployment, branch, commitTime, request, skipMessage):
+        jobId = self.deployQueue.enqueue(
+            service=self.service,
+            environment=self.environment,
+            branch=branch,
+            commitTime=commitTime,
+            request=request if self.resumable else None,
+        )
+        with self.deployQueue.turn(
+            jobId=jobId, environment=self.environment
+        ) as isCurrent:
+            if not isCurrent:
+                self.log(skipMessage)
+                return False
+            deployment()
+        return True
+
+    def do_queued_deployment(self):
+        return self.do_queued(
+            deployment=self.do_deployment,
+            branch=self.branch,
+            commitTime=self.gitSnapshot.shortHashAndTime.rsplit('-', 1)[-1],
+            request=self.queue_request(),
+            skipMessage=f'Skipping {self.label}, a newer commit of {self.branch} is queued '
+            f'for the {self.environment} environment',
+        )
+
+    def do_queued_rollback(self):
+        # Rollbacks of an environment coalesce like commits of a branch, the
+        # latest request wins
+        return self.do_queued(
+            deployment=self.do_rollback,
+            branch=None,
+            commitTime=f'{time.time():020.6f}',
+            request=dict(self.queue_request(), rollback=self.label),
+            skipMessage=f'Skipping the rollback to {self.label}, a newer rollback is queued '
+            f'for the {self.environment} environment',
+        )
+
+    def run(self, env, isAutoDeployment):
+        with tracer.span('preflight'):
+            self.preflight(env=env)
         if not isAutoDeployment:
-            self.check_user_confirmation()
-        self.do_deployment()
+            with tracer.span('check_user_confirmation'):
+                self.check_user_confirmation()
+        with tracer.span('do_deployment'):
+            self.do_queued_deployment()
+
+    def rollback(self, env, label, isAutoDeployment):
+        # Switches the environment to an application version EB already
+        # holds, nothing is checked, built or uploaded
+        self.environment = env
+        with tracer.span('load_rollback'), aws_errors(
+            action=f'roll back the {self.environment} environment'
+        ):
+            self.load_user()
+            self.load_current_label()
+            self.load_rollback_label(label=label)
+        if not isAutoDeployment:
+            with tracer.span('check_user_confirmation'):
+                self.check_rollback_confirmation()
+        with tracer.span('do_rollback'):
+            self.do_queued_rollback()
+
+
+class DeployFanOut:
+    def __init__(self, targets, messageClient, concurrency, **deployOptions):
+        self.targets = list(dict.fromkeys(targets))
+        self.services = list(dict.fromkeys(service for service, _ in self.targets))
+        self.messageClient = messageClient
+        self.concurrency = concurrency
+        self.deployOptions = deployOptions
+        self.deploys = {}
+        self.statuses = {target: 'skipped' for target in self.targets}
+        self.serviceLocks = collections.defaultdict(threading.Lock)
+
+    def target_deploy(self, service, env):
+        deploy = copy.copy(self.deploys[service])
+        deploy.logPrefix = f'[{service}/{env}] '
+        return deploy
+
+    def check_target(self, service, env):
+        deploy = self.target_deploy(service=service, env=env)
+        deploy.check_environment(env=env)
+        deploy.check_live_environment_protection()
+
+    def preflight(self):
+        preflight = TaskGraph(maxWorkers=PREFLIGHT_WORKERS)
+        for service in self.services:
+            deploy = Deploy(
+                service=service,
+                messageClient=self.messageClient,
+                continuousIntegrationClient=tracer.trace_client(
+                    client=CodeBuildClient(service=service.lower()), category='aws'
+                ),
+                logPrefix=f'[{service}] ',
+                **self.deployOptions,
+            )
+            self.deploys[service] = deploy
+            deploy.add_repository_checks(preflight=preflight, prefix=f'{service}:')
+        # The tools are shared by every target, probe them once
+        self.deploys[self.services[0]].add_dependency_checks(preflight=preflight)
+        for service, env in self.targets:
+            preflight.add(
+                f'{service}/{env}:check_environment',
+                functools.partial(self.check_target, service=service, env=env),
+                dependsOn=[f'{service}:load_environments', f'{service}:load_branch'],
+            )
+        preflight.run()
+        preflight.raise_for_failures()
+
+    def check_user_confirmation(self):
+        print('You are going to deploy:')
+        for service, env in self.targets:
+            deploy = self.deploys[service]
+            print(
+                f'  {BColors.WARNING}{deploy.branch}{BColors.ENDC} of {service} to the '
+                f'{BColors.OKGREEN}{env}{BColors.ENDC} environment with label {deploy.label}'
+            )
+        ask_user_confirmation()
+
+    def deploy_target(self, target):
+        service, env = target
+        deploy = self.target_deploy(service=service, env=env)
+        deploy.environment = env
+        # eb use/eb deploy write the service's EB CLI state and a commit's
+        # bundle and application version are created once per service, so
+        # deploys of the same service take turns while different services run
+        # in parallel
+        with tracer.span(f'{service}/{env}:do_deployment'), self.serviceLocks[service]:
+            self.statuses[target] = 'running'
+            try:
+                self.statuses[target] = (
+                    'deployed' if deploy.do_queued_deployment() else 'superseded'
+                )
+            except SystemExit as exception:
+                deploy.log(exception)
+                self.statuses[target] = 'failed'
+            except Exception as exception:
+                # One target failing unexpectedly must not lose the others' results
+                deploy.log(f'Error: {exception!r}')
+                self.statuses[target] = 'failed'
+
+    def print_status_matrix(self):
+        def column(service, env):
+            prefix = f'{service.lower()}-'
+            return env.replace(prefix, '', 1) if env.startswith(prefix) else env
+
+        columns = list(
+            dict.fromkeys(column(service, env) for service, env in self.targets)
+        )
+        cells = {
+            (service, column(service, env)): status
+            for (service, env), status in self.statuses.items()
+        }
+        width = max(len(service) for service in self.services + ['SERVICE']) + 2
+        print(f'{"SERVICE":<{width}}' + ''.join(f'{name:<12}' for name in columns))
+        for service in self.services:
+            print(
+                f'{service:<{width}}'
+                + ''.join(f'{cells.get((service, name), "-"):<12}' for name in columns)
+            )
+
+    def run(self, isAutoDeployment):
+        with tracer.span('preflight'):
+            self.preflight()
+        if not isAutoDeployment:
+            with tracer.span('check_user_confirmation'):
+                self.check_user_confirmation()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.concurrency
+        ) as executor:
+            futures = [
+                submit_in_context(executor, self.deploy_target, target)
+                for target in self.targets
+            ]
+            for future in futures:
+                future.result()
+        self.print_status_matrix()
+        if any(
+            status not in ('deployed', 'superseded')
+            for status in self.statuses.values()
+        ):
+            raise SystemExit('Error: some deployments did not complete successfully')
+
+
+def ask_user_confirmation():
+    while True:
+        print('Are you sure you want to continue (y/n) => ', end='')
+        response = input().lower()
+        if response == 'n':
+            raise SystemExit('Deploy process exited on user request')
+        if response == 'y':
+            break
+        print('Unrecognised answer, please enter "y" or "n"')
+
+
+def parse_target(target):
+    service, separator, env = target.partition(':')
+    if not separator or not service or not env:
+        raise argparse.ArgumentTypeError(
+            f'invalid target {target}, expected SERVICE:ENVIRONMENT'
+        )
+    return service, env
 
 
 if __name__ == '__main__':
@@ -233,14 +834,114 @@ if __name__ == '__main__':
     parser.add_argument('--service', type=str, nargs=1, help='service name')
     parser.add_argument('--env', type=str, nargs=1, help='environment name')
     parser.add_argument('--auto', action='store_true')
-    args = parser.parse_args()
-
-    service = args.service[0]
-    messageClient = SlackClient()
-    continuousIntegrationClient = CodeBuildClient(service=service.lower())
-    deploy = Deploy(
-        service=service,
-        messageClient=messageClient,
-        continuousIntegrationClient=continuousIntegrationClient,
+    parser.add_argument(
+        '--target',
+        type=parse_target,
+        action='append',
+        metavar='SERVICE:ENVIRONMENT',
+        help='deploy several services/environments at once, can be repeated',
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='maximum number of deployments running at the same time with --target',
+    )
+    parser.add_argument(
+        '--full-remote-update',
+        action='store_true',
+        help='run "git remote update" to check the branch is pushed instead of asking origin for the branch alone',
+    )
+    parser.add_argument(
+        '--eb-cli',
+        action='store_true',
+        help='deploy with "eb deploy" instead of uploading a git archive bundle of the commit',
+    )
+    parser.add_argument(
+        '--recheck-tools',
+        action='store_true',
+        help='run the eb, git and aws version checks again instead of trusting the cached results',
+    )
+    parser.add_argument(
+        '--rollback',
+        type=str,
+        nargs='?',
+        const='',
+        metavar='LABEL',
+        help='switch the environment back to an application version already deployed, the previous one by default',
     )
-    deploy.run(env=args.env[0], isAutoDeployment=args.auto)
+    parser.add_argument(
+        '--trace',
+        type=str,
+        metavar='FILE',
+        help='record timed spans of every step, command and API call as a Chrome trace in FILE',
+    )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='run the deploy in the resident daemon (python daemon.py) and stream its progress',
+    )
+    parser.add_argument(
+        '--socket', type=str, help='Unix socket of the daemon used with --daemon'
+    )
+    args = parser.parse_args()
+    if not args.target and not (args.service and args.env):
+        parser.error('--service and --env are required without --target')
+    if args.daemon and not args.auto:
+        parser.error('--daemon requires --auto, the daemon cannot ask for confirmation')
+    if args.rollback is not None and args.target:
+        parser.error('--rollback works on a single --service and --env')
+
+    if args.daemon:
+        submit(
+            request={
+                'action': 'deploy',
+                'targets': args.target or [(args.service[0], args.env[0])],
+                'concurrency': args.concurrency,
+                'fullRemoteUpdate': args.full_remote_update,
+                'useEbCli': args.eb_cli,
+                'recheckTools': args.recheck_tools,
+                'rollback': args.rollback,
+            },
+            socketPath=args.socket,
+        )
+    else:
+        with tracer.recording(traceFile=args.trace):
+            messageClient = tracer.trace_client(
+                client=SlackClient(asynchronous=True), category='slack'
+            )
+            deployOptions = {
+                'orchestratorClient': tracer.trace_client(
+                    client=ElasticBeanstalkClient(), category='aws'
+                ),
+                'storageClient': tracer.trace_client(client=S3Client(), category='aws'),
+                'fullRemoteUpdate': args.full_remote_update,
+                'useEbCli': args.eb_cli,
+                'recheckTools': args.recheck_tools,
+            }
+            if args.target:
+                DeployFanOut(
+                    targets=args.target,
+                    messageClient=messageClient,
+                    concurrency=args.concurrency,
+                    **deployOptions,
+                ).run(isAutoDeployment=args.auto)
+            else:
+                service = args.service[0]
+                continuousIntegrationClient = tracer.trace_client(
+                    client=CodeBuildClient(service=service.lower()), category='aws'
+                )
+                deploy = Deploy(
+                    service=service,
+                    messageClient=messageClient,
+                    continuousIntegrationClient=continuousIntegrationClient,
+                    **deployOptions,
+                )
+                if args.rollback is not None:
+                    deploy.rollback(
+                        env=args.env[0],
+                        label=args.rollback,
+                        isAutoDeployment=args.auto,
+                    )
+                else:
+                    deploy.run(env=args.env[0], isAutoDeployment=args.auto)
@@ -2,6 +2,7 @@ class Colors:
     GOOD = 'good'
     WARNING = 'warning'
     DANGER = 'danger'
+    DEFAULT = '#666666'
 
 
 class ServiceURL:
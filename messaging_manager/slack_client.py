@@ -1,31 +1,67 @@
-import requests
+import atexit
+import queue
+import threading
+import time
+
+from utils.tracing import tracer
+from utils.utils import LazyModule
 
 from .constants import ServiceURL
 
+requests = LazyModule('requests')
+
 
 class SlackClient:
-    def send_slack(self, channel, message, colour='#666666'):
+    def __init__(
+        self,
+        serviceURL=ServiceURL.SERVICE_URL,
+        asynchronous=False,
+        coalesceWindow=0.5,
+        exitDeadline=10,
+    ):
+        self.serviceURL = serviceURL
+        self.asynchronous = asynchronous
+        self.coalesceWindow = coalesceWindow
+        self.exitDeadline = exitDeadline
+        self._session = None
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            session = requests.Session()
+            session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=4))
+            session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=4))
+            self._session = session
+        return self._session
+
+    @staticmethod
+    def _attachment(message, colour):
+        return {
+            'fallback': message,
+            'color': colour,
+            'fields': [
+                {
+                    'value': message,
+                    'short': False,
+                }
+            ],
+        }
+
+    def _post(self, channel, attachments):
         try:
-            response = requests.post(
-                url=f'{ServiceURL.SERVICE_URL}{channel}',
-                json={
-                    'username': 'Noe',
-                    'icon_emoji': ':rocket:',
-                    'attachments': [
-                        {
-                            'fallback': message,
-                            'color': colour,
-                            'fields': [
-                                {
-                                    'value': message,
-                                    'short': False,
-                                }
-                            ],
-                        }
-                    ],
-                },
-                timeout=30,
-            )
+            with tracer.span('SlackClient.post', category='slack'):
+                response = self.session.post(
+                    url=f'{self.serviceURL}{channel}',
+                    json={
+                        'username': 'Noe',
+                        'icon_emoji': ':rocket:',
+                        'attachments': attachments,
+                    },
+                    timeout=30,
+                )
             response.raise_for_status()
         except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             print(
@@ -35,3 +71,68 @@ class SlackClient:
             print(
                 f'Warning: failed to send message to Slack, error response to HTTP request ({e})'
             )
+
+    def send_slack(self, channel, message, colour='#666666'):
+        attachment = self._attachment(message=message, colour=colour)
+        if not self.asynchronous:
+            return self._post(channel=channel, attachments=[attachment])
+        self._start_worker()
+        self._queue.put((channel, attachment))
+
+    def _start_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._deliver, name='slack-delivery', daemon=True
+                )
+                self._worker.start()
+                atexit.register(self.close)
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        windowEnd = time.monotonic() + self.coalesceWindow
+        while True:
+            remaining = windowEnd - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self):
+        while True:
+            batch = self._collect_batch()
+            attachmentsByChannel = {}
+            for channel, attachment in batch:
+                attachmentsByChannel.setdefault(channel, []).append(attachment)
+            for channel, attachments in attachmentsByChannel.items():
+                # The worker is the only one delivering, one bad batch must
+                # not end delivery for every later message
+                try:
+                    self._post(channel=channel, attachments=attachments)
+                except Exception as e:
+                    print(f'Warning: failed to send message to Slack ({e!r})')
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if deadline is None:
+                    self._queue.all_tasks_done.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self):
+        if not self.flush(timeout=self.exitDeadline):
+            print(
+                f'Warning: {self._queue.unfinished_tasks} Slack message(s) not delivered '
+                f'after waiting {self.exitDeadline} seconds'
+            )
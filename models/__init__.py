@@ -1 +1,8 @@
-from .constants import BColors, FastAPI, JSFrameworks, PythonFrameworks, React
+from .constants import (
+    ApiRateLimits,
+    BColors,
+    FastAPI,
+    JSFrameworks,
+    PythonFrameworks,
+    React,
+)
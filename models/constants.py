@@ -10,6 +10,15 @@ class BColors:
     UNDERLINE = '\033[4m'
 
 
+class ApiRateLimits:
+    # (requests per second, burst) shared by every service of a batch
+    GITHUB = (1, 5)
+    CODEBUILD = (5, 10)
+    CODESTAR_NOTIFICATIONS = (2, 5)
+    ELASTIC_BEANSTALK = (2, 5)
+    ROUTE53 = (5, 5)
+
+
 class JSFrameworks:
     ANGULAR = 'angular'
     REACT = 'react'
@@ -1,3 +1,9 @@
 class GitIgnoreTemplate:
     PYTHON = 'Python'
     NODE = 'Node'
+
+
+class GithubApi:
+    BASE_URL = 'https://api.github.com'
+    # Below this many remaining requests, calls are spread until the limit resets
+    RATE_LIMIT_RESERVE = 100
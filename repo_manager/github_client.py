@@ -1,15 +1,60 @@
-from github import Github, GithubException
+import threading
+
+from utils.utils import LazyModule
+
+from .constants import GithubApi
+from .request_cache import ConditionalRequestCache
+
+github = LazyModule('github')
 
 
 class GithubClient:
-    def __init__(self, token):
+    def __init__(
+        self,
+        token,
+        baseUrl=GithubApi.BASE_URL,
+        rateLimitReserve=GithubApi.RATE_LIMIT_RESERVE,
+    ):
         self.token = token
-        self.client = Github(login_or_token=self.token)
+        self.baseUrl = baseUrl
+        self.rateLimitReserve = rateLimitReserve
+        self._client = None
+        self.requestCache = None
+        self._organisations = {}
+        self._repos = {}
+        self._branches = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                client = github.Github(login_or_token=self.token, base_url=self.baseUrl)
+                self.requestCache = ConditionalRequestCache(
+                    # PyGithub does not expose its requester publicly
+                    requester=client._Github__requester,
+                    baseUrl=self.baseUrl,
+                    reserve=self.rateLimitReserve,
+                )
+                self._client = client
+            return self._client
+
+    def _memoised(self, handles, key, load):
+        with self._lock:
+            if key in handles:
+                return handles[key]
+        handle = load()
+        with self._lock:
+            return handles.setdefault(key, handle)
 
     def _get_organisation(self, organisationName):
         try:
-            return self.client.get_organization(login=organisationName)
-        except GithubException as exception:
+            return self._memoised(
+                handles=self._organisations,
+                key=organisationName,
+                load=lambda: self.client.get_organization(login=organisationName),
+            )
+        except github.GithubException as exception:
             raise SystemExit(
                 f'Error: failed to get organisation {organisationName}, error response from Github: '
                 f'{", ".join(self._exception_messages(exception=exception))}'
@@ -17,8 +62,14 @@ class GithubClient:
 
     def get_repo(self, owner, repoName):
         try:
-            return self.client.get_repo(full_name_or_id=f'{owner}/{repoName}')
-        except GithubException as exception:
+            return self._memoised(
+                handles=self._repos,
+                key=f'{owner}/{repoName}',
+                load=lambda: self.client.get_repo(
+                    full_name_or_id=f'{owner}/{repoName}'
+                ),
+            )
+        except github.GithubException as exception:
             raise SystemExit(
                 f'Error: failed to get repo {repoName}, error response from Github: '
                 f'{", ".join(self._exception_messages(exception=exception))}'
@@ -36,7 +87,7 @@ class GithubClient:
     ):
         organisation = self._get_organisation(organisationName=organisationName)
         try:
-            return organisation.create_repo(
+            repo = organisation.create_repo(
                 name=repoName,
                 gitignore_template=gitignoreTemplate,
                 auto_init=autoInit,
@@ -44,16 +95,19 @@ class GithubClient:
                 private=private,
                 delete_branch_on_merge=deleteBranchOnMerge,
             )
-        except GithubException as exception:
+        except github.GithubException as exception:
             raise SystemExit(
                 f'Error: failed to create service {repoName}, error response from Github: '
                 f'{", ".join(self._exception_messages(exception=exception))}'
             )
+        with self._lock:
+            self._repos[f'{organisationName}/{repoName}'] = repo
+        return repo
 
     def create_ssh_key_for_repo(self, repo, title, key, readOnly=False):
         try:
             return repo.create_key(title=title, key=key, read_only=readOnly)
-        except GithubException as exception:
+        except github.GithubException as exception:
             raise SystemExit(
                 f'Error: failed to create ssh key for repo {repo}, error response from Github: '
                 f'{", ".join(self._exception_messages(exception=exception))}'
@@ -62,7 +116,7 @@ class GithubClient:
     def edit_default_branch_for_repo(self, repo, defaultBranch):
         try:
             return repo.edit(default_branch=defaultBranch)
-        except GithubException as exception:
+        except github.GithubException as exception:
             raise SystemExit(
                 f'Error: failed to set default branch {defaultBranch} for repo {repo}, error response from Github: '
                 f'{", ".join(self._exception_messages(exception=exception))}'
@@ -72,8 +126,12 @@ class GithubClient:
         self, repo, branchName, strict, contexts, enforceAdmins
     ):
         try:
-            branch = repo.get_branch(branch=branchName)
-        except GithubException as exception:
+            branch = self._memoised(
+                handles=self._branches,
+                key=(repo.full_name, branchName),
+                load=lambda: repo.get_branch(branch=branchName),
+            )
+        except github.GithubException as exception:
             raise SystemExit(
                 f'Error: failed to get branch {branchName} from repo {repo}, error response from Github: '
                 f'{", ".join(self._exception_messages(exception=exception))}'
@@ -82,7 +140,7 @@ class GithubClient:
             return branch.edit_protection(
                 strict=strict, contexts=contexts, enforce_admins=enforceAdmins
             )
-        except GithubException as exception:
+        except github.GithubException as exception:
             raise SystemExit(
                 f'Error: failed to edit protection for {branchName}, error response from Github: '
                 f'{", ".join(self._exception_messages(exception=exception))}'
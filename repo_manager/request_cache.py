@@ -0,0 +1,83 @@
+import threading
+import time
+
+MUTATING_VERBS = {'POST', 'PATCH', 'PUT', 'DELETE'}
+
+
+class ConditionalRequestCache:
+    def __init__(self, requester, baseUrl, reserve=100, sleep=time.sleep):
+        self.requester = requester
+        self.baseUrl = baseUrl
+        self.reserve = reserve
+        self.sleep = sleep
+        self.entries = {}
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._requestJson = requester.requestJson
+        # Every JSON call of PyGithub, including requestJsonAndCheck, goes through requestJson
+        requester.requestJson = self.request_json
+
+    def _path(self, url):
+        return url.replace(self.baseUrl, '', 1) if url.startswith(self.baseUrl) else url
+
+    def throttle(self):
+        remaining, _ = self.requester.rate_limiting
+        if remaining < 0 or remaining > self.reserve:
+            return
+        # Spread the remaining budget over the rest of the window instead of running dry
+        untilReset = self.requester.rate_limiting_resettime - time.time()
+        if untilReset > 0:
+            self.sleep(untilReset / max(remaining, 1))
+
+    def _invalidate(self, path):
+        with self._lock:
+            for key in [
+                key
+                for key in self.entries
+                if path.startswith(key[0]) or key[0].startswith(path)
+            ]:
+                del self.entries[key]
+
+    def request_json(self, verb, url, parameters=None, headers=None, *args, **kwargs):
+        # The other arguments of requestJson change between PyGithub versions
+        # and are passed through untouched
+        self.throttle()
+        headers = dict(headers or {})
+        path = self._path(url)
+        key = (path, tuple(sorted((parameters or {}).items())))
+        # Callers sending their own validators (GithubObject.update) expect the raw 304
+        conditional = verb == 'GET' and not (
+            {'If-None-Match', 'If-Modified-Since'} & set(headers)
+        )
+        with self._lock:
+            entry = self.entries.get(key) if conditional else None
+        if entry:
+            responseHeaders, _ = entry
+            if 'etag' in responseHeaders:
+                headers['If-None-Match'] = responseHeaders['etag']
+            if 'last-modified' in responseHeaders:
+                headers['If-Modified-Since'] = responseHeaders['last-modified']
+
+        status, responseHeaders, output = self._requestJson(
+            verb, url, parameters, headers, *args, **kwargs
+        )
+        if status in (403, 429) and self.requester.rate_limiting[0] == 0:
+            # Out of budget anyway, wait for the window to reset rather than failing
+            self.sleep(max(self.requester.rate_limiting_resettime - time.time(), 0) + 1)
+            status, responseHeaders, output = self._requestJson(
+                verb, url, parameters, headers, *args, **kwargs
+            )
+
+        if entry and status == 304:
+            self.hits += 1
+            return 200, entry[0], entry[1]
+        if verb in MUTATING_VERBS:
+            self._invalidate(path=path)
+        elif (
+            conditional
+            and status == 200
+            and ('etag' in responseHeaders or 'last-modified' in responseHeaders)
+        ):
+            with self._lock:
+                self.entries[key] = (responseHeaders, output)
+        return status, responseHeaders, output
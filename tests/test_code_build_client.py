@@ -0,0 +1,83 @@
+import unittest
+
+from aws_manager import CodeBuildClient
+
+
+class FakeCodeBuild:
+    def __init__(self, builds, pageSize=3):
+        self.builds = builds
+        self.pageSize = pageSize
+        self.pagesRead = 0
+        self.batchSizes = []
+        self.failures = []
+
+    def get_paginator(self, operationName):
+        return self
+
+    def paginate(self, projectName, sortOrder):
+        ids = [build['id'] for build in self.builds]
+        while ids:
+            self.pagesRead += 1
+            page = ids[: self.pageSize]
+            del ids[: self.pageSize]
+            yield {'ids': page}
+
+    def batch_get_builds(self, ids):
+        if self.failures:
+            raise self.failures.pop()
+        self.batchSizes.append(len(ids))
+        return {'builds': [build for build in self.builds if build['id'] in ids]}
+
+
+class CodeBuildClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.builds = [
+            {'id': f'build-{index}', 'sourceVersion': f'sha-{index}'}
+            for index in range(250)
+        ]
+        for build in self.builds:
+            build['buildStatus'] = 'SUCCEEDED'
+        self.builds[0]['buildStatus'] = 'FAILED'
+        self.fake = FakeCodeBuild(builds=self.builds)
+        self.client = CodeBuildClient(service='service')
+        self.client.client = self.fake
+
+    def test_stops_once_source_version_is_found(self):
+        build = self.client.get_build_for_source_version(sourceVersion='sha-5')
+        self.assertEqual(build['id'], 'build-5')
+        self.assertEqual(self.fake.batchSizes, [100])
+        self.assertLess(self.fake.pagesRead, len(self.builds) // 3)
+
+    def test_batches_are_capped_and_index_is_reused(self):
+        self.assertEqual(len(self.client.get_source_versions()), 250)
+        self.assertEqual(self.fake.batchSizes, [100, 100, 50])
+        self.assertEqual(
+            self.client.get_status_for_source_version(sourceVersion='sha-0'),
+            'FAILED',
+        )
+        self.assertEqual(
+            self.client.get_status_for_source_version(sourceVersion='sha-249'),
+            'SUCCEEDED',
+        )
+        self.assertEqual(self.fake.batchSizes, [100, 100, 50])
+
+    def test_unknown_source_version(self):
+        self.assertEqual(
+            self.client.get_status_for_source_version(sourceVersion='unknown'),
+            'Source Version unknown does not exist',
+        )
+
+    def test_scan_for_an_unbuilt_commit_is_bounded(self):
+        self.client.MAX_SCANNED_BUILDS = 100
+        self.assertIsNone(
+            self.client.get_build_for_source_version(sourceVersion='unbuilt')
+        )
+        self.assertEqual(self.fake.batchSizes, [100])
+        self.assertEqual(self.fake.pagesRead, 34)
+
+    def test_lookup_after_a_failed_scan_pages_again(self):
+        self.fake.failures.append(ConnectionError('connection reset'))
+        with self.assertRaises(ConnectionError):
+            self.client.get_build_for_source_version(sourceVersion='sha-5')
+        build = self.client.get_build_for_source_version(sourceVersion='sha-5')
+        self.assertEqual(build['id'], 'build-5')
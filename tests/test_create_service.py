@@ -0,0 +1,249 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import create_service
+from create_service import ServiceCreator
+
+STEPS = [
+    'create_repo',
+    'configure_ssh_access',
+    'update_git_config',
+    'set_default_branch',
+    'create_build',
+    'create_webhook',
+    'create_build_notification',
+    'add_template',
+    'trigger_build',
+    'add_branch_protection_rules',
+    'host_service',
+    'configure_eb_cli',
+    'wait_for_environments',
+]
+
+
+class ServiceCreatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.serviceCreator = ServiceCreator(
+            user='noe',
+            organisation='acme',
+            service='noe',
+            framework='fast_api',
+            repoManagerClient=mock.Mock(),
+            messageClient=None,
+            continuousIntegrationClient=None,
+            notificationClient=None,
+            orchestratorClient=None,
+            dnsClient=None,
+        )
+        self.lock = threading.Lock()
+        self.events = []
+        self.failures = {}
+        for name in STEPS:
+            setattr(self.serviceCreator, name, self.step(name=name))
+
+    def step(self, name):
+        def run(**kwargs):
+            with self.lock:
+                self.events.append(('start', name))
+            if name in self.failures:
+                raise self.failures[name]
+            with self.lock:
+                self.events.append(('end', name))
+
+        return run
+
+
+class StepGraphTestCase(ServiceCreatorTestCase):
+    def build(self, createRepo=True, template=True, environment=True):
+        return self.serviceCreator.build_step_graph(
+            createRepo=createRepo, template=template, environment=environment
+        )
+
+    def test_steps_run_after_their_dependencies(self):
+        steps = self.build()
+        self.assertEqual(list(steps.tasks), STEPS)
+        steps.run()
+        self.assertEqual(steps.failures, {})
+        for name, (_, dependsOn) in steps.tasks.items():
+            start = self.events.index(('start', name))
+            for dependency in dependsOn:
+                self.assertLess(self.events.index(('end', dependency)), start)
+        self.assertEqual(
+            steps.tasks['wait_for_environments'][1],
+            (
+                'host_service',
+                'configure_eb_cli',
+                'trigger_build',
+                'add_branch_protection_rules',
+                'create_build_notification',
+            ),
+        )
+
+    def test_steps_of_other_modes_are_left_out(self):
+        steps = self.build(createRepo=False, environment=False)
+        self.assertEqual(
+            list(steps.tasks), ['configure_ssh_access', 'update_git_config']
+        )
+        self.assertEqual(steps.tasks['configure_ssh_access'][1], ())
+
+    def test_failed_step_skips_its_dependents_only(self):
+        self.failures['create_build'] = SystemExit('Error: Could not create build')
+        steps = self.build()
+        steps.run()
+        self.assertEqual(
+            steps.failures, {'create_build': 'Error: Could not create build'}
+        )
+        self.assertEqual(
+            sorted(steps.skipped),
+            [
+                'add_branch_protection_rules',
+                'create_build_notification',
+                'create_webhook',
+                'trigger_build',
+                'wait_for_environments',
+            ],
+        )
+        self.assertIn(('end', 'add_template'), self.events)
+        self.assertIn(('end', 'host_service'), self.events)
+        with self.assertRaises(SystemExit) as context:
+            steps.raise_for_failures()
+        self.assertEqual(
+            str(context.exception).splitlines()[0],
+            '[create_build] Error: Could not create build',
+        )
+        self.assertIn('Skipped because a dependency failed', str(context.exception))
+
+
+class JournalTestCase(ServiceCreatorTestCase):
+    def setUp(self):
+        super().setUp()
+        self.serviceCreator.repoURL = 'git@github.com:acme/Noe.git'
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.journals = os.path.join(directory.name, 'journals')
+        for patcher in [
+            mock.patch.object(create_service, 'JOURNALS_DIR', self.journals),
+            mock.patch.object(create_service, 'get_git_user', return_value='noe'),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_steps(self, createRepo=True, environment=False):
+        self.events = []
+        try:
+            self.serviceCreator.run(
+                createRepo=createRepo, template=True, environment=environment
+            )
+        except SystemExit:
+            pass
+        return [name for event, name in self.events if event == 'end']
+
+    def test_journal_is_discarded_once_every_step_succeeded(self):
+        self.run_steps()
+        self.assertEqual(os.listdir(self.journals), [])
+        self.assertIn('create_repo', self.run_steps())
+
+    def test_no_repo_run_does_not_reuse_the_creation_journal(self):
+        self.failures['create_build'] = SystemExit('Error: Could not create build')
+        self.assertIn('configure_ssh_access', self.run_steps())
+        self.assertEqual(os.listdir(self.journals), ['noe.repo-template.json'])
+        self.assertEqual(
+            self.run_steps(createRepo=False),
+            ['configure_ssh_access', 'update_git_config'],
+        )
+        resumed = self.run_steps()
+        self.assertNotIn('configure_ssh_access', resumed)
+
+
+class ManifestTestCase(unittest.TestCase):
+    def load(self, content):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'services.yaml')
+            with open(path, 'w') as file:
+                file.write(content)
+            return create_service.load_manifest(manifestFile=path)
+
+    def test_entries_are_normalised(self):
+        self.assertEqual(
+            self.load('services:\n  - service: Noe\n    framework: FAST_API\n'),
+            [
+                {
+                    'service': 'noe',
+                    'framework': 'fast_api',
+                    'createRepo': True,
+                    'template': True,
+                    'environment': False,
+                    'fromStep': None,
+                }
+            ],
+        )
+
+    def test_malformed_entries_are_reported(self):
+        for content in [
+            'services:\n  - noe\n',
+            'services:\n  - service: 123\n    framework: fast_api\n',
+            'services:\n  - service: noe\n',
+        ]:
+            with self.assertRaisesRegex(
+                SystemExit, 'every manifest entry needs a service and a framework'
+            ):
+                self.load(content)
+        with self.assertRaisesRegex(SystemExit, 'must be a list of entries'):
+            self.load('services:\n  noe:\n    framework: fast_api\n')
+
+
+class FakeServiceCreator:
+    def __init__(self, service, **kwargs):
+        if service == 'fincher':
+            raise KeyError('framework')
+        self.service = service
+
+    def run(self, **kwargs):
+        if self.service == 'dorothy':
+            raise RuntimeError('journal is locked')
+
+
+class CreateServicesTestCase(unittest.TestCase):
+    def setUp(self):
+        for patcher in [
+            mock.patch.object(create_service, 'ServiceCreator', FakeServiceCreator),
+            mock.patch.object(create_service, 'CodeBuildClient', mock.Mock()),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unexpected_errors_fail_their_service_only(self):
+        entries = [
+            {
+                'service': service,
+                'framework': 'fast_api',
+                'createRepo': True,
+                'template': True,
+                'environment': False,
+                'fromStep': None,
+            }
+            for service in ['noe', 'fincher', 'dorothy']
+        ]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), self.assertRaisesRegex(
+            SystemExit, 'some services could not be created'
+        ):
+            create_service.create_services(
+                entries=entries,
+                organisation='acme',
+                user='noe',
+                concurrency=3,
+                sharedClients={'sshKeyPool': mock.Mock()},
+            )
+        lines = output.getvalue().splitlines()
+        self.assertIn("fincher: Error: KeyError('framework')", lines)
+        self.assertIn("dorothy: Error: RuntimeError('journal is locked')", lines)
+        summary = {line.split()[0]: line.split()[2] for line in lines[-3:]}
+        self.assertEqual(
+            summary, {'noe': 'created', 'fincher': 'failed', 'dorothy': 'failed'}
+        )
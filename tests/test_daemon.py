@@ -0,0 +1,70 @@
+import concurrent.futures
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import daemon
+from utils import progress
+from utils.daemon_client import submit
+
+
+def fan_out(server, request):
+    print(f'starting {request["name"]}')
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            progress.submit_in_context(executor, print, f'{request["name"]}: {step}')
+            for step in [1, 2]
+        ]
+        for future in futures:
+            future.result()
+    if request.get('fail'):
+        raise SystemExit(f'Error: {request["name"]} failed')
+
+
+class DaemonTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.socketPath = os.path.join(directory.name, 'daemon.sock')
+        progress.install()
+        with mock.patch.object(daemon, 'build_shared_clients', return_value={}):
+            self.server = daemon.Daemon(
+                socketPath=self.socketPath, organisation='org', token='', user='noe'
+            )
+        patcher = mock.patch.dict(daemon.ACTIONS, {'fan_out': fan_out})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def submit(self, request):
+        lines = []
+        submit(request=request, socketPath=self.socketPath, onLog=lines.append)
+        return lines
+
+    def test_concurrent_requests_stream_their_own_progress(self):
+        results = {}
+
+        def run(name):
+            results[name] = self.submit({'action': 'fan_out', 'name': name})
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in ['a', 'b']]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for name in ['a', 'b']:
+            self.assertEqual(
+                sorted(results[name]),
+                sorted([f'starting {name}', f'{name}: 1', f'{name}: 2']),
+            )
+
+    def test_failures_are_raised_by_the_client(self):
+        with self.assertRaisesRegex(SystemExit, 'Error: a failed'):
+            self.submit({'action': 'fan_out', 'name': 'a', 'fail': True})
+        with self.assertRaisesRegex(SystemExit, 'invalid request'):
+            self.submit({'action': 'unknown'})
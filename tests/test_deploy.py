@@ -0,0 +1,529 @@
+import contextlib
+import datetime
+import io
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+import zipfile
+
+import botocore.exceptions
+
+import deploy
+from aws_manager import ElasticBeanstalkClient, S3Client
+from deploy import Deploy, DeployFanOut
+
+LOCAL_HASH = '3f1c2a9e8b7d6c5f4e3d2c1b0a9f8e7d6c5b4a39'
+OTHER_HASH = '0a1b2c3d4e5f60718293a4b5c6d7e8f901234567'
+
+
+class RemoteCheckTestCase(unittest.TestCase):
+    def build_deploy(self, responses, fullRemoteUpdate=False):
+        deploy = Deploy(
+            service='Noe',
+            messageClient=None,
+            continuousIntegrationClient=None,
+            fullRemoteUpdate=fullRemoteUpdate,
+        )
+        deploy.branch = 'feature/search'
+        deploy.localHash = LOCAL_HASH
+        deploy.calls = []
+
+        def run_command(*args):
+            deploy.calls.append(args[1])
+            response = responses[args[1]]
+            if isinstance(response, BaseException):
+                raise response
+            return response
+
+        deploy.run_command = run_command
+        deploy.log = lambda message: None
+        return deploy
+
+    def test_ls_remote_only_queries_the_branch(self):
+        deploy = self.build_deploy(
+            responses={'ls-remote': f'{LOCAL_HASH}\trefs/heads/feature/search'}
+        )
+        deploy.check_up_to_date()
+        self.assertEqual(deploy.calls, ['ls-remote'])
+
+    def test_ls_remote_reports_mismatch_and_missing_branch(self):
+        deploy = self.build_deploy(
+            responses={'ls-remote': f'{OTHER_HASH}\trefs/heads/feature/search'}
+        )
+        with self.assertRaisesRegex(SystemExit, 'do not match'):
+            deploy.check_up_to_date()
+
+        deploy = self.build_deploy(responses={'ls-remote': ''})
+        with self.assertRaisesRegex(SystemExit, 'have you pushed'):
+            deploy.check_up_to_date()
+        self.assertEqual(deploy.calls, ['ls-remote'])
+
+    def test_falls_back_to_full_update_when_ls_remote_fails(self):
+        deploy = self.build_deploy(
+            responses={
+                'ls-remote': SystemExit('Error: ls-remote failed'),
+                'remote': '',
+                'rev-parse': LOCAL_HASH,
+            }
+        )
+        deploy.check_up_to_date()
+        self.assertEqual(deploy.calls, ['ls-remote', 'remote', 'rev-parse'])
+
+    def test_full_remote_update_mode(self):
+        deploy = self.build_deploy(
+            responses={'remote': '', 'rev-parse': LOCAL_HASH}, fullRemoteUpdate=True
+        )
+        deploy.check_up_to_date()
+        self.assertEqual(deploy.calls, ['remote', 'rev-parse'])
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+        self.uploads = []
+
+    def list_objects_v2(self, Bucket, Prefix, MaxKeys):
+        keys = sorted(
+            key
+            for bucket, key in self.objects
+            if bucket == Bucket and key.startswith(Prefix)
+        )
+        return {'Contents': [{'Key': key} for key in keys[:MaxKeys]]} if keys else {}
+
+    def upload_file(self, Filename, Bucket, Key):
+        with open(Filename, 'rb') as file:
+            self.objects[(Bucket, Key)] = file.read()
+        self.uploads.append(Key)
+
+
+class FakeElasticBeanstalk:
+    def __init__(self, outcome='Environment update completed successfully.'):
+        self.outcome = outcome
+        self.versions = {}
+        self.environments = {}
+        self.events = []
+        self.events.append(
+            self.event(name='noe-live', message='createEnvironment is starting.')
+        )
+        self.describeEventsCalls = []
+
+    def event(self, name, message, severity='INFO', label=None):
+        return {
+            'EnvironmentName': name,
+            'EventDate': datetime.datetime(2026, 10, 17, 12, 0, len(self.events)),
+            'Severity': severity,
+            'Message': message,
+            'VersionLabel': label,
+        }
+
+    def create_storage_location(self):
+        return {'S3Bucket': 'elasticbeanstalk-eu-west-2'}
+
+    def describe_application_versions(self, ApplicationName, VersionLabels):
+        return {
+            'ApplicationVersions': [
+                self.versions[(ApplicationName, label)]
+                for label in VersionLabels
+                if (ApplicationName, label) in self.versions
+            ]
+        }
+
+    def create_application_version(self, ApplicationName, VersionLabel, **kwargs):
+        self.versions[(ApplicationName, VersionLabel)] = {
+            'VersionLabel': VersionLabel,
+            **kwargs,
+        }
+
+    def update_environment(self, EnvironmentName, VersionLabel):
+        self.environments[EnvironmentName] = VersionLabel
+        messages = ['Environment update is starting.', self.outcome]
+        if self.outcome.startswith('Failed'):
+            messages.insert(1, 'Instance deployment failed.')
+        for message in messages:
+            self.events.append(
+                self.event(
+                    name=EnvironmentName,
+                    message=message,
+                    severity='ERROR' if 'failed' in message.lower() else 'INFO',
+                    label=VersionLabel,
+                )
+            )
+
+    def describe_events(self, EnvironmentName, StartTime=None, MaxRecords=None):
+        self.describeEventsCalls.append(StartTime)
+        events = [
+            event
+            for event in reversed(self.events)
+            if event['EnvironmentName'] == EnvironmentName
+            and (StartTime is None or event['EventDate'] >= StartTime)
+        ]
+        return {'Events': events[:MaxRecords]}
+
+    def describe_environments(self, EnvironmentNames, IncludeDeleted):
+        return {
+            'Environments': [
+                {
+                    'EnvironmentName': name,
+                    'Status': 'Ready',
+                    'VersionLabel': self.environments.get(name),
+                }
+                for name in EnvironmentNames
+            ]
+        }
+
+
+class ElasticBeanstalkTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        checkout = os.path.join(self.directory.name, 'Noe')
+        os.makedirs(checkout)
+        for args in [
+            ['init', '-q'],
+            ['config', 'user.name', 'noe'],
+            ['config', 'user.email', 'noe@example.com'],
+        ]:
+            subprocess.check_call(['git', *args], cwd=checkout)
+        with open(os.path.join(checkout, 'app.py'), 'w') as file:
+            file.write('print("noe")\n')
+        subprocess.check_call(['git', 'add', '.'], cwd=checkout)
+        subprocess.check_call(['git', 'commit', '-q', '-m', 'Initial'], cwd=checkout)
+        self.localHash = (
+            subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=checkout)
+            .decode()
+            .strip()
+        )
+        workspace = os.path.join(self.directory.name, 'Flouflou')
+        os.makedirs(workspace)
+        cwd = os.getcwd()
+        os.chdir(workspace)
+        self.addCleanup(os.chdir, cwd)
+        bundlesDir = deploy.BUNDLES_DIR
+        deploy.BUNDLES_DIR = os.path.join(self.directory.name, 'bundles')
+        self.addCleanup(setattr, deploy, 'BUNDLES_DIR', bundlesDir)
+
+        self.orchestratorClient = ElasticBeanstalkClient(cacheTtl=0)
+        self.orchestratorClient.client = FakeElasticBeanstalk()
+        self.storageClient = S3Client()
+        self.storageClient.client = FakeS3()
+
+    def deploy_to(self, environment, label):
+        deployment = Deploy(
+            service='Noe',
+            messageClient=None,
+            continuousIntegrationClient=None,
+            orchestratorClient=self.orchestratorClient,
+            storageClient=self.storageClient,
+        )
+        deployment.log = lambda message: None
+        deployment.messageClient = unittest.mock.Mock()
+        deployment.branch = 'master'
+        deployment.localHash = self.localHash
+        deployment.label = label
+        deployment.environment = environment
+        deployment.deploy_application_version()
+
+
+class BundleDeployTestCase(ElasticBeanstalkTestCase):
+    def test_promoting_a_commit_reuses_its_application_version(self):
+        self.deploy_to(environment='noe-staging', label='master-abc-1')
+        self.deploy_to(environment='noe-live', label='master-abc-1')
+        self.assertEqual(
+            self.storageClient.client.uploads, [f'noe/{self.localHash}.zip']
+        )
+        self.assertEqual(
+            list(self.orchestratorClient.client.versions), [('noe', 'master-abc-1')]
+        )
+        self.assertEqual(
+            self.orchestratorClient.client.environments,
+            {'noe-staging': 'master-abc-1', 'noe-live': 'master-abc-1'},
+        )
+        bundle = os.path.join(deploy.BUNDLES_DIR, 'noe', f'{self.localHash}.zip')
+        with zipfile.ZipFile(bundle) as archive:
+            self.assertEqual(archive.namelist(), ['app.py'])
+
+    def test_new_label_for_the_same_commit_reuses_the_uploaded_bundle(self):
+        self.deploy_to(environment='noe-staging', label='master-abc-1')
+        self.deploy_to(environment='noe-staging', label='release-abc-1')
+        self.assertEqual(len(self.storageClient.client.uploads), 1)
+        self.assertEqual(len(self.orchestratorClient.client.versions), 2)
+
+    def test_events_are_streamed_once_until_the_deployment_completes(self):
+        self.deploy_to(environment='noe-live', label='master-abc-1')
+        self.deploy_to(environment='noe-live', label='master-abc-2')
+        client = self.orchestratorClient.client
+        # Primed on the createEnvironment event, then on the first deployment's last event
+        self.assertEqual(client.describeEventsCalls[0], None)
+        self.assertEqual(client.describeEventsCalls[3], client.events[2]['EventDate'])
+
+    def test_failure_event_ends_the_deployment(self):
+        self.orchestratorClient.client.outcome = 'Failed to deploy application.'
+        # The first error explains the failure better than the completion event
+        with self.assertRaisesRegex(SystemExit, 'failed: Instance deployment failed'):
+            self.deploy_to(environment='noe-staging', label='master-abc-1')
+
+    def test_aws_errors_end_the_deployment_with_a_message(self):
+        def update_environment(EnvironmentName, VersionLabel):
+            raise botocore.exceptions.ClientError(
+                {
+                    'Error': {
+                        'Code': 'InvalidParameterValue',
+                        'Message': f'Environment named {EnvironmentName} is in an invalid '
+                        'state for this operation. Must be Ready.',
+                    }
+                },
+                'UpdateEnvironment',
+            )
+
+        self.orchestratorClient.client.update_environment = update_environment
+        deployment = Deploy(
+            service='Noe',
+            messageClient=unittest.mock.Mock(),
+            continuousIntegrationClient=None,
+            orchestratorClient=self.orchestratorClient,
+            storageClient=self.storageClient,
+        )
+        deployment.log = lambda message: None
+        deployment.user = 'noe'
+        deployment.branch = 'master'
+        deployment.localHash = self.localHash
+        deployment.label = 'master-abc-1'
+        deployment.environment = 'noe-staging'
+        with self.assertRaisesRegex(SystemExit, 'invalid state for this operation'):
+            deployment.do_deployment()
+        self.assertEqual(
+            deployment.messageClient.send_slack.call_args.kwargs['colour'],
+            deploy.Colors.DANGER,
+        )
+
+
+class RollbackTestCase(ElasticBeanstalkTestCase):
+    def setUp(self):
+        super().setUp()
+        for name, path in [('QUEUE_DIR', 'queue'), ('HISTORY_FILE', 'history.json')]:
+            self.addCleanup(setattr, deploy, name, getattr(deploy, name))
+            setattr(deploy, name, os.path.join(self.directory.name, path))
+
+    def rollback(self, label=None):
+        deployment = Deploy(
+            service='Noe',
+            messageClient=unittest.mock.Mock(),
+            continuousIntegrationClient=None,
+            orchestratorClient=self.orchestratorClient,
+            storageClient=self.storageClient,
+        )
+        deployment.log = lambda message: None
+        deployment.load_user = lambda: setattr(deployment, 'user', 'noe')
+        deployment.rollback(env='noe-live', label=label, isAutoDeployment=True)
+        return deployment
+
+    def record_deploy(self, label):
+        self.deploy_to(environment='noe-live', label=label)
+        deploy.DeployHistory(path=deploy.HISTORY_FILE).record(
+            environment='noe-live', label=label, user='noe'
+        )
+
+    def test_rollback_switches_to_the_previous_label_without_uploading(self):
+        self.record_deploy(label='master-abc-1')
+        self.record_deploy(label='master-abc-2')
+        uploads = list(self.storageClient.client.uploads)
+        self.rollback()
+        self.assertEqual(
+            self.orchestratorClient.client.environments, {'noe-live': 'master-abc-1'}
+        )
+        self.assertEqual(self.storageClient.client.uploads, uploads)
+        history = deploy.DeployHistory(path=deploy.HISTORY_FILE)
+        self.assertEqual(
+            [entry['label'] for entry in history.entries('noe-live')],
+            ['master-abc-1', 'master-abc-2', 'master-abc-1'],
+        )
+        with self.assertRaisesRegex(SystemExit, 'no previous deployment'):
+            self.rollback()
+
+    def test_rollback_to_an_explicit_label_requires_the_application_version(self):
+        deploy.DeployHistory(path=deploy.HISTORY_FILE).record(
+            environment='noe-live', label='master-abc-0', user='noe'
+        )
+        self.record_deploy(label='master-abc-1')
+        self.record_deploy(label='master-abc-2')
+        with self.assertRaisesRegex(SystemExit, 'does not exist'):
+            self.rollback(label='master-abc-0')
+        with self.assertRaisesRegex(SystemExit, 'already running'):
+            self.rollback(label='master-abc-2')
+        self.rollback(label='master-abc-1')
+        self.assertEqual(
+            self.orchestratorClient.client.environments, {'noe-live': 'master-abc-1'}
+        )
+
+    def test_rollback_only_to_a_master_label_the_environment_ran(self):
+        self.deploy_to(environment='noe-staging', label='feature-abc-1')
+        self.record_deploy(label='master-abc-1')
+        self.record_deploy(label='master-abc-2')
+        with self.assertRaisesRegex(SystemExit, 'never deployed to the noe-live'):
+            self.rollback(label='feature-abc-1')
+        deploy.DeployHistory(path=deploy.HISTORY_FILE).record(
+            environment='noe-live', label='feature-abc-1', user='noe'
+        )
+        with self.assertRaisesRegex(SystemExit, 'Only the master branch'):
+            self.rollback(label='feature-abc-1')
+        self.assertEqual(
+            self.orchestratorClient.client.environments,
+            {'noe-staging': 'feature-abc-1', 'noe-live': 'master-abc-2'},
+        )
+
+    def test_rollback_without_local_history_uses_the_environment_events(self):
+        self.deploy_to(environment='noe-live', label='master-abc-1')
+        self.deploy_to(environment='noe-staging', label='develop-abc-2')
+        self.deploy_to(environment='noe-live', label='master-abc-3')
+        self.rollback()
+        self.assertEqual(
+            self.orchestratorClient.client.environments['noe-live'], 'master-abc-1'
+        )
+
+    def test_aws_errors_end_the_rollback_with_a_message(self):
+        self.record_deploy(label='master-abc-1')
+        self.record_deploy(label='master-abc-2')
+
+        def describe_application_versions(ApplicationName, VersionLabels):
+            raise botocore.exceptions.EndpointConnectionError(endpoint_url='eb')
+
+        self.orchestratorClient.client.describe_application_versions = (
+            describe_application_versions
+        )
+        with self.assertRaisesRegex(
+            SystemExit, 'AWS request failed while trying to roll back the noe-live'
+        ):
+            self.rollback()
+
+
+class FakeTargetDeploy:
+    def __init__(self, fanOut, service, outcomes):
+        self.fanOut = fanOut
+        self.service = service
+        self.outcomes = outcomes
+        self.logPrefix = ''
+        self.environment = None
+
+    def log(self, message):
+        self.fanOut.logs.append(f'{self.logPrefix}{message}')
+
+    def do_queued_deployment(self):
+        with self.fanOut.lock:
+            self.fanOut.running.append(self.service)
+            self.fanOut.peaks.append(list(self.fanOut.running))
+        time.sleep(0.05)
+        with self.fanOut.lock:
+            self.fanOut.running.remove(self.service)
+        outcome = self.outcomes.get(self.environment, True)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class DeployFanOutTestCase(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = []
+        self.peaks = []
+        self.logs = []
+
+    def fan_out(self, targets, outcomes=None, concurrency=4):
+        fanOut = DeployFanOut(
+            targets=targets, messageClient=None, concurrency=concurrency
+        )
+        fanOut.deploys = {
+            service: FakeTargetDeploy(
+                fanOut=self, service=service, outcomes=outcomes or {}
+            )
+            for service in fanOut.services
+        }
+        fanOut.preflight = lambda: None
+        return fanOut
+
+    def run_fan_out(self, fanOut):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            try:
+                fanOut.run(isAutoDeployment=True)
+            except SystemExit as exception:
+                return output.getvalue(), exception
+        return output.getvalue(), None
+
+    def test_duplicate_targets_are_deployed_once(self):
+        fanOut = self.fan_out(
+            targets=[
+                ('Noe', 'noe-staging'),
+                ('Fincher', 'fincher-live'),
+                ('Noe', 'noe-staging'),
+            ]
+        )
+        self.assertEqual(
+            fanOut.targets, [('Noe', 'noe-staging'), ('Fincher', 'fincher-live')]
+        )
+        self.assertEqual(fanOut.services, ['Noe', 'Fincher'])
+        _, error = self.run_fan_out(fanOut=fanOut)
+        self.assertIsNone(error)
+        self.assertEqual(len(self.peaks), 2)
+
+    def test_deploys_of_a_service_take_turns(self):
+        fanOut = self.fan_out(
+            targets=[
+                ('Noe', 'noe-staging'),
+                ('Noe', 'noe-live'),
+                ('Fincher', 'fincher-staging'),
+                ('Fincher', 'fincher-live'),
+            ]
+        )
+        self.run_fan_out(fanOut=fanOut)
+        self.assertEqual(len(self.peaks), 4)
+        for running in self.peaks:
+            self.assertEqual(len(running), len(set(running)))
+        # Different services still ran side by side
+        self.assertIn(2, [len(running) for running in self.peaks])
+
+    def test_status_matrix_and_failures(self):
+        fanOut = self.fan_out(
+            targets=[
+                ('Noe', 'noe-staging'),
+                ('Noe', 'noe-live'),
+                ('Fincher', 'fincher-staging'),
+                ('Fincher', 'fincher-live'),
+            ],
+            outcomes={
+                'noe-staging': SystemExit('Error: deploy command exited'),
+                'fincher-staging': False,
+                'fincher-live': RuntimeError('Environment is in an invalid state'),
+            },
+        )
+        output, error = self.run_fan_out(fanOut=fanOut)
+        self.assertEqual(
+            str(error), 'Error: some deployments did not complete successfully'
+        )
+        self.assertEqual(
+            output.splitlines(),
+            [
+                'SERVICE  staging     live        ',
+                'Noe      failed      deployed    ',
+                'Fincher  superseded  failed      ',
+            ],
+        )
+        self.assertIn(
+            "[Fincher/fincher-live] Error: RuntimeError('Environment is in an invalid state')",
+            self.logs,
+        )
+
+    def test_superseded_deploys_are_not_failures(self):
+        fanOut = self.fan_out(
+            targets=[('Noe', 'noe-staging'), ('Noe', 'noe-live')],
+            outcomes={'noe-staging': False},
+        )
+        _, error = self.run_fan_out(fanOut=fanOut)
+        self.assertIsNone(error)
+        self.assertEqual(
+            fanOut.statuses,
+            {('Noe', 'noe-staging'): 'superseded', ('Noe', 'noe-live'): 'deployed'},
+        )
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from utils.deploy_history import DeployHistory
+
+
+class DeployHistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'history.json')
+
+    def history(self, **kwargs):
+        return DeployHistory(path=self.path, **kwargs)
+
+    def test_entries_are_kept_per_environment_newest_first(self):
+        self.history().record(environment='noe-live', label='master-a', user='noe')
+        self.history().record(environment='noe-staging', label='develop-b', user='noe')
+        self.history().record(environment='noe-live', label='master-c', user='noe')
+        self.assertEqual(
+            [entry['label'] for entry in self.history().entries('noe-live')],
+            ['master-c', 'master-a'],
+        )
+        self.assertEqual(self.history().entries('noe-dev'), [])
+
+    def test_history_is_trimmed_to_the_newest_entries(self):
+        history = self.history(maxEntries=2)
+        for label in ['master-a', 'master-b', 'master-c']:
+            history.record(environment='noe-live', label=label, user='noe')
+        self.assertEqual(
+            [entry['label'] for entry in history.entries('noe-live')],
+            ['master-c', 'master-b'],
+        )
+
+    def test_previous_label_skips_the_current_and_rolled_back_labels(self):
+        history = self.history()
+        self.assertIsNone(history.previous_label(environment='noe-live'))
+        for label in ['master-a', 'master-b', 'master-c']:
+            history.record(environment='noe-live', label=label, user='noe')
+        self.assertEqual(history.previous_label(environment='noe-live'), 'master-b')
+        history.record(
+            environment='noe-live',
+            label='master-b',
+            user='noe',
+            rollbackFrom='master-c',
+        )
+        # Rolling back twice goes further back rather than returning to the bad label
+        self.assertEqual(
+            history.previous_label(environment='noe-live', currentLabel='master-b'),
+            'master-a',
+        )
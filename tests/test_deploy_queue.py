@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from utils.deploy_queue import DeployQueue
+
+
+class DeployQueueTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def queue(self):
+        return DeployQueue(directory=self.directory.name)
+
+    def enqueue(
+        self, commitTime, environment='noe-staging', branch='develop', **kwargs
+    ):
+        return self.queue().enqueue(
+            service='Noe',
+            environment=environment,
+            branch=branch,
+            commitTime=commitTime,
+            **kwargs,
+        )
+
+    def test_queued_deploys_of_a_branch_coalesce_to_the_newest_commit(self):
+        older = self.enqueue(commitTime='20261017120000')
+        newer = self.enqueue(commitTime='20261017120500')
+        otherBranch = self.enqueue(commitTime='20261017110000', branch='feature')
+        late = self.enqueue(commitTime='20261017115900')
+        turns = {}
+        for jobId in [older, newer, otherBranch, late]:
+            with self.queue().turn(jobId=jobId, environment='noe-staging') as isCurrent:
+                turns[jobId] = isCurrent
+        self.assertEqual(
+            turns, {older: False, newer: True, otherBranch: True, late: False}
+        )
+        self.assertEqual(self.queue().orphaned_jobs(), [])
+
+    def test_deploys_are_serialised_per_environment_only(self):
+        running = {'noe-staging': 0, 'noe-live': 0}
+        overlaps = []
+        lock = threading.Lock()
+
+        def deploy(environment, commitTime):
+            jobId = self.enqueue(
+                commitTime=commitTime, environment=environment, branch=commitTime
+            )
+            with self.queue().turn(jobId=jobId, environment=environment):
+                with lock:
+                    running[environment] += 1
+                    overlaps.append(dict(running))
+                time.sleep(0.05)
+                with lock:
+                    running[environment] -= 1
+
+        threads = [
+            threading.Thread(target=deploy, args=(environment, str(index)))
+            for index in range(2)
+            for environment in ['noe-staging', 'noe-live']
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(max(counts.values()) == 1 for counts in overlaps))
+        self.assertIn({'noe-staging': 1, 'noe-live': 1}, overlaps)
+
+    def test_jobs_of_a_dead_process_are_resumable(self):
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        request = {'action': 'deploy', 'targets': [['Noe', 'noe-staging']]}
+        self.enqueue(commitTime='20261017120000', request=request)
+        self.enqueue(commitTime='20261017120000', environment='noe-live')
+        with open(self.queue().path) as file:
+            state = file.read()
+        with open(self.queue().path, 'w') as file:
+            file.write(state.replace(f'"pid": {os.getpid()}', f'"pid": {process.pid}'))
+
+        [job] = self.queue().orphaned_jobs()
+        self.assertEqual(job['request'], request)
+        self.assertEqual(self.queue().orphaned_jobs(), [])
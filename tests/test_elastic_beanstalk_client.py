@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+
+from aws_manager import ElasticBeanstalkClient
+
+
+class FakeElasticBeanstalk:
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.calls = []
+
+    def describe_environments(self, EnvironmentNames, IncludeDeleted):
+        self.calls.append(sorted(EnvironmentNames))
+        time.sleep(self.latency)
+        return {
+            'Environments': [
+                {
+                    'EnvironmentName': name,
+                    'Health': 'Green',
+                    'Status': 'Ready',
+                    'CNAME': f'{name}.elasticbeanstalk.com',
+                }
+                for name in EnvironmentNames
+                if not name.startswith('unknown')
+            ]
+        }
+
+
+class ElasticBeanstalkClientTestCase(unittest.TestCase):
+    def build_client(self, cacheTtl=60, latency=0):
+        client = ElasticBeanstalkClient(cacheTtl=cacheTtl)
+        client.client = FakeElasticBeanstalk(latency=latency)
+        return client
+
+    def test_reads_of_one_environment_share_a_describe_call(self):
+        client = self.build_client()
+        self.assertEqual(client.get_environment_health('noe-staging'), 'Green')
+        self.assertEqual(client.get_environment_status('noe-staging'), 'Ready')
+        self.assertEqual(
+            client.get_environment_dns('noe-staging'),
+            'noe-staging.elasticbeanstalk.com',
+        )
+        self.assertEqual(client.client.calls, [['noe-staging']])
+
+    def test_only_missing_environments_are_fetched(self):
+        client = self.build_client()
+        client.describe_environments(environmentNames=['noe-staging'])
+        environments = client.describe_environments(
+            environmentNames=['noe-staging', 'noe-live', 'unknown-live']
+        )
+        self.assertEqual(sorted(environments), ['noe-live', 'noe-staging'])
+        self.assertEqual(client.client.calls[1], ['noe-live', 'unknown-live'])
+        client.describe_environments(environmentNames=['unknown-live'])
+        self.assertEqual(len(client.client.calls), 2)
+
+    def test_expired_entries_are_refreshed_together(self):
+        client = self.build_client(cacheTtl=0.05)
+        client.describe_environments(environmentNames=['noe-staging'])
+        client.describe_environments(environmentNames=['fincher-staging'])
+        time.sleep(0.06)
+        client.describe_environments(environmentNames=['noe-staging'])
+        self.assertEqual(client.client.calls[2], ['fincher-staging', 'noe-staging'])
+        client.describe_environments(environmentNames=['fincher-staging'])
+        self.assertEqual(len(client.client.calls), 3)
+
+    def test_concurrent_reads_are_coalesced(self):
+        client = self.build_client(latency=0.1)
+        threads = [
+            threading.Thread(
+                target=client.get_environment_health, args=('noe-staging',)
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(client.client.calls, [['noe-staging']])
+
+    def test_create_environment_invalidates_the_cached_description(self):
+        client = self.build_client()
+        client.describe_environments(environmentNames=['noe-staging'])
+        client.client.create_environment = lambda **kwargs: {}
+        client.create_environment(
+            applicationName='noe',
+            environmentName='noe-staging',
+            description='',
+            tier={},
+            solutionStackName='',
+            optionSettings=[],
+        )
+        client.describe_environments(environmentNames=['noe-staging'])
+        self.assertEqual(len(client.client.calls), 2)
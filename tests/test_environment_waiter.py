@@ -0,0 +1,75 @@
+import threading
+import unittest
+
+from aws_manager import EnvironmentWaiter
+
+
+class FakeOrchestrator:
+    def __init__(self, healthTimelines):
+        self.healthTimelines = healthTimelines
+        self.calls = []
+
+    def describe_environments(self, environmentNames):
+        self.calls.append(list(environmentNames))
+        poll = len(self.calls) - 1
+        return {
+            name: {
+                'EnvironmentName': name,
+                'Health': timeline[min(poll, len(timeline) - 1)],
+                'CNAME': f'{name}.elasticbeanstalk.com',
+            }
+            for name, timeline in self.healthTimelines.items()
+            if name in environmentNames
+        }
+
+
+class EnvironmentWaiterTestCase(unittest.TestCase):
+    def waiter(self, orchestrator, timeout=5):
+        return EnvironmentWaiter(
+            orchestratorClient=orchestrator,
+            timeout=timeout,
+            initialPeriod=0.01,
+            maxPeriod=0.05,
+        )
+
+    def test_environments_are_watched_with_one_call_per_poll(self):
+        orchestrator = FakeOrchestrator(
+            {
+                'service-staging': ['Grey', 'Green'],
+                'service-live': ['Grey', 'Grey', 'Grey', 'Green'],
+            }
+        )
+        readyBatches = []
+        ready, notReady = self.waiter(orchestrator).wait(
+            environmentNames=['service-staging', 'service-live'],
+            onReady=lambda environments: readyBatches.append(sorted(environments)),
+        )
+        self.assertEqual(ready, ['service-staging', 'service-live'])
+        self.assertEqual(notReady, [])
+        self.assertEqual(readyBatches, [['service-staging'], ['service-live']])
+        self.assertEqual(orchestrator.calls[2], ['service-live'])
+
+    def test_slow_callback_does_not_delay_other_environments(self):
+        orchestrator = FakeOrchestrator(
+            {'service-staging': ['Green'], 'service-live': ['Grey', 'Green']}
+        )
+        liveReady = threading.Event()
+
+        def on_ready(environments):
+            if 'service-staging' in environments:
+                self.assertTrue(liveReady.wait(timeout=5))
+            else:
+                liveReady.set()
+
+        ready, _ = self.waiter(orchestrator).wait(
+            environmentNames=['service-staging', 'service-live'], onReady=on_ready
+        )
+        self.assertEqual(len(ready), 2)
+
+    def test_timeout(self):
+        orchestrator = FakeOrchestrator({'service-staging': ['Red']})
+        ready, notReady = self.waiter(orchestrator, timeout=0.1).wait(
+            environmentNames=['service-staging']
+        )
+        self.assertEqual(ready, [])
+        self.assertEqual(notReady, ['service-staging'])
@@ -0,0 +1,119 @@
+import datetime
+import unittest
+
+from aws_manager import EventStream
+
+
+def event(second, message, severity='INFO'):
+    return {
+        'EventDate': datetime.datetime(2026, 10, 17, 12, 0, second),
+        'Severity': severity,
+        'Message': message,
+    }
+
+
+class FakeOrchestrator:
+    def __init__(self, batches, statuses=None):
+        self.batches = batches
+        self.statuses = statuses or []
+        self.calls = []
+
+    def describe_events(self, environmentName, startTime=None, maxRecords=None):
+        self.calls.append(startTime)
+        events = self.batches.pop(0) if self.batches else []
+        return [e for e in events if startTime is None or e['EventDate'] >= startTime]
+
+    def describe_environments(self, environmentNames):
+        status = self.statuses.pop(0) if self.statuses else 'Ready'
+        return {name: {'Status': status} for name in environmentNames}
+
+
+class EventStreamTestCase(unittest.TestCase):
+    def test_events_sharing_the_cursor_date_are_not_repeated(self):
+        orchestrator = FakeOrchestrator(
+            batches=[
+                [event(0, 'Previous deployment completed.')],
+                [
+                    event(0, 'Previous deployment completed.'),
+                    event(1, 'Update starting.'),
+                ],
+                [
+                    event(1, 'Update starting.'),
+                    event(1, 'Deploying new version to instance(s).'),
+                    event(2, 'Environment update completed successfully.'),
+                ],
+            ]
+        )
+        stream = EventStream(
+            orchestratorClient=orchestrator, environmentName='noe-staging', period=0
+        )
+        stream.start()
+        received = []
+        succeeded = stream.follow(
+            onEvent=lambda e: received.append(e['Message']), timeout=1
+        )
+        self.assertTrue(succeeded)
+        self.assertEqual(
+            received,
+            [
+                'Update starting.',
+                'Deploying new version to instance(s).',
+                'Environment update completed successfully.',
+            ],
+        )
+        self.assertEqual(
+            orchestrator.calls[1:],
+            [event(0, '')['EventDate'], event(1, '')['EventDate']],
+        )
+
+    def test_error_events_are_reported_until_the_update_completes(self):
+        orchestrator = FakeOrchestrator(
+            batches=[
+                [],
+                [event(3, 'Instance deployment failed.', severity='ERROR')],
+                [event(4, 'Failed to deploy application.', severity='ERROR')],
+                [event(5, 'Rolled back the instance.')],
+            ],
+            statuses=['Updating', 'Ready'],
+        )
+        stream = EventStream(
+            orchestratorClient=orchestrator, environmentName='noe-staging', period=0
+        )
+        stream.start()
+        received = []
+        succeeded = stream.follow(
+            onEvent=lambda e: received.append(e['Message']), timeout=1
+        )
+        self.assertFalse(succeeded)
+        # The stream only ends once the environment is Ready for another update
+        self.assertEqual(
+            received,
+            [
+                'Instance deployment failed.',
+                'Failed to deploy application.',
+                'Rolled back the instance.',
+            ],
+        )
+
+    def test_error_event_before_a_successful_update_is_not_terminal(self):
+        orchestrator = FakeOrchestrator(
+            batches=[
+                [],
+                [event(3, 'Instance health check failed.', severity='ERROR')],
+                [event(4, 'Environment update completed successfully.')],
+            ]
+        )
+        stream = EventStream(
+            orchestratorClient=orchestrator, environmentName='noe-staging', period=0
+        )
+        stream.start()
+        self.assertTrue(stream.follow(onEvent=lambda e: None, timeout=1))
+
+    def test_no_terminal_event_before_timeout(self):
+        stream = EventStream(
+            orchestratorClient=FakeOrchestrator(batches=[]),
+            environmentName='noe-staging',
+            period=0.01,
+        )
+        stream.start()
+        self.assertIsNone(stream.follow(onEvent=lambda e: None, timeout=0.03))
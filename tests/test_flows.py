@@ -0,0 +1,23 @@
+import os
+import unittest
+
+from benchmarks import flows
+
+
+class FlowBudgetTestCase(unittest.TestCase):
+    def assert_within_budget(self, flow):
+        result = flows.measure(flow=flow, skeletonFiles=5)
+        self.assertEqual(flows.over_budget(result=result), [])
+        self.assertGreater(result['subprocesses'], 0)
+        self.assertGreater(result['apiCalls'], 0)
+
+    def test_create_service_within_budget(self):
+        journals = os.path.join(flows.BASE_DIR, '.journals')
+        existing = os.listdir(journals) if os.path.exists(journals) else []
+        self.assert_within_budget(flow='create_service')
+        self.assertEqual(
+            os.listdir(journals) if os.path.exists(journals) else [], existing
+        )
+
+    def test_deploy_within_budget(self):
+        self.assert_within_budget(flow='deploy')
@@ -0,0 +1,60 @@
+import unittest
+
+from utils.git_snapshot import GitSnapshot, load_git_snapshot
+
+HEAD_HASH = '3f1c2a9e8b7d6c5f4e3d2c1b0a9f8e7d6c5b4a39'
+
+
+class GitSnapshotTestCase(unittest.TestCase):
+    def test_parse_clean_tracking_branch(self):
+        snapshot = GitSnapshot.parse(
+            status=(
+                f'# branch.oid {HEAD_HASH}\n'
+                '# branch.head feature/search\n'
+                '# branch.upstream origin/feature/search\n'
+                '# branch.ab +2 -1\n'
+            ),
+            log='3f1c2a9-20261017120000\n',
+        )
+        self.assertEqual(snapshot.branch, 'feature/search')
+        self.assertEqual(snapshot.headHash, HEAD_HASH)
+        self.assertEqual(snapshot.upstream, 'origin/feature/search')
+        self.assertEqual((snapshot.ahead, snapshot.behind), (2, 1))
+        self.assertFalse(snapshot.isDirty)
+        self.assertEqual(snapshot.shortHashAndTime, '3f1c2a9-20261017120000')
+
+    def test_parse_dirty_detached_without_upstream(self):
+        snapshot = GitSnapshot.parse(
+            status=(
+                f'# branch.oid {HEAD_HASH}\n'
+                '# branch.head (detached)\n'
+                '? notes.txt\n'
+            )
+        )
+        self.assertEqual(snapshot.branch, 'HEAD')
+        self.assertIsNone(snapshot.upstream)
+        self.assertEqual((snapshot.ahead, snapshot.behind), (0, 0))
+        self.assertTrue(snapshot.isDirty)
+
+    def test_ignored_files_do_not_make_the_repo_dirty(self):
+        snapshot = GitSnapshot.parse(
+            status=f'# branch.oid {HEAD_HASH}\n# branch.head master\n! build/\n'
+        )
+        self.assertFalse(snapshot.isDirty)
+
+    def test_parse_rejects_other_output(self):
+        with self.assertRaises(ValueError):
+            GitSnapshot.parse(status=' M deploy.py\n')
+
+    def test_load_runs_one_status_and_one_log(self):
+        calls = []
+
+        def run_command(*args):
+            calls.append(args[:2])
+            if args[1] == 'status':
+                return f'# branch.oid {HEAD_HASH}\n# branch.head master'
+            return '3f1c2a9-20261017120000'
+
+        snapshot = load_git_snapshot(runCommand=run_command)
+        self.assertEqual(calls, [('git', 'status'), ('git', 'log')])
+        self.assertEqual(snapshot.branch, 'master')
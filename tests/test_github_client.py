@@ -0,0 +1,202 @@
+import http.server
+import json
+import threading
+import time
+import unittest
+
+from repo_manager import GithubClient
+from repo_manager.request_cache import ConditionalRequestCache
+
+
+class StubGithubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def respond(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-RateLimit-Limit', '5000')
+        self.send_header('X-RateLimit-Remaining', str(self.server.remaining))
+        self.send_header('X-RateLimit-Reset', str(int(time.time()) + 60))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.requests.append((self.command, self.path, body))
+        if self.server.exhausted:
+            self.server.exhausted -= 1
+            self.server.remaining = 0
+            return self.respond(403, {'message': 'API rate limit exceeded'})
+        self.server.remaining = self.server.nextRemaining
+        resource = self.server.resources.get(self.path)
+        if self.command == 'GET':
+            if resource is None:
+                return self.respond(404, {'message': 'Not Found'})
+            etag = f'"{hash(json.dumps(resource, sort_keys=True))}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.server.notModified += 1
+                return self.respond(304)
+            return self.respond(200, resource, {'ETag': etag})
+        if self.command == 'POST' and self.path.endswith('/repos'):
+            repo = self.server.repo(name=body['name'])
+            self.server.resources[f'/repos/acme/{body["name"]}'] = repo
+            return self.respond(201, repo)
+        if self.command == 'PATCH' and resource is not None:
+            resource.update(body)
+            return self.respond(200, resource)
+        return self.respond(200, {})
+
+    do_GET = do_POST = do_PATCH = do_PUT = handle_request
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GithubClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), StubGithubHandler
+        )
+        self.baseUrl = f'http://127.0.0.1:{self.server.server_port}'
+        self.server.requests = []
+        self.server.notModified = 0
+        self.server.remaining = 5000
+        self.server.nextRemaining = 5000
+        self.server.exhausted = 0
+        self.server.repo = self.repo
+        self.server.resources = {
+            '/orgs/acme': {'login': 'acme', 'url': f'{self.baseUrl}/orgs/acme'},
+            '/repos/acme/Existing': self.repo(name='Existing'),
+            '/repos/acme/Existing/branches/develop': {
+                'name': 'develop',
+                'protection_url': f'{self.baseUrl}/repos/acme/Existing/branches/develop/protection',
+            },
+        }
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.sleeps = []
+        self.client = GithubClient(token='token', baseUrl=self.baseUrl)
+        self.client.client
+        self.client.requestCache.sleep = self.sleeps.append
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def repo(self, name):
+        return {
+            'name': name,
+            'full_name': f'acme/{name}',
+            'url': f'{self.baseUrl}/repos/acme/{name}',
+            'ssh_url': f'git@github.com:acme/{name}.git',
+            'default_branch': 'master',
+        }
+
+    def requests(self, command):
+        return [path for verb, path, _ in self.server.requests if verb == command]
+
+    def test_organisation_and_repo_handles_are_memoised(self):
+        for name in ['First', 'Second']:
+            self.client.create_repo(
+                repoName=name,
+                organisationName='acme',
+                gitignoreTemplate='Python',
+                autoInit=True,
+                description='',
+                private=True,
+                deleteBranchOnMerge=True,
+            )
+        self.assertEqual(
+            self.client.get_repo(owner='acme', repoName='First').ssh_url,
+            'git@github.com:acme/First.git',
+        )
+        self.client.get_repo(owner='acme', repoName='Existing')
+        self.client.get_repo(owner='acme', repoName='Existing')
+        self.assertEqual(self.requests('GET'), ['/orgs/acme', '/repos/acme/Existing'])
+
+    def test_branch_handles_are_memoised(self):
+        repo = self.client.get_repo(owner='acme', repoName='Existing')
+        for _ in range(2):
+            self.client.edit_branch_protection_rules(
+                repo=repo,
+                branchName='develop',
+                strict=True,
+                contexts=[],
+                enforceAdmins=True,
+            )
+        self.assertEqual(
+            self.requests('GET').count('/repos/acme/Existing/branches/develop'), 1
+        )
+        self.assertEqual(len(self.requests('PUT')), 2)
+
+    def test_repeated_reads_are_served_from_cache_on_304(self):
+        first = self.client.client.get_repo(full_name_or_id='acme/Existing')
+        second = self.client.client.get_repo(full_name_or_id='acme/Existing')
+        self.assertEqual(second.ssh_url, first.ssh_url)
+        self.assertEqual(self.server.notModified, 1)
+        self.assertEqual(self.client.requestCache.hits, 1)
+
+    def test_writes_invalidate_cached_reads(self):
+        repo = self.client.client.get_repo(full_name_or_id='acme/Existing')
+        self.client.edit_default_branch_for_repo(repo=repo, defaultBranch='develop')
+        fresh = self.client.client.get_repo(full_name_or_id='acme/Existing')
+        self.assertEqual(fresh.default_branch, 'develop')
+        self.assertEqual(self.server.notModified, 0)
+
+    def test_throttles_when_rate_limit_budget_is_low(self):
+        self.server.nextRemaining = 10
+        self.client.get_repo(owner='acme', repoName='Existing')
+        self.assertEqual(self.sleeps, [])
+        self.client._get_organisation(organisationName='acme')
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertGreater(self.sleeps[0], 0)
+        self.assertLessEqual(self.sleeps[0], 6.1)
+
+    def test_waits_for_reset_instead_of_failing_when_exhausted(self):
+        self.server.exhausted = 1
+        repo = self.client.get_repo(owner='acme', repoName='Existing')
+        self.assertEqual(repo.full_name, 'acme/Existing')
+        self.assertEqual(len(self.requests('GET')), 2)
+        self.assertEqual(len(self.sleeps), 1)
+
+
+class FakeRequester:
+    rate_limiting = (5000, 5000)
+
+    def __init__(self):
+        self.calls = []
+
+    def requestJson(
+        self,
+        verb,
+        url,
+        parameters=None,
+        headers=None,
+        input=None,
+        cnx=None,
+        follow_302_redirect=False,
+    ):
+        self.calls.append((verb, url, input, follow_302_redirect))
+        return 200, {}, '{}'
+
+
+class ConditionalRequestCacheTestCase(unittest.TestCase):
+    def test_arguments_of_newer_pygithub_versions_are_forwarded(self):
+        requester = FakeRequester()
+        ConditionalRequestCache(requester=requester, baseUrl='https://api.github.com')
+        requester.requestJson(
+            'GET',
+            'https://api.github.com/repos/acme/Existing',
+            None,
+            None,
+            input=None,
+            follow_302_redirect=True,
+        )
+        self.assertEqual(
+            requester.calls,
+            [('GET', 'https://api.github.com/repos/acme/Existing', None, True)],
+        )
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from utils.journal import StepJournal
+from utils.task_graph import TaskGraph
+
+
+class StepJournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'journals', 'noe.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def build_graph(self, calls, failing=()):
+        def step(name):
+            calls.append(name)
+            if name in failing:
+                raise SystemExit(f'Error: {name} failed')
+
+        taskGraph = TaskGraph(maxWorkers=1)
+        taskGraph.add('create_repo', lambda: step('create_repo'))
+        taskGraph.add('create_build', lambda: step('create_build'), ['create_repo'])
+        taskGraph.add('add_template', lambda: step('add_template'), ['create_repo'])
+        taskGraph.add(
+            'trigger_build',
+            lambda: step('trigger_build'),
+            ['create_build', 'add_template'],
+        )
+        return taskGraph
+
+    def test_rerun_resumes_at_first_incomplete_step(self):
+        calls = []
+        journal = StepJournal(path=self.path)
+        taskGraph = self.build_graph(calls=calls, failing=['add_template'])
+        taskGraph.run(
+            onTaskDone=lambda step, result: journal.record(
+                step=step, outputs={f'{step}Output': step}
+            )
+        )
+
+        journal = StepJournal(path=self.path)
+        self.assertEqual(
+            sorted(journal.completed_steps()), ['create_build', 'create_repo']
+        )
+        self.assertEqual(journal.outputs()['create_buildOutput'], 'create_build')
+
+        calls = []
+        taskGraph = self.build_graph(calls=calls)
+        taskGraph.run(
+            completed=journal.completed_steps(),
+            onTaskDone=lambda step, result: journal.record(step=step),
+        )
+        self.assertEqual(calls, ['add_template', 'trigger_build'])
+        self.assertEqual(len(StepJournal(path=self.path).completed_steps()), 4)
+
+    def test_reset_from_step_includes_descendants(self):
+        journal = StepJournal(path=self.path)
+        for step in ['create_repo', 'create_build', 'add_template', 'trigger_build']:
+            journal.record(step=step)
+        taskGraph = self.build_graph(calls=[])
+        journal.reset(
+            steps=['create_build', *taskGraph.descendants(name='create_build')]
+        )
+        self.assertEqual(
+            StepJournal(path=self.path).completed_steps(),
+            ['create_repo', 'add_template'],
+        )
+
+    def test_discarded_journal_starts_afresh(self):
+        journal = StepJournal(path=self.path)
+        journal.record(step='create_repo')
+        journal.discard()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(StepJournal(path=self.path).completed_steps(), [])
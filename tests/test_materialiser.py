@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+from models import FastAPI
+from utils.materialiser import SkeletonMaterialiser
+
+
+class SkeletonMaterialiserTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'Fincher')
+        self.destination = os.path.join(self.directory.name, 'Noe')
+        files = {
+            'README.md': 'Fincher\n',
+            '.DS_Store': '',
+            '.git/config': '',
+            'buildspec.yaml': 'fincher-build\n',
+            'requirements.txt': 'fastapi\n',
+            'app/fincher/__init__.py': '',
+            'app/fincher/api/fincher.py': 'fincher = "Fincher"\n',
+            'app/tests/__init__.py': 'from .fincher_test_case import *\n',
+            'app/tests/fincher_test_case.py': 'class FincherTestCase:\n',
+        }
+        for name, content in files.items():
+            path = os.path.join(self.source, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as file:
+                file.write(content)
+        self.template = FastAPI()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def materialise(self, link=False):
+        return SkeletonMaterialiser(
+            source=self.source,
+            destination=self.destination,
+            renames={
+                originalName: originalName.replace(self.template.SERVICE, 'noe')
+                for originalName in self.template.FILES_AND_REPOS
+            },
+            templateFiles=[
+                name
+                for name in self.template.TEMPLATE_FILES
+                if os.path.exists(os.path.join(self.source, name))
+            ],
+            values={self.template.REPO: 'Noe', self.template.SERVICE: 'noe'},
+            link=link,
+        ).materialise()
+
+    def read(self, name):
+        with open(os.path.join(self.destination, name)) as file:
+            return file.read()
+
+    def test_excludes_renames_and_renders_in_one_pass(self):
+        self.materialise()
+        createdFiles = sorted(
+            os.path.relpath(os.path.join(directory, name), self.destination)
+            for directory, _, names in os.walk(self.destination)
+            for name in names
+        )
+        self.assertEqual(
+            createdFiles,
+            [
+                'app/noe/__init__.py',
+                'app/noe/api/fincher.py',
+                'app/tests/__init__.py',
+                'app/tests/noe_test_case.py',
+                'buildspec.yaml',
+                'requirements.txt',
+            ],
+        )
+        self.assertEqual(self.read('buildspec.yaml'), 'noe-build\n')
+        self.assertEqual(
+            self.read('app/tests/noe_test_case.py'), 'class NoeTestCase:\n'
+        )
+        self.assertEqual(self.read('app/noe/api/fincher.py'), 'fincher = "Fincher"\n')
+
+    def test_unchanged_files_are_linked_on_request_and_templates_are_not(self):
+        self.materialise(link=True)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.source, 'requirements.txt'),
+                os.path.join(self.destination, 'requirements.txt'),
+            )
+        )
+        self.assertFalse(
+            os.path.samefile(
+                os.path.join(self.source, 'buildspec.yaml'),
+                os.path.join(self.destination, 'buildspec.yaml'),
+            )
+        )
+
+    def test_copy_overwrites_existing_files(self):
+        os.makedirs(self.destination)
+        with open(os.path.join(self.destination, 'requirements.txt'), 'w') as file:
+            file.write('old\n')
+        self.materialise()
+        self.assertEqual(self.read('requirements.txt'), 'fastapi\n')
+        self.assertFalse(
+            os.path.samefile(
+                os.path.join(self.source, 'requirements.txt'),
+                os.path.join(self.destination, 'requirements.txt'),
+            )
+        )
+
+    def test_writes_to_copied_files_leave_the_template_untouched(self):
+        self.materialise()
+        with open(os.path.join(self.destination, 'requirements.txt'), 'w') as file:
+            file.write('uvicorn\n')
+        with open(os.path.join(self.source, 'requirements.txt')) as file:
+            self.assertEqual(file.read(), 'fastapi\n')
@@ -0,0 +1,35 @@
+import time
+import unittest
+
+from utils.rate_limiter import RateLimitedClient, RateLimiter
+
+
+class Client:
+    def __init__(self):
+        self.calls = 0
+        self.name = 'client'
+
+    def call(self):
+        self.calls += 1
+        return self.calls
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def test_burst_is_immediate_then_calls_are_paced(self):
+        client = RateLimitedClient(
+            client=Client(), rateLimiter=RateLimiter(rate=20, burst=5)
+        )
+        start = time.monotonic()
+        for _ in range(5):
+            client.call()
+        self.assertLess(time.monotonic() - start, 0.05)
+        for _ in range(4):
+            client.call()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(client.call(), 10)
+
+    def test_attributes_are_not_rate_limited(self):
+        client = RateLimitedClient(
+            client=Client(), rateLimiter=RateLimiter(rate=0.001, burst=0)
+        )
+        self.assertEqual(client.name, 'client')
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from utils import utils
+from utils.renderer import TemplateRenderer
+
+
+class TemplateRendererTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.cwd, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def read(self, name):
+        with open(os.path.join(self.cwd, name)) as file:
+            return file.read()
+
+    def test_substituted_values_are_not_substituted_again(self):
+        renderer = TemplateRenderer(values={'Fincher': 'fincher', 'fincher': 'x'})
+        self.assertEqual(renderer.render_text('Fincher fincher'), 'fincher x')
+
+    def test_longest_key_wins(self):
+        renderer = TemplateRenderer(values={'fin': 'a', 'fincher': 'b'})
+        self.assertEqual(renderer.render_text('fincher fin'), 'b a')
+
+    def test_templates_to_files_renders_in_place_without_backups(self):
+        self.write('buildspec.yaml', 'Fincher\nfincher\n')
+        self.write('app/tests/fincher_test_case.py', 'class FincherTestCase:\n')
+        utils.templates_to_files(
+            templateFiles=['buildspec.yaml', 'app/tests/fincher_test_case.py'],
+            values={'Fincher': 'Noe', 'fincher': 'noe'},
+            cwd=self.cwd,
+            deleteBackup=True,
+        )
+        self.assertEqual(self.read('buildspec.yaml'), 'Noe\nnoe\n')
+        self.assertEqual(
+            self.read('app/tests/fincher_test_case.py'), 'class NoeTestCase:\n'
+        )
+        self.assertEqual(sorted(os.listdir(self.cwd)), ['app', 'buildspec.yaml'])
+
+    def test_template_to_file_with_destination_keeps_template(self):
+        self.write('templates/eb_config.yml', 'application_name: serviceName\n')
+        destination = os.path.join(self.cwd, 'service')
+        os.makedirs(destination)
+        utils.template_to_file(
+            templateFile='eb_config.yml',
+            values={'serviceName': 'noe'},
+            cwd=os.path.join(self.cwd, 'templates'),
+            destination=destination,
+            newTemplateFileName='config.yml',
+        )
+        self.assertEqual(self.read('service/config.yml'), 'application_name: noe\n')
+        self.assertEqual(
+            self.read('templates/eb_config.yml'), 'application_name: serviceName\n'
+        )
@@ -0,0 +1,101 @@
+import threading
+import unittest
+
+from aws_manager import Route53Client
+
+
+class FakeRoute53:
+    def __init__(self, statuses=()):
+        self.batches = []
+        self.statuses = list(statuses)
+        self.getChangeCalls = 0
+
+    def change_resource_record_sets(self, HostedZoneId, ChangeBatch):
+        self.batches.append((HostedZoneId, ChangeBatch['Changes']))
+        return {'ChangeInfo': {'Id': f'/change/C{len(self.batches)}'}}
+
+    def get_change(self, Id):
+        self.getChangeCalls += 1
+        status = self.statuses.pop(0) if self.statuses else 'INSYNC'
+        return {'ChangeInfo': {'Id': Id, 'Status': status}}
+
+
+def alias(name, dnsName='env.elasticbeanstalk.com'):
+    return {
+        'Name': name,
+        'Type': 'A',
+        'AliasTarget': {'DNSName': dnsName},
+    }
+
+
+class Route53ClientTestCase(unittest.TestCase):
+    def test_records_are_upserted_in_one_change_batch(self):
+        client = Route53Client()
+        client.client = FakeRoute53()
+        changeIds = client.upsert_records(
+            hostedZoneId='ZONE',
+            resourceRecordSets=[
+                alias('noe.example.com'),
+                alias('staging.noe.example.com'),
+            ],
+        )
+        self.assertEqual(changeIds, ['/change/C1'])
+        [(hostedZoneId, changes)] = client.client.batches
+        self.assertEqual(hostedZoneId, 'ZONE')
+        self.assertEqual({change['Action'] for change in changes}, {'UPSERT'})
+        self.assertEqual(len(changes), 2)
+
+    def test_concurrent_callers_share_a_change_batch(self):
+        client = Route53Client(coalesceWindow=0.2)
+        client.client = FakeRoute53()
+        results = {}
+
+        def upsert(service):
+            results[service] = client.upsert_records(
+                hostedZoneId='ZONE',
+                resourceRecordSets=[
+                    alias(f'{service}.example.com'),
+                    alias(
+                        f'{service}.example.com', dnsName='newer.elasticbeanstalk.com'
+                    ),
+                ],
+            )
+
+        threads = [
+            threading.Thread(target=upsert, args=(service,))
+            for service in ['noe', 'fincher', 'kubrick']
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(client.client.batches), 1)
+        changes = client.client.batches[0][1]
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(
+            {
+                change['ResourceRecordSet']['AliasTarget']['DNSName']
+                for change in changes
+            },
+            {'newer.elasticbeanstalk.com'},
+        )
+        self.assertEqual(set(map(tuple, results.values())), {('/change/C1',)})
+
+    def test_wait_polls_until_in_sync_and_remembers_synced_changes(self):
+        client = Route53Client()
+        client.client = FakeRoute53(statuses=['PENDING', 'PENDING', 'INSYNC'])
+        notSynced = client.wait_for_changes(
+            changeIds=['/change/C1', '/change/C1'], initialPeriod=0.01, maxPeriod=0.02
+        )
+        self.assertEqual(notSynced, [])
+        self.assertEqual(client.client.getChangeCalls, 3)
+        client.wait_for_changes(changeIds=['/change/C1'])
+        self.assertEqual(client.client.getChangeCalls, 3)
+
+    def test_wait_returns_changes_still_pending_at_timeout(self):
+        client = Route53Client()
+        client.client = FakeRoute53(statuses=['PENDING'] * 100)
+        notSynced = client.wait_for_changes(
+            changeIds=['/change/C1'], timeout=0.05, initialPeriod=0.01, maxPeriod=0.01
+        )
+        self.assertEqual(notSynced, ['/change/C1'])
@@ -0,0 +1,109 @@
+import http.server
+import json
+import threading
+import time
+import unittest
+
+from messaging_manager import SlackClient
+
+
+class StubSlackHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.path, json.loads(body)))
+        time.sleep(self.server.latency)
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlackClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), StubSlackHandler
+        )
+        self.server.requests = []
+        self.server.latency = 0
+        self.server.status = 200
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.serviceURL = f'http://127.0.0.1:{self.server.server_port}/'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_synchronous_delivery(self):
+        client = SlackClient(serviceURL=self.serviceURL)
+        client.send_slack(channel='devs', message='hello', colour='good')
+        self.assertEqual(len(self.server.requests), 1)
+        path, payload = self.server.requests[0]
+        self.assertEqual(path, '/devs')
+        self.assertEqual(payload['attachments'][0]['fields'][0]['value'], 'hello')
+
+    def test_asynchronous_delivery_coalesces_per_channel(self):
+        self.server.latency = 0.2
+        client = SlackClient(
+            serviceURL=self.serviceURL, asynchronous=True, coalesceWindow=0.2
+        )
+        start = time.monotonic()
+        for index in range(3):
+            client.send_slack(channel='devs', message=f'devs {index}')
+        client.send_slack(channel='general', message='general')
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertTrue(client.flush(timeout=5))
+
+        messagesByChannel = {
+            path: [attachment['fallback'] for attachment in payload['attachments']]
+            for path, payload in self.server.requests
+        }
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            messagesByChannel,
+            {'/devs': ['devs 0', 'devs 1', 'devs 2'], '/general': ['general']},
+        )
+
+    def test_flush_gives_up_after_deadline(self):
+        self.server.latency = 1
+        client = SlackClient(
+            serviceURL=self.serviceURL, asynchronous=True, coalesceWindow=0
+        )
+        client.send_slack(channel='devs', message='slow')
+        self.assertFalse(client.flush(timeout=0.1))
+        self.assertTrue(client.flush(timeout=5))
+
+    def test_http_errors_do_not_raise(self):
+        self.server.status = 500
+        client = SlackClient(serviceURL=self.serviceURL)
+        client.send_slack(channel='devs', message='hello')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_unexpected_errors_do_not_stop_delivery(self):
+        client = SlackClient(
+            serviceURL=self.serviceURL, asynchronous=True, coalesceWindow=0
+        )
+        post = client._post
+        failures = [ValueError('Out of range float values are not JSON compliant')]
+
+        def flaky_post(**kwargs):
+            if failures:
+                raise failures.pop()
+            return post(**kwargs)
+
+        client._post = flaky_post
+        client.send_slack(channel='devs', message='first')
+        self.assertTrue(client.flush(timeout=5))
+        client.send_slack(channel='devs', message='second')
+        self.assertTrue(client.flush(timeout=5))
+        self.assertEqual(
+            [
+                payload['attachments'][0]['fallback']
+                for _, payload in self.server.requests
+            ],
+            ['second'],
+        )
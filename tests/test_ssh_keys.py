@@ -0,0 +1,69 @@
+import concurrent.futures
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.ssh_keys import SshKeyPool, add_host_alias, read_public_key
+
+
+@unittest.skipUnless(shutil.which('ssh-keygen'), 'ssh-keygen is not installed')
+class SshKeyPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.pool = SshKeyPool(
+            directory=os.path.join(self.directory.name, 'pool'),
+            size=3,
+            comment='noe@example.com',
+        )
+
+    def key_file(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_claimed_keys_come_from_the_pool_and_are_replaced(self):
+        self.pool.fill()
+        pooled = {read_public_key(path=key) for key in self.pool.ready_keys()}
+        self.assertEqual(len(pooled), 3)
+        self.pool.claim(path=self.key_file('noe_first'))
+        publicKey = read_public_key(path=self.key_file('noe_first'))
+        self.assertIn(publicKey, pooled)
+        self.assertTrue(publicKey.startswith('ssh-ed25519 '))
+        self.pool.start_filling().join()
+        self.assertEqual(len(self.pool.ready_keys()), 3)
+
+    def test_concurrent_claims_get_distinct_keys(self):
+        self.pool.fill()
+        names = [f'noe_{index}' for index in range(5)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            list(
+                executor.map(
+                    lambda name: self.pool.claim(path=self.key_file(name)), names
+                )
+            )
+        self.pool.start_filling().join()
+        publicKeys = {read_public_key(path=self.key_file(name)) for name in names}
+        self.assertEqual(len(publicKeys), 5)
+
+    def test_claiming_again_replaces_the_service_key(self):
+        path = self.key_file('noe_first')
+        self.pool.claim(path=path)
+        first = read_public_key(path=path)
+        self.pool.claim(path=path)
+        self.pool.start_filling().join()
+        self.assertNotEqual(read_public_key(path=path), first)
+        self.assertEqual(os.stat(path).st_mode & 0o077, 0)
+
+
+class HostAliasTestCase(unittest.TestCase):
+    def test_alias_is_added_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            configPath = os.path.join(directory, 'config')
+            for _ in range(2):
+                add_host_alias(
+                    host='Noe', identityFile='/keys/noe', configPath=configPath
+                )
+            with open(configPath) as file:
+                config = file.read()
+        self.assertEqual(config.count('Host Noe\n'), 1)
+        self.assertIn('  IdentityFile /keys/noe\n', config)
@@ -0,0 +1,47 @@
+import threading
+import unittest
+
+from utils.task_graph import TaskGraph
+
+
+class TaskGraphTestCase(unittest.TestCase):
+    def test_independent_tasks_run_concurrently(self):
+        barrier = threading.Barrier(parties=3, timeout=5)
+        taskGraph = TaskGraph(maxWorkers=3)
+        for name in ['a', 'b', 'c']:
+            taskGraph.add(name, barrier.wait)
+        taskGraph.run()
+        self.assertEqual(taskGraph.failures, {})
+        self.assertEqual(sorted(taskGraph.results), ['a', 'b', 'c'])
+
+    def test_dependencies_run_in_order(self):
+        order = []
+        taskGraph = TaskGraph()
+        taskGraph.add('first', lambda: order.append('first'))
+        taskGraph.add('second', lambda: order.append('second'), dependsOn=['first'])
+        taskGraph.add('third', lambda: order.append('third'), dependsOn=['second'])
+        taskGraph.run()
+        self.assertEqual(order, ['first', 'second', 'third'])
+
+    def test_failures_are_reported_together(self):
+        def fail(message):
+            raise SystemExit(message)
+
+        taskGraph = TaskGraph()
+        taskGraph.add('a', lambda: fail('Error: a'))
+        taskGraph.add('b', lambda: fail('Error: b'))
+        taskGraph.add('c', lambda: None, dependsOn=['a'])
+        taskGraph.add('d', lambda: None, dependsOn=['c'])
+        taskGraph.add('e', lambda: 'ok')
+        taskGraph.run()
+        self.assertEqual(taskGraph.results, {'e': 'ok'})
+        self.assertEqual(sorted(taskGraph.skipped), ['c', 'd'])
+        with self.assertRaises(SystemExit) as context:
+            taskGraph.raise_for_failures()
+        self.assertIn('[a] Error: a', str(context.exception))
+        self.assertIn('[b] Error: b', str(context.exception))
+
+    def test_unknown_dependency(self):
+        taskGraph = TaskGraph()
+        with self.assertRaises(ValueError):
+            taskGraph.add('a', lambda: None, dependsOn=['missing'])
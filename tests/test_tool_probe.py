@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.tool_probe import ToolProbeCache
+
+
+class ToolProbeCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.bin = os.path.join(self.directory.name, 'bin')
+        os.makedirs(self.bin)
+        self.tool = os.path.join(self.bin, 'eb')
+        self.write_tool('#!/bin/sh\necho "EB CLI 3.20.0"\n')
+        patcher = mock.patch.dict(os.environ, {'PATH': self.bin})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(self.directory.name, 'cache', 'tools.json')
+        self.probes = []
+
+    def write_tool(self, content):
+        with open(self.tool, 'w') as file:
+            file.write(content)
+        os.chmod(self.tool, 0o755)
+
+    def probe(self, recheck=False):
+        def run():
+            self.probes.append('eb')
+            return 'EB CLI 3.20.0'
+
+        return ToolProbeCache(path=self.path).probe(
+            command='eb', probe=run, recheck=recheck
+        )
+
+    def test_repeat_runs_reuse_the_cached_version(self):
+        self.assertEqual(self.probe(), 'EB CLI 3.20.0')
+        self.assertEqual(self.probe(), 'EB CLI 3.20.0')
+        self.assertEqual(self.probes, ['eb'])
+
+    def test_changed_binary_or_recheck_probes_again(self):
+        self.probe()
+        self.write_tool('#!/bin/sh\necho "EB CLI 3.21.0 (upgraded)"\n')
+        self.probe()
+        self.probe(recheck=True)
+        self.assertEqual(self.probes, ['eb', 'eb', 'eb'])
+
+    def test_missing_tool_is_not_probed(self):
+        os.remove(self.tool)
+        with self.assertRaises(OSError):
+            self.probe()
+        self.assertEqual(self.probes, [])
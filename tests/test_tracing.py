@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+
+from utils.tracing import Tracer
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def describe(self):
+        self.calls += 1
+        return 'described'
+
+
+class TracerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tracer = Tracer()
+        self.directory = tempfile.TemporaryDirectory()
+        self.traceFile = os.path.join(self.directory.name, 'trace.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_disabled_tracer_records_nothing(self):
+        client = FakeClient()
+        self.assertIs(self.tracer.trace_client(client=client, category='aws'), client)
+        with self.tracer.span('step'):
+            pass
+        self.assertEqual(self.tracer.spans, [])
+
+    def test_self_time_excludes_nested_spans(self):
+        self.tracer.enabled = True
+        self.tracer.spans = [
+            {
+                'name': 'outer',
+                'category': 'step',
+                'start': 0,
+                'end': 100,
+                'tid': 1,
+                'args': {},
+            },
+            {
+                'name': 'inner',
+                'category': 'aws',
+                'start': 10,
+                'end': 40,
+                'tid': 1,
+                'args': {},
+            },
+            {
+                'name': 'inner',
+                'category': 'aws',
+                'start': 50,
+                'end': 70,
+                'tid': 1,
+                'args': {},
+            },
+            {
+                'name': 'other',
+                'category': 'step',
+                'start': 20,
+                'end': 90,
+                'tid': 2,
+                'args': {},
+            },
+        ]
+        rows = {row['name']: row for row in self.tracer.summary()}
+        self.assertEqual(rows['outer']['self'], 50)
+        self.assertEqual(rows['inner']['self'], 50)
+        self.assertEqual(rows['inner']['count'], 2)
+        self.assertEqual(rows['other']['self'], 70)
+
+    def test_recording_exports_client_and_subprocess_spans(self):
+        with self.tracer.recording(traceFile=self.traceFile):
+            client = self.tracer.trace_client(client=FakeClient(), category='aws')
+            self.assertEqual(client.describe(), 'described')
+            subprocess.run(['true'])
+        self.assertFalse(self.tracer.enabled)
+        self.assertEqual(subprocess.run.__module__, 'subprocess')
+        with open(self.traceFile) as file:
+            events = json.load(file)['traceEvents']
+        names = {event['name']: event for event in events if event['ph'] == 'X'}
+        self.assertEqual(names['FakeClient.describe']['cat'], 'aws')
+        self.assertEqual(names['subprocess: true']['cat'], 'subprocess')
+        self.assertIn('total', names)
@@ -0,0 +1,36 @@
+import json
+import os
+import socket
+
+from .tool_probe import user_cache_dir
+
+
+def default_socket_path():
+    runtimeDir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtimeDir:
+        return os.path.join(runtimeDir, 'flouflou.sock')
+    return os.path.join(user_cache_dir(), 'daemon.sock')
+
+
+def submit(request, socketPath=None, onLog=print):
+    socketPath = socketPath or default_socket_path()
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(socketPath)
+    except OSError as exception:
+        raise SystemExit(
+            f'Error: Could not reach the daemon at {socketPath} ({exception}), '
+            'is "python daemon.py" running?'
+        )
+    with connection, connection.makefile('rwb') as stream:
+        stream.write(json.dumps(request).encode() + b'\n')
+        stream.flush()
+        for line in stream:
+            message = json.loads(line)
+            if message['type'] == 'log':
+                onLog(message['message'])
+            elif message['type'] == 'result':
+                if message['status'] != 'ok':
+                    raise SystemExit(message['message'])
+                return
+    raise SystemExit('Error: the daemon closed the connection before the request ended')
@@ -0,0 +1,70 @@
+import contextlib
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+from .file_lock import locked
+
+
+def previous_label(entries, currentLabel=None):
+    if currentLabel is None and entries:
+        currentLabel = entries[0]['label']
+    for entry in entries:
+        if entry['label'] != currentLabel and not entry['rolledBack']:
+            return entry['label']
+    return None
+
+
+class DeployHistory:
+    def __init__(self, path, maxEntries=50):
+        self.path = path
+        self.maxEntries = maxEntries
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _environments(self, save=True):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, locked(f'{self.path}.lock'):
+            try:
+                with open(self.path) as file:
+                    environments = json.load(file)['environments']
+            except (OSError, ValueError, KeyError):
+                environments = {}
+            yield environments
+            if not save:
+                return
+            fileDescriptor, temporaryFile = tempfile.mkstemp(
+                dir=directory, suffix='.tmp'
+            )
+            with open(fileDescriptor, 'w') as file:
+                json.dump({'environments': environments}, file, indent=2)
+            os.replace(temporaryFile, self.path)
+
+    def record(self, environment, label, user, rollbackFrom=None):
+        with self._environments() as environments:
+            entries = environments.setdefault(environment, [])
+            if rollbackFrom:
+                for entry in entries:
+                    if entry['label'] == rollbackFrom:
+                        entry['rolledBack'] = True
+            entries.append(
+                {
+                    'label': label,
+                    'user': user,
+                    'deployedAt': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'rolledBack': False,
+                }
+            )
+            del entries[: -self.maxEntries]
+
+    def entries(self, environment):
+        with self._environments(save=False) as environments:
+            return list(reversed(environments.get(environment, [])))
+
+    def previous_label(self, environment, currentLabel=None):
+        return previous_label(
+            entries=self.entries(environment=environment), currentLabel=currentLabel
+        )
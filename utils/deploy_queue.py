@@ -0,0 +1,123 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from .file_lock import locked
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class DeployQueue:
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, 'queue.json')
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _state(self, save=True):
+        # Every process deploying from this checkout shares the same queue file
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, locked(f'{self.path}.lock'):
+            try:
+                with open(self.path) as file:
+                    jobs = json.load(file)['jobs']
+            except (OSError, ValueError, KeyError):
+                jobs = {}
+            yield jobs
+            if not save:
+                return
+            fileDescriptor, temporaryFile = tempfile.mkstemp(
+                dir=self.directory, suffix='.tmp'
+            )
+            with open(fileDescriptor, 'w') as file:
+                json.dump({'jobs': jobs}, file, indent=2)
+            os.replace(temporaryFile, self.path)
+
+    def enqueue(self, service, environment, branch, commitTime, request=None):
+        jobId = uuid.uuid4().hex
+        job = {
+            'service': service,
+            'environment': environment,
+            'branch': branch,
+            'commitTime': commitTime,
+            'status': 'queued',
+            'enqueuedAt': time.time(),
+            'pid': os.getpid(),
+            'request': request,
+        }
+        with self._state() as jobs:
+            for other in jobs.values():
+                if (
+                    other['status'] != 'queued'
+                    or other['environment'] != environment
+                    or other['branch'] != branch
+                ):
+                    continue
+                # Only the newest commit of a branch is worth deploying
+                if other['commitTime'] <= commitTime:
+                    other['status'] = 'superseded'
+                else:
+                    job['status'] = 'superseded'
+            jobs[jobId] = job
+        return jobId
+
+    def status(self, jobId):
+        with self._state(save=False) as jobs:
+            return jobs[jobId]['status'] if jobId in jobs else None
+
+    def _set_status(self, jobId, status):
+        with self._state() as jobs:
+            if status in ('done', 'failed', 'superseded'):
+                jobs.pop(jobId, None)
+            elif jobId in jobs:
+                jobs[jobId]['status'] = status
+
+    @contextlib.contextmanager
+    def turn(self, jobId, environment):
+        # Deploys of one environment hold its lock file in turn, whichever
+        # process or thread they run in
+        if self.status(jobId=jobId) == 'superseded':
+            self._set_status(jobId=jobId, status='superseded')
+            yield False
+            return
+        with locked(os.path.join(self.directory, f'{environment}.lock')):
+            # A newer commit may have been queued while this one waited
+            if self.status(jobId=jobId) == 'superseded':
+                self._set_status(jobId=jobId, status='superseded')
+                yield False
+                return
+            self._set_status(jobId=jobId, status='running')
+            try:
+                yield True
+            except BaseException:
+                self._set_status(jobId=jobId, status='failed')
+                raise
+            self._set_status(jobId=jobId, status='done')
+
+    def orphaned_jobs(self):
+        # Jobs whose process died before they ran, the ones a restart must resume
+        with self._state() as jobs:
+            orphans = {
+                jobId: job
+                for jobId, job in jobs.items()
+                if job['pid'] != os.getpid() and not _is_running(job['pid'])
+            }
+            for jobId in orphans:
+                del jobs[jobId]
+        return [
+            job
+            for job in orphans.values()
+            if job['request'] and job['status'] in ('queued', 'running')
+        ]
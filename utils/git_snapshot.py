@@ -0,0 +1,61 @@
+LABEL_LOG_ARGS = ('log', '-1', '--format=%h-%cd', '--date=format:%Y%m%d%H%M%S')
+
+
+class GitSnapshot:
+    def __init__(
+        self,
+        branch,
+        headHash,
+        upstream=None,
+        ahead=0,
+        behind=0,
+        isDirty=False,
+        shortHashAndTime=None,
+    ):
+        self.branch = branch
+        self.headHash = headHash
+        self.upstream = upstream
+        self.ahead = ahead
+        self.behind = behind
+        self.isDirty = isDirty
+        self.shortHashAndTime = shortHashAndTime
+
+    @classmethod
+    def parse(cls, status, log=None):
+        headers = {}
+        isDirty = False
+        for line in status.splitlines():
+            if line.startswith('# '):
+                key, _, value = line[2:].partition(' ')
+                headers[key] = value
+            elif line.strip() and not line.startswith('!'):
+                isDirty = True
+
+        headHash = headers.get('branch.oid')
+        branch = headers.get('branch.head')
+        if headHash is None or branch is None:
+            raise ValueError(
+                f'not a git status --porcelain=v2 --branch output: {status!r}'
+            )
+
+        ahead, behind = 0, 0
+        if 'branch.ab' in headers:
+            aheadCount, behindCount = headers['branch.ab'].split()
+            ahead, behind = int(aheadCount.lstrip('+')), int(behindCount.lstrip('-'))
+
+        return cls(
+            # Keep the names rev-parse --abbrev-ref HEAD used to report
+            branch='HEAD' if branch == '(detached)' else branch,
+            headHash=None if headHash == '(initial)' else headHash,
+            upstream=headers.get('branch.upstream'),
+            ahead=ahead,
+            behind=behind,
+            isDirty=isDirty,
+            shortHashAndTime=log.strip() if log else None,
+        )
+
+
+def load_git_snapshot(runCommand):
+    status = runCommand('git', 'status', '--porcelain=v2', '--branch')
+    log = runCommand('git', *LABEL_LOG_ARGS)
+    return GitSnapshot.parse(status=status, log=log)
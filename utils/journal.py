@@ -0,0 +1,57 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+
+class StepJournal:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.steps = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as file:
+                    self.steps = json.load(file)['steps']
+            except (OSError, ValueError, KeyError) as exception:
+                raise SystemExit(
+                    f'Error: Could not read provisioning journal {self.path} ({exception})'
+                )
+
+    def completed_steps(self):
+        return list(self.steps)
+
+    def outputs(self):
+        outputs = {}
+        for step in self.steps.values():
+            outputs.update(step['outputs'])
+        return outputs
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fileDescriptor, temporaryFile = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with open(fileDescriptor, 'w') as file:
+            json.dump({'steps': self.steps}, file, indent=2)
+        os.replace(temporaryFile, self.path)
+
+    def record(self, step, outputs=None):
+        with self._lock:
+            self.steps[step] = {
+                'completedAt': datetime.datetime.now().isoformat(timespec='seconds'),
+                'outputs': outputs or {},
+            }
+            self._save()
+
+    def reset(self, steps):
+        with self._lock:
+            for step in steps:
+                self.steps.pop(step, None)
+            self._save()
+
+    def discard(self):
+        with self._lock:
+            self.steps = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,134 @@
+import concurrent.futures
+import os
+import shutil
+import sys
+
+from .renderer import TemplateRenderer
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl cloning a whole file on Linux filesystems with copy-on-write extents
+# (Btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+
+def reflink(sourcePath, destinationPath):
+    if fcntl is None or not sys.platform.startswith('linux'):
+        raise OSError('reflinks are not supported on this platform')
+    try:
+        with open(sourcePath, 'rb') as source:
+            with open(destinationPath, 'wb') as destination:
+                fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+    except OSError:
+        if os.path.exists(destinationPath):
+            os.remove(destinationPath)
+        raise
+    shutil.copystat(sourcePath, destinationPath)
+
+
+class SkeletonMaterialiser:
+    EXCLUDES = ['README.md', '.git', '.DS_Store']
+
+    def __init__(
+        self,
+        source,
+        destination,
+        renames=None,
+        templateFiles=(),
+        values=None,
+        excludes=EXCLUDES,
+        link=False,
+        reflink=True,
+        maxWorkers=8,
+    ):
+        self.source = source
+        self.destination = destination
+        self.renames = renames or {}
+        self.templateFiles = set(templateFiles)
+        self.renderer = TemplateRenderer(values=values or {})
+        self.excludes = set(excludes)
+        # Hardlinked files are shared with the template repository, a write to
+        # one changes both, so they are opt-in
+        self.link = link
+        self.reflink = reflink
+        self.maxWorkers = maxWorkers
+
+    def _destination_path(self, relativePath):
+        for originalName, newName in self.renames.items():
+            if relativePath == originalName or relativePath.startswith(
+                f'{originalName}/'
+            ):
+                return f'{newName}{relativePath[len(originalName):]}'
+        return relativePath
+
+    def _copy(self, sourcePath, destinationPath):
+        if os.path.lexists(destinationPath):
+            os.remove(destinationPath)
+        if os.path.islink(sourcePath):
+            return os.symlink(os.readlink(sourcePath), destinationPath)
+        if self.link:
+            try:
+                return os.link(sourcePath, destinationPath)
+            except OSError:
+                # Cross-device or unsupported, stop trying for the remaining files
+                self.link = False
+        if self.reflink:
+            try:
+                return reflink(sourcePath=sourcePath, destinationPath=destinationPath)
+            except OSError:
+                self.reflink = False
+        shutil.copy2(sourcePath, destinationPath)
+
+    def _materialise_file(self, relativePath):
+        sourcePath = os.path.join(self.source, relativePath)
+        destinationPath = os.path.join(
+            self.destination, self._destination_path(relativePath=relativePath)
+        )
+        if relativePath in self.templateFiles:
+            self.renderer.render_file(source=sourcePath, destination=destinationPath)
+        else:
+            self._copy(sourcePath=sourcePath, destinationPath=destinationPath)
+        return destinationPath
+
+    def _walk(self):
+        for directory, directoryNames, fileNames in os.walk(self.source):
+            directoryNames[:] = [
+                name for name in directoryNames if name not in self.excludes
+            ]
+            relativeDirectory = os.path.relpath(directory, self.source)
+            for name in fileNames + [
+                name
+                for name in directoryNames
+                if os.path.islink(os.path.join(directory, name))
+            ]:
+                if name in self.excludes:
+                    continue
+                yield os.path.normpath(os.path.join(relativeDirectory, name))
+            for name in directoryNames:
+                if os.path.islink(os.path.join(directory, name)):
+                    continue
+                os.makedirs(
+                    os.path.join(
+                        self.destination,
+                        self._destination_path(
+                            relativePath=os.path.normpath(
+                                os.path.join(relativeDirectory, name)
+                            )
+                        ),
+                    ),
+                    exist_ok=True,
+                )
+
+    def materialise(self):
+        os.makedirs(self.destination, exist_ok=True)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.maxWorkers
+        ) as executor:
+            futures = [
+                executor.submit(self._materialise_file, relativePath)
+                for relativePath in self._walk()
+            ]
+            return [future.result() for future in futures]
@@ -0,0 +1,41 @@
+import contextlib
+import contextvars
+import sys
+
+_output = contextvars.ContextVar('output', default=None)
+
+
+class RoutedStream:
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text):
+        return (_output.get() or self.fallback).write(text)
+
+    def flush(self):
+        return (_output.get() or self.fallback).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    # Executor threads do not inherit the caller's context, running the task
+    # in a copy of it keeps its print() in the output of the request it serves
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def install():
+    # print() then lands in the output of the request the thread is serving
+    if not isinstance(sys.stdout, RoutedStream):
+        sys.stdout = RoutedStream(fallback=sys.stdout)
+        sys.stderr = RoutedStream(fallback=sys.stderr)
+
+
+@contextlib.contextmanager
+def routed_to(stream):
+    token = _output.set(stream)
+    try:
+        yield
+    finally:
+        _output.reset(token)
@@ -0,0 +1,43 @@
+import functools
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updatedAt = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updatedAt) * self.rate
+            )
+            self._updatedAt = now
+            # Reserve the token now and sleep outside the lock until it is due
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class RateLimitedClient:
+    def __init__(self, client, rateLimiter):
+        self._client = client
+        self._rateLimiter = rateLimiter
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute) or name.startswith('_'):
+            return attribute
+
+        @functools.wraps(attribute)
+        def rate_limited(*args, **kwargs):
+            self._rateLimiter.acquire()
+            return attribute(*args, **kwargs)
+
+        return rate_limited
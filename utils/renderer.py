@@ -0,0 +1,77 @@
+import concurrent.futures
+import os
+import shutil
+import tempfile
+
+PRIVATE_USE_AREA = range(0xE000, 0xF900)
+CHUNK_SIZE = 1024 * 1024
+
+
+class TemplateRenderer:
+    def __init__(self, values, maxWorkers=8):
+        self.values = dict(values)
+        self.maxWorkers = maxWorkers
+        # Longest keys first so a key never shadows a longer key it is a prefix of
+        self.keys = sorted(self.values, key=len, reverse=True)
+        self.lineBased = not any('\n' in key for key in self.keys)
+
+    def _placeholders(self, text):
+        placeholders = []
+        for codePoint in PRIVATE_USE_AREA:
+            placeholder = chr(codePoint)
+            if placeholder not in text and not any(
+                placeholder in key for key in self.keys
+            ):
+                placeholders.append(placeholder)
+                if len(placeholders) == len(self.keys):
+                    return placeholders
+        raise ValueError('No free placeholder characters to render template')
+
+    def render_text(self, text):
+        # Keys are swapped for placeholders first so substituted values are never
+        # matched again, which makes the whole substitution a single pass
+        placeholders = self._placeholders(text=text)
+        for key, placeholder in zip(self.keys, placeholders):
+            text = text.replace(key, placeholder)
+        for key, placeholder in zip(self.keys, placeholders):
+            text = text.replace(placeholder, self.values[key])
+        return text
+
+    def _chunks(self, sourceFile):
+        if not self.lineBased:
+            yield sourceFile.read()
+            return
+        while True:
+            lines = sourceFile.readlines(CHUNK_SIZE)
+            if not lines:
+                return
+            yield ''.join(lines)
+
+    def render_file(self, source, destination=None):
+        destination = destination or source
+        fileDescriptor, temporaryFile = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(destination)),
+            prefix=f'.{os.path.basename(destination)}.',
+        )
+        try:
+            with open(
+                fileDescriptor, 'w', encoding='utf-8', newline=''
+            ) as temporary, open(source, encoding='utf-8', newline='') as sourceFile:
+                for chunk in self._chunks(sourceFile=sourceFile):
+                    temporary.write(self.render_text(chunk))
+            shutil.copymode(source, temporaryFile)
+            os.replace(temporaryFile, destination)
+        except BaseException:
+            os.unlink(temporaryFile)
+            raise
+        return destination
+
+    def render_files(self, sourcesAndDestinations):
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.maxWorkers
+        ) as executor:
+            futures = [
+                executor.submit(self.render_file, source, destination)
+                for source, destination in sourcesAndDestinations
+            ]
+            return [future.result() for future in futures]
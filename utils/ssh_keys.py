@@ -0,0 +1,134 @@
+import os
+import subprocess
+import threading
+import uuid
+
+from .file_lock import locked
+
+KEY_TYPES = {'ed25519': [], 'rsa': ['-b', '4096']}
+
+
+def ssh_dir():
+    return os.path.join(os.path.expanduser('~'), '.ssh')
+
+
+def generate_key(path, keyType='ed25519', comment=''):
+    for keyFile in [path, f'{path}.pub']:
+        if os.path.exists(keyFile):
+            os.remove(keyFile)
+    try:
+        subprocess.run(
+            [
+                'ssh-keygen',
+                '-q',
+                '-t',
+                keyType,
+                *KEY_TYPES[keyType],
+                '-C',
+                comment,
+                '-N',
+                '',
+                '-f',
+                path,
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, OSError) as exception:
+        raise SystemExit(f'Error: Could not generate ssh key file ({exception})')
+    return path
+
+
+def read_public_key(path):
+    try:
+        with open(f'{path}.pub') as file:
+            return file.read().strip()
+    except OSError:
+        raise SystemExit('Error: Could not get public key generated')
+
+
+def add_host_alias(host, identityFile, configPath=None):
+    configPath = configPath or os.path.join(ssh_dir(), 'config')
+    block = (
+        f'\nHost {host}\n'
+        '  HostName github.com\n'
+        '  User git\n'
+        f'  IdentityFile {identityFile}\n'
+        '  IdentitiesOnly yes\n'
+    )
+    with locked(f'{configPath}.lock'):
+        try:
+            with open(configPath) as file:
+                hosts = [line.split() for line in file]
+        except FileNotFoundError:
+            hosts = []
+        # Resetting a service's key reuses the same file, its alias is already there
+        if ['Host', host] in hosts:
+            return
+        with open(configPath, 'a') as file:
+            file.write(block)
+
+
+class SshKeyPool:
+    def __init__(self, directory=None, keyType='ed25519', size=2, comment=''):
+        self.directory = directory or os.path.join(ssh_dir(), 'flouflou_pool', keyType)
+        self.keyType = keyType
+        self.size = size
+        self.comment = comment
+        self._lock = threading.Lock()
+        self._filler = None
+
+    def ready_keys(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        # A key is ready once its private file has lost the .tmp suffix
+        return [
+            os.path.join(self.directory, name)
+            for name in names
+            if '.' not in name and f'{name}.pub' in names
+        ]
+
+    def fill(self):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        while len(self.ready_keys()) < self.size:
+            path = os.path.join(self.directory, uuid.uuid4().hex)
+            generate_key(path=f'{path}.tmp', keyType=self.keyType, comment=self.comment)
+            os.replace(f'{path}.tmp.pub', f'{path}.pub')
+            os.replace(f'{path}.tmp', path)
+
+    def _fill_quietly(self):
+        try:
+            self.fill()
+        except (SystemExit, OSError) as exception:
+            print(f'Warning: Could not refill the ssh key pool ({exception})')
+
+    def start_filling(self):
+        # The thread is not a daemon so a key being generated at exit is not
+        # left half written
+        with self._lock:
+            if self._filler and self._filler.is_alive():
+                return self._filler
+            self._filler = threading.Thread(target=self._fill_quietly)
+            self._filler.start()
+            return self._filler
+
+    def claim(self, path):
+        for keyFile in [path, f'{path}.pub']:
+            if os.path.exists(keyFile):
+                os.remove(keyFile)
+        # Renaming is atomic, a key taken by another thread or process fails
+        # to move and the next one is tried
+        for key in self.ready_keys():
+            try:
+                os.rename(key, path)
+            except FileNotFoundError:
+                continue
+            os.replace(f'{key}.pub', f'{path}.pub')
+            break
+        else:
+            generate_key(path=path, keyType=self.keyType, comment=self.comment)
+        self.start_filling()
+        return path
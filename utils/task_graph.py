@@ -0,0 +1,95 @@
+import concurrent.futures
+
+from .progress import submit_in_context
+from .tracing import tracer
+
+
+class TaskGraph:
+    def __init__(self, maxWorkers=4):
+        self.maxWorkers = maxWorkers
+        self.tasks = {}
+        self.results = {}
+        self.failures = {}
+        self.skipped = []
+
+    def add(self, name, func, dependsOn=()):
+        unknownTasks = [task for task in dependsOn if task not in self.tasks]
+        if unknownTasks:
+            raise ValueError(
+                f'Task {name} depends on unknown tasks: {", ".join(unknownTasks)}'
+            )
+        self.tasks[name] = (func, tuple(dependsOn))
+
+    @staticmethod
+    def _run_task(name, func):
+        try:
+            with tracer.span(name, category='step'):
+                return func()
+        except SystemExit as exception:
+            raise RuntimeError(str(exception)) from exception
+
+    def _ready_tasks(self, pending):
+        readyTasks = []
+        changed = True
+        while changed:
+            changed = False
+            for name, (func, dependsOn) in list(pending.items()):
+                if any(
+                    task in self.failures or task in self.skipped for task in dependsOn
+                ):
+                    self.skipped.append(name)
+                    del pending[name]
+                    changed = True
+                elif all(task in self.results for task in dependsOn):
+                    readyTasks.append((name, func))
+                    del pending[name]
+        return readyTasks
+
+    def descendants(self, name):
+        descendants = set()
+        for task, (_, dependsOn) in self.tasks.items():
+            if descendants.intersection(dependsOn) or name in dependsOn:
+                descendants.add(task)
+        return descendants
+
+    def run(self, completed=(), onTaskDone=None):
+        self.results = {task: None for task in completed if task in self.tasks}
+        self.failures = {}
+        self.skipped = []
+        pending = {
+            name: task for name, task in self.tasks.items() if name not in self.results
+        }
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.maxWorkers
+        ) as executor:
+            while True:
+                for name, func in self._ready_tasks(pending=pending):
+                    running[
+                        submit_in_context(executor, self._run_task, name, func)
+                    ] = name
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as exception:
+                        self.failures[name] = str(exception) or repr(exception)
+                        continue
+                    if onTaskDone:
+                        onTaskDone(name, self.results[name])
+        return self.results
+
+    def raise_for_failures(self):
+        if not self.failures:
+            return
+        messages = [f'[{name}] {message}' for name, message in self.failures.items()]
+        if self.skipped:
+            messages.append(
+                f'Skipped because a dependency failed: {", ".join(self.skipped)}'
+            )
+        raise SystemExit('\n'.join(messages))
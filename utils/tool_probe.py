@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+
+def user_cache_dir(appName='flouflou'):
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, appName)
+
+
+class ToolProbeCache:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_cache_dir(), 'tools.json')
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as file:
+                self.probes = json.load(file)
+        except (OSError, ValueError):
+            self.probes = {}
+
+    @staticmethod
+    def fingerprint(command):
+        path = shutil.which(command)
+        if path is None:
+            raise FileNotFoundError(f'{command} is not on the PATH')
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+        return [path, stat.st_mtime_ns, stat.st_size]
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fileDescriptor, temporaryFile = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with open(fileDescriptor, 'w') as file:
+            json.dump(self.probes, file, indent=2)
+        os.replace(temporaryFile, self.path)
+
+    def probe(self, command, probe, recheck=False):
+        fingerprint = self.fingerprint(command=command)
+        cached = self.probes.get(command)
+        if not recheck and cached and cached['fingerprint'] == fingerprint:
+            return cached['version']
+        version = probe()
+        with self._lock:
+            self.probes[command] = {'fingerprint': fingerprint, 'version': version}
+            try:
+                self._save()
+            except OSError:
+                # A read-only cache directory only costs the next run a probe
+                pass
+        return version
@@ -0,0 +1,196 @@
+import contextlib
+import functools
+import json
+import os
+import subprocess
+import threading
+import time
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.threadNames = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, category='step', **args):
+        if not self.enabled:
+            yield
+            return
+        thread = threading.current_thread()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            with self._lock:
+                self.threadNames[thread.ident] = thread.name
+                self.spans.append(
+                    {
+                        'name': name,
+                        'category': category,
+                        'start': start,
+                        'end': end,
+                        'tid': thread.ident,
+                        'args': args,
+                    }
+                )
+
+    def trace_client(self, client, category):
+        if not self.enabled:
+            return client
+        return TracedClient(client=client, tracer=self, category=category)
+
+    def _instrument_subprocess(self):
+        originals = {'run': subprocess.run, 'call': subprocess.call}
+
+        def traced(original):
+            @functools.wraps(original)
+            def wrapper(*args, **kwargs):
+                command = kwargs.get('args', args[0] if args else '')
+                if not isinstance(command, str):
+                    command = ' '.join(str(argument) for argument in command)
+                with self.span(
+                    f'subprocess: {command}',
+                    category='subprocess',
+                    cwd=kwargs.get('cwd'),
+                ):
+                    return original(*args, **kwargs)
+
+            return wrapper
+
+        # check_output and check_call go through run and call
+        subprocess.run = traced(originals['run'])
+        subprocess.call = traced(originals['call'])
+        return originals
+
+    @contextlib.contextmanager
+    def collecting(self):
+        self.spans = []
+        self.threadNames = {}
+        self.enabled = True
+        originals = self._instrument_subprocess()
+        try:
+            yield self
+        finally:
+            subprocess.run = originals['run']
+            subprocess.call = originals['call']
+            self.enabled = False
+
+    def count(self, category):
+        return sum(1 for span in self.spans if span['category'] == category)
+
+    @contextlib.contextmanager
+    def recording(self, traceFile):
+        if not traceFile:
+            yield
+            return
+        try:
+            with self.collecting(), self.span('total', category='process'):
+                yield
+        finally:
+            self.export_chrome_trace(traceFile=traceFile)
+            self.print_summary()
+            print(f'Trace written to {traceFile}')
+
+    def _self_times(self):
+        selfTimes = {}
+        spansByThread = {}
+        for index, span in enumerate(self.spans):
+            spansByThread.setdefault(span['tid'], []).append(index)
+        for indexes in spansByThread.values():
+            indexes.sort(key=lambda i: (self.spans[i]['start'], -self.spans[i]['end']))
+            stack = []
+            for index in indexes:
+                span = self.spans[index]
+                while stack and self.spans[stack[-1]]['end'] <= span['start']:
+                    stack.pop()
+                selfTimes[index] = span['end'] - span['start']
+                if stack:
+                    selfTimes[stack[-1]] -= span['end'] - span['start']
+                stack.append(index)
+        return selfTimes
+
+    def summary(self):
+        selfTimes = self._self_times()
+        rows = {}
+        for index, span in enumerate(self.spans):
+            row = rows.setdefault(
+                (span['category'], span['name']),
+                {
+                    'category': span['category'],
+                    'name': span['name'],
+                    'count': 0,
+                    'total': 0,
+                    'self': 0,
+                },
+            )
+            row['count'] += 1
+            row['total'] += span['end'] - span['start']
+            row['self'] += selfTimes[index]
+        return sorted(rows.values(), key=lambda row: row['self'], reverse=True)
+
+    def print_summary(self, limit=25):
+        print(
+            f'{"SELF (ms)":>10} {"TOTAL (ms)":>11} {"COUNT":>6}  {"CATEGORY":<11} NAME'
+        )
+        for row in self.summary()[:limit]:
+            print(
+                f'{row["self"] / 1e6:>10.1f} {row["total"] / 1e6:>11.1f} {row["count"]:>6}  '
+                f'{row["category"]:<11} {row["name"][:80]}'
+            )
+
+    def export_chrome_trace(self, traceFile):
+        pid = os.getpid()
+        origin = min((span['start'] for span in self.spans), default=0)
+        events = [
+            {
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': tid,
+                'args': {'name': name},
+            }
+            for tid, name in self.threadNames.items()
+        ]
+        events.extend(
+            {
+                'name': span['name'],
+                'cat': span['category'],
+                'ph': 'X',
+                'ts': (span['start'] - origin) / 1000,
+                'dur': (span['end'] - span['start']) / 1000,
+                'pid': pid,
+                'tid': span['tid'],
+                'args': {name: value for name, value in span['args'].items() if value},
+            }
+            for span in self.spans
+        )
+        with open(traceFile, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+
+class TracedClient:
+    def __init__(self, client, tracer, category):
+        self._client = client
+        self._tracer = tracer
+        self._category = category
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute) or name.startswith('_'):
+            return attribute
+
+        @functools.wraps(attribute)
+        def traced(*args, **kwargs):
+            with self._tracer.span(
+                f'{type(self._client).__name__}.{name}', category=self._category
+            ):
+                return attribute(*args, **kwargs)
+
+        return traced
+
+
+tracer = Tracer()
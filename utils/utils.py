@@ -1,6 +1,26 @@
+import importlib
+import os
+import shutil
 import subprocess
+import threading
 import time
 
+from .renderer import TemplateRenderer
+
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
 
 def template_to_file(
     templateFile,
@@ -10,29 +30,15 @@ def template_to_file(
     destination=None,
     newTemplateFileName=None,
 ):
-    [
-        subprocess.check_output(
-            ['sed', '-i', '_origin', f's#{originalValue}#{newValue}#g', templateFile],
-            cwd=cwd,
-        )
-        for originalValue, newValue in values.items()
-    ]
-    if deleteBackup:
-        subprocess.check_output(
-            ['rm', '-f', f'{templateFile}_origin'],
-            cwd=cwd,
-        )
+    source = os.path.join(cwd, templateFile)
     if destination:
-        if newTemplateFileName:
-            subprocess.check_output(
-                ['mv', f'{cwd}/{templateFile}', f'{destination}/{newTemplateFileName}']
-            )
-        else:
-            subprocess.check_output(
-                ['mv', f'{cwd}/{templateFile}', f'{destination}/{templateFile}']
-            )
-        subprocess.check_output(['mv', f'{templateFile}_origin', templateFile], cwd=cwd)
-    return
+        return TemplateRenderer(values=values).render_file(
+            source=source,
+            destination=os.path.join(destination, newTemplateFileName or templateFile),
+        )
+    if not deleteBackup:
+        shutil.copy2(source, f'{source}_origin')
+    return TemplateRenderer(values=values).render_file(source=source)
 
 
 def templates_to_files(
@@ -42,16 +48,19 @@ def templates_to_files(
     deleteBackup=False,
     destination=None,
 ):
-    return [
-        template_to_file(
-            templateFile=templateFile,
-            values=values,
-            cwd=cwd,
-            deleteBackup=deleteBackup,
-            destination=destination,
-        )
-        for templateFile in templateFiles
-    ]
+    if not destination and not deleteBackup:
+        for templateFile in templateFiles:
+            source = os.path.join(cwd, templateFile)
+            shutil.copy2(source, f'{source}_origin')
+    return TemplateRenderer(values=values).render_files(
+        sourcesAndDestinations=[
+            (
+                os.path.join(cwd, templateFile),
+                os.path.join(destination, templateFile) if destination else None,
+            )
+            for templateFile in templateFiles
+        ]
+    )
 
 
 def rename_file_or_folder(originalName, newName, cwd):